@@ -1,7 +1,9 @@
-from flask import Flask
-from backend.routes import main_bp
-
 def create_app():
+    # Imports dentro da função: importar o pacote (ex: python -m backend.score_calculator)
+    # não carrega Flask, SQLAlchemy nem as rotas
+    from flask import Flask
+    from backend.routes import main_bp
+
     app = Flask(__name__)
     app.register_blueprint(main_bp)  # Registrar as rotas
     return app
@@ -0,0 +1,327 @@
+# backend/admin_routes.py
+
+"""
+API administrativa (/api/admin). Todas as rotas exigem o cabeçalho
+'Authorization: Bearer <ADMIN_API_TOKEN>'; sem o token configurado a API fica
+desabilitada (403).
+"""
+import base64
+import hmac
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import and_, or_, select
+
+# --- Importações locais ---
+try:
+    from .db import db
+    from .models.disc_result import DISCResult, SUMMARY_COLUMNS
+    from .pdf_jobs import get_pdf_jobs
+    from .pdf_export import stream_pdf_zip
+    from .result_cache import get_result_cache
+    from .results_export import export_statement, stream_export, EXPORT_FORMATS, EXPORT_MIMETYPES
+    from .stats import daily_stats_summary, refresh_daily_stats, stats_watermark, StatsRefreshConflict
+except ImportError:
+    from backend.db import db
+    from backend.models.disc_result import DISCResult, SUMMARY_COLUMNS
+    from backend.pdf_jobs import get_pdf_jobs
+    from backend.pdf_export import stream_pdf_zip
+    from backend.result_cache import get_result_cache
+    from backend.results_export import export_statement, stream_export, EXPORT_FORMATS, EXPORT_MIMETYPES
+    from backend.stats import daily_stats_summary, refresh_daily_stats, stats_watermark, StatsRefreshConflict
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+@admin_bp.before_request
+def require_admin_token():
+    """Valida o token de administrador (comparação em tempo constante)."""
+    expected = current_app.config.get('ADMIN_API_TOKEN')
+    if not expected:
+        return jsonify({'success': False, 'error': 'API administrativa desabilitada.'}), 403
+
+    auth_header = request.headers.get('Authorization', '')
+    scheme, _, token = auth_header.partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode(), expected.encode()):
+        current_app.logger.warning(f"Acesso negado à API administrativa: {request.path} ({request.remote_addr})")
+        response = jsonify({'success': False, 'error': 'Não autorizado.'})
+        response.status_code = 401
+        response.headers['WWW-Authenticate'] = 'Bearer'
+        return response
+    return None
+
+
+# --- Funções Auxiliares ---
+
+def _parse_date_arg(name: str) -> Optional[datetime]:
+    """Lê um parâmetro de data (YYYY-MM-DD ou ISO 8601). Levanta ValueError se inválido."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Parâmetro '{name}' inválido: '{value}'. Use YYYY-MM-DD ou ISO 8601.")
+
+
+def _date_range_args() -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Intervalo [start, end) a partir de ?start= e ?end=. Uma data sem hora em 'end'
+    inclui o dia inteiro.
+    """
+    start = _parse_date_arg('start')
+    end = _parse_date_arg('end')
+    if end is not None and 'T' not in request.args['end'] and ' ' not in request.args['end']:
+        end += timedelta(days=1)
+    return start, end
+
+
+# Domínio de email aceito em ?email_domain= (sem curingas do LIKE como '%' e '_')
+_EMAIL_DOMAIN_PATTERN = re.compile(r'^[a-z0-9.-]{1,253}$')
+
+
+def _apply_result_filters(stmt):
+    """Aplica os filtros comuns (?email_domain=, ?start=, ?end=). Levanta ValueError se inválidos."""
+    start, end = _date_range_args()
+    email_domain = (request.args.get('email_domain') or '').strip().lstrip('@').lower()
+    if email_domain:
+        if not _EMAIL_DOMAIN_PATTERN.match(email_domain):
+            raise ValueError(f"Parâmetro 'email_domain' inválido: '{email_domain}'. Use só letras, números, '.' e '-'.")
+        stmt = stmt.where(DISCResult.user_email.iendswith(f"@{email_domain}", autoescape=True))
+    if start is not None:
+        stmt = stmt.where(DISCResult.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(DISCResult.timestamp < end)
+    return stmt
+
+
+def _filtered_results_query():
+    """
+    SELECT de DISCResult com os filtros comuns, ordenado por ID. Carrega só o perfil
+    'scores' (sem as colunas JSON/binárias).
+    """
+    stmt = select(DISCResult).options(*DISCResult.loader_options('scores'))
+    return _apply_result_filters(stmt).order_by(DISCResult.id)
+
+
+def _encode_cursor(timestamp: datetime, result_id: int) -> str:
+    """Cursor opaco (base64url) com a posição (timestamp, id) do último item da página."""
+    raw = json.dumps({'t': timestamp.isoformat(), 'i': result_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverso de _encode_cursor. Levanta ValueError se o cursor for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        timestamp, result_id = datetime.fromisoformat(data['t']), data['i']
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Parâmetro 'cursor' inválido.") from e
+    if isinstance(result_id, bool) or not isinstance(result_id, int):
+        raise ValueError("Parâmetro 'cursor' inválido.")
+    return timestamp, result_id
+
+
+def _summary_dict(row) -> Dict[str, Any]:
+    data = dict(row._mapping)
+    data['timestamp'] = data['timestamp'].isoformat() if data['timestamp'] else None
+    return data
+
+
+# --- ROTAS ---
+
+@admin_bp.route('/results')
+def list_results():
+    """
+    Lista resultados (colunas de resumo), do mais recente para o mais antigo, com
+    paginação por chave (keyset) em (timestamp, id): cada página busca direto no
+    índice de timestamp a partir do cursor, sem OFFSET, com custo constante.
+
+    Filtros: ?primary_type=D  ?user_email=ana@empresa.com  ?start=  ?end=  ?limit=50
+    Próxima página: ?cursor=<next_cursor> (com os mesmos filtros).
+    """
+    try:
+        start, end = _date_range_args()
+        cursor = _decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        limit = int(request.args.get('limit', 50))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    max_limit = int(current_app.config.get('ADMIN_RESULTS_MAX_PAGE_SIZE', 500))
+    if not 1 <= limit <= max_limit:
+        return jsonify({'success': False, 'error': f"'limit' deve estar entre 1 e {max_limit}."}), 400
+
+    stmt = select(*(getattr(DISCResult, name) for name in SUMMARY_COLUMNS))
+    primary_type = (request.args.get('primary_type') or '').strip().upper()
+    if primary_type:
+        if primary_type not in ('D', 'I', 'S', 'C'):
+            return jsonify({'success': False, 'error': "'primary_type' deve ser D, I, S ou C."}), 400
+        stmt = stmt.where(DISCResult.primary_type == primary_type)  # Índice (primary_type, timestamp)
+    user_email = (request.args.get('user_email') or '').strip()
+    if user_email:
+        stmt = stmt.where(DISCResult.user_email == user_email)  # Igualdade: usa o índice de user_email
+    if start is not None:
+        stmt = stmt.where(DISCResult.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(DISCResult.timestamp < end)
+    if cursor is not None:
+        last_timestamp, last_id = cursor
+        # (timestamp, id) < cursor, escrito para que o banco use a faixa do índice de timestamp
+        stmt = stmt.where(and_(
+            DISCResult.timestamp <= last_timestamp,
+            or_(DISCResult.timestamp < last_timestamp, DISCResult.id < last_id)
+        ))
+    stmt = stmt.order_by(DISCResult.timestamp.desc(), DISCResult.id.desc()).limit(limit + 1)
+
+    rows = db.session.execute(stmt).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+    return jsonify({
+        'success': True,
+        'results': [_summary_dict(row) for row in rows],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+    })
+
+
+@admin_bp.route('/export/pdfs.zip')
+def export_pdfs_zip():
+    """
+    Exporta os PDFs dos resultados filtrados em um ZIP transmitido conforme os
+    relatórios ficam prontos. Filtros: ?email_domain=empresa.com&start=2024-01-01&end=2024-01-31
+    Os PDFs são renderizados no pool da fila de PDFs; além de EXPORT_MAX_CONCURRENT
+    exportações simultâneas no processo, responde 503 com Retry-After.
+    """
+    try:
+        stmt = _filtered_results_query()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    jobs = get_pdf_jobs()
+    if not jobs.acquire_export_slot():
+        current_app.logger.warning(f"Exportação ZIP de PDFs recusada: {jobs.max_exports} exportação(ões) já em andamento.")
+        response = jsonify({'success': False, 'error': 'Outra exportação de PDFs está em andamento. Tente novamente em instantes.'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    window = int(current_app.config.get('EXPORT_RENDER_WINDOW', 8))
+    yield_per = int(current_app.config.get('EXPORT_YIELD_PER', 200))
+    current_app.logger.info(f"Exportação ZIP de PDFs iniciada ({request.query_string.decode(errors='replace')}).")
+
+    def generate():
+        # yield_per: lê do cursor em lotes, sem carregar todas as linhas na memória
+        results = db.session.scalars(stmt.execution_options(yield_per=yield_per))
+        try:
+            yield from stream_pdf_zip(results, jobs, window=window)
+        finally:
+            results.close()
+
+    filename = f"relatorios_disc_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip"
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='application/zip',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no',  # Evita buffering em proxies (nginx)
+        }
+    )
+    # A vaga é liberada quando o servidor fecha a resposta (fim do download ou desconexão)
+    response.call_on_close(jobs.release_export_slot)
+    return response
+
+
+@admin_bp.route('/export/results')
+def export_results():
+    """
+    Exporta os resultados em fluxo, em ordem de ID, como NDJSON (padrão) ou CSV.
+    ?format=ndjson|csv  ?since_id=<último ID já carregado>  ?since=<timestamp>
+    ?include_raw=1 (respostas brutas decodificadas) e os filtros comuns
+    (?email_domain=, ?start=, ?end=). Memória constante: cursor em lotes e saída em blocos.
+    Resultados mais novos que EXPORT_LAG_SECONDS (e os seguintes) ficam para a próxima
+    carga; o maior 'id' recebido é o since_id seguro para ela.
+    """
+    fmt = (request.args.get('format') or 'ndjson').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'error': f"'format' deve ser um de {', '.join(EXPORT_FORMATS)}."}), 400
+    include_raw = request.args.get('include_raw', '').lower() in ('1', 'true', 'yes')
+    try:
+        since_id = int(request.args['since_id']) if request.args.get('since_id') else None
+        since = _parse_date_arg('since')
+        lag_seconds = float(current_app.config.get('EXPORT_LAG_SECONDS', 30))
+        stmt = _apply_result_filters(export_statement(since_id, since, include_raw, lag_seconds))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    yield_per = int(current_app.config.get('EXPORT_YIELD_PER', 200))
+    chunk_bytes = int(current_app.config.get('EXPORT_CHUNK_BYTES', 64 * 1024))
+    current_app.logger.info(f"Exportação de resultados ({fmt}) iniciada ({request.query_string.decode(errors='replace')}).")
+
+    def generate():
+        rows = db.session.execute(stmt.execution_options(yield_per=yield_per))
+        try:
+            yield from stream_export(rows, fmt, include_raw, chunk_bytes)
+        finally:
+            rows.close()
+
+    filename = f"resultados_disc_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no',
+        }
+    )
+
+
+@admin_bp.route('/cache/results')
+def result_cache_stats():
+    """Acertos/erros do cache de resultados deste processo (cada worker do gunicorn tem o seu)."""
+    return jsonify({'success': True, 'result_cache': get_result_cache().stats()})
+
+
+@admin_bp.route('/stats')
+def results_stats():
+    """
+    Números do painel (totais, média/desvio por fator, contagem por perfil primário e
+    série diária) lidos dos agregados diários. Filtros: ?start= ?end= ?primary_type=
+    (granularidade de dia). Só lê: os agregados são atualizados por 'flask disc
+    refresh-stats'; 'last_result_id' indica até onde eles vão. Com STATS_REFRESH_ON_READ,
+    inclui antes no máximo um lote de resultados novos (desligue com ?refresh=0).
+    """
+    try:
+        start, end = _date_range_args()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    primary_type = (request.args.get('primary_type') or '').strip().upper() or None
+    if primary_type and primary_type not in ('D', 'I', 'S', 'C'):
+        return jsonify({'success': False, 'error': "'primary_type' deve ser D, I, S ou C."}), 400
+
+    if current_app.config.get('STATS_REFRESH_ON_READ', False) and request.args.get('refresh') != '0':
+        try:
+            # Um lote só: o histórico atrasado fica para o refresh-stats, fora da requisição
+            refresh_daily_stats(
+                chunk_size=int(current_app.config.get('STATS_REFRESH_CHUNK_SIZE', 5000)),
+                lag_seconds=float(current_app.config.get('STATS_REFRESH_LAG_SECONDS', 30)),
+                max_chunks=1
+            )
+        except StatsRefreshConflict as e:
+            # Outro worker está atualizando; os agregados já confirmados continuam válidos
+            current_app.logger.info(f"Atualização dos agregados em andamento em outro processo: {e}")
+
+    # Dias inteiros: 'end' sem hora já é exclusivo; com hora, inclui o dia parcial
+    start_day = start.date() if start is not None else None
+    end_day = None
+    if end is not None:
+        end_day = end.date() if end.time() == datetime.min.time() else end.date() + timedelta(days=1)
+
+    summary = daily_stats_summary(start_day, end_day, primary_type)
+    summary['last_result_id'] = stats_watermark()
+    return jsonify({'success': True, 'stats': summary})
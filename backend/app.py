@@ -19,6 +19,14 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(mes
 try:
     from .config import config
     from .db import db
+    from .json_provider import init_json_provider
+    from .pdf_cache import init_pdf_cache
+    from .cache import init_shared_cache
+    from .result_cache import init_result_cache
+    from .idempotency import init_idempotency
+    from .write_behind import init_write_behind
+    from .pdf_jobs import init_pdf_jobs
+    from .cli import init_cli
     logging.info("Configurações e instância 'db' importadas de backend.config e backend.db.")
 except ImportError as e:
     logging.critical(f"Falha fatal ao importar 'config' ou 'db': {e}. Verifique backend/config.py e backend/db.py.")
@@ -28,6 +36,7 @@ except ImportError as e:
 # --- Importação das Rotas ---
 try:
     from .routes import main_bp
+    from .admin_routes import admin_bp
     logging.info("Importação relativa de 'backend.routes.main_bp' bem-sucedida.")
 except ImportError as e:
      logging.critical(f"Falha fatal ao importar 'main_bp' de routes. Erro: {e}")
@@ -78,6 +87,9 @@ def create_app(config_name=None):
             sys.exit("Erro Crítico: DATABASE_URL de produção faltando.")
     # --- FIM DAS VERIFICAÇÕES ---
 
+    # JSON via msgspec (jsonify, request.get_json e |tojson); antes do primeiro uso de app.jinja_env
+    init_json_provider(app)
+
     # --- Inicializar Extensões ---
     try:
         db.init_app(app)
@@ -85,6 +97,7 @@ def create_app(config_name=None):
         with app.app_context():
              try:
                  from .models import disc_result
+                 from .models import disc_daily_stats
                  logging.info("Modelos importados dentro do contexto da aplicação para Migrate.")
              except ImportError as e:
                  logging.error(f"Erro ao importar modelos para Flask-Migrate: {e}.")
@@ -93,6 +106,32 @@ def create_app(config_name=None):
     except Exception as e:
         logging.error(f"Erro ao inicializar SQLAlchemy ou Flask-Migrate: {e}")
 
+    # Cache em disco dos relatórios PDF
+    try:
+        pdf_cache = init_pdf_cache(app)
+        logging.info(f"Cache de PDFs em '{pdf_cache.directory}' (limite {pdf_cache.max_bytes} bytes).")
+        pdf_jobs = init_pdf_jobs(app, pdf_cache)
+        logging.info(f"Fila de PDFs: {pdf_jobs.workers} processo(s), até {pdf_jobs.max_pending} jobs pendentes.")
+    except OSError as e:
+        logging.critical(f"Falha ao criar o diretório do cache de PDFs: {e}")
+        sys.exit(f"Erro Crítico: cache de PDFs indisponível. Detalhes: {e}")
+
+    # Cache compartilhado (L2) e cache de resultados (populado no insert, lido por /results e pelo PDF)
+    try:
+        shared_cache = init_shared_cache(app)
+        logging.info(f"Cache compartilhado (L2): {type(shared_cache).__name__}.")
+    except (OSError, ValueError) as e:
+        logging.critical(f"Falha ao configurar o cache compartilhado: {e}")
+        sys.exit(f"Erro Crítico: cache compartilhado indisponível. Detalhes: {e}")
+    result_cache = init_result_cache(app)
+    init_idempotency(app)
+    logging.info(f"Cache de resultados: até {result_cache.max_entries} entradas, TTL {result_cache.ttl_seconds}s.")
+
+    # Gravação em grupo de /api/calculate (WRITE_BEHIND_ENABLED)
+    write_behind = init_write_behind(app)
+    if write_behind is not None:
+        logging.info(f"Gravação em grupo habilitada: lotes de até {write_behind.max_batch} linhas, fila de {app.config['WRITE_BEHIND_QUEUE_SIZE']}.")
+
     # Configurar CORS
     if app.config.get('DEBUG') or app.config.get('TESTING'):
         CORS(app)
@@ -101,6 +140,9 @@ def create_app(config_name=None):
         CORS(app) # Temporário
         logging.warning("CORS configurado para produção PERMITINDO TODAS AS ORIGENS. Configure origens específicas!")
 
+    # Comandos 'flask disc ...'
+    init_cli(app)
+
     # --- Registrar Blueprints, Context Processors, Error Handlers ---
     app.context_processor(inject_current_year)
     app.jinja_env.globals['hasattr'] = hasattr
@@ -108,6 +150,8 @@ def create_app(config_name=None):
     try:
         app.register_blueprint(main_bp)
         logging.info("Blueprint 'main_bp' registrado.")
+        app.register_blueprint(admin_bp)
+        logging.info("Blueprint 'admin_bp' registrado em /api/admin.")
     except Exception as e:
         logging.critical(f"Falha ao registrar o blueprint 'main_bp': {e}")
         sys.exit(f"Erro Crítico: Falha ao registrar blueprint principal: {e}")
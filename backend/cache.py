@@ -0,0 +1,180 @@
+# backend/cache.py
+
+"""
+Cache em dois níveis para implantações com vários workers/servidores.
+
+    L1  memória do processo (LRU + TTL, protegido por lock para workers gthread)
+    L2  compartilhado entre processos, via cachelib: FileSystemCache (padrão, uma
+        máquina sem serviços externos), RedisCache (várias máquinas) ou NullCache
+
+Um acerto no L2 é promovido para o L1. Os valores gravados no L2 passam pelo
+pickle do cachelib, então devem ser estruturas simples (dicts, listas, datas);
+objetos somente leitura ficam no L1 e são remontados a partir do valor do L2
+pelas funções serialize/deserialize de cada TieredCache.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from cachelib import BaseCache, FileSystemCache, NullCache, RedisCache
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+L2_BACKENDS = ('filesystem', 'redis', 'null')
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class TieredCache:
+    """
+    Cache L1 (memória, até max_entries por ttl_seconds) na frente de um L2
+    compartilhado (BaseCache do cachelib). As chaves do L2 levam o prefixo
+    '<namespace>:' para que vários caches dividam o mesmo backend.
+    """
+
+    def __init__(self, namespace: str, max_entries: int, ttl_seconds: float,
+                 shared: Optional[BaseCache] = None,
+                 serialize: Callable[[Any], Any] = _identity,
+                 deserialize: Callable[[Any], Any] = _identity,
+                 clock: Callable[[], float] = time.monotonic):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared if shared is not None else NullCache()
+        self._serialize = serialize
+        self._deserialize = deserialize
+        self._clock = clock
+        self._entries: 'OrderedDict[Any, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _shared_key(self, key: Any) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _get_local(self, key: Any) -> Optional[Any]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]  # Expirada
+            return None
+
+    def _put_local(self, key: Any, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Procura no L1 e depois no L2 (promovendo o valor para o L1). None se ausente."""
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        try:
+            stored = self.shared.get(self._shared_key(key))
+        except Exception as e:
+            # Falha no L2 (ex: Redis indisponível) vira miss; a origem continua servindo
+            logger.warning(f"Cache compartilhado indisponível ao ler '{self._shared_key(key)}': {e}")
+            stored = None
+        if stored is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        value = self._deserialize(stored)
+        with self._lock:
+            self.shared_hits += 1
+        self._put_local(key, value)
+        return value
+
+    def set(self, key: Any, value: Any) -> Any:
+        """Grava nos dois níveis (TTL igual) e retorna o próprio valor."""
+        self._put_local(key, value)
+        try:
+            self.shared.set(self._shared_key(key), self._serialize(value), timeout=max(1, int(self.ttl_seconds)))
+        except Exception as e:
+            logger.warning(f"Cache compartilhado indisponível ao gravar '{self._shared_key(key)}': {e}")
+        return value
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        try:
+            self.shared.delete(self._shared_key(key))
+        except Exception as e:
+            logger.warning(f"Cache compartilhado indisponível ao remover '{self._shared_key(key)}': {e}")
+
+    def clear(self) -> None:
+        """Limpa apenas o L1 deste processo (o L2 é compartilhado com os demais)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores deste processo: acertos no L1, no L2 e misses."""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'shared_backend': type(self.shared).__name__,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round((self.hits + self.shared_hits) / lookups, 4) if lookups else None,
+            }
+
+
+def build_shared_cache(config) -> BaseCache:
+    """
+    Cria o backend L2 a partir de CACHE_L2_BACKEND ('filesystem', 'redis' ou 'null').
+    'redis' usa CACHE_L2_REDIS_URL e exige o pacote redis (não incluído no requirements).
+    """
+    backend = (config.get('CACHE_L2_BACKEND') or 'null').lower()
+    timeout = int(config.get('CACHE_L2_DEFAULT_TIMEOUT', 900))
+    if backend == 'filesystem':
+        directory = config['CACHE_L2_DIR']
+        os.makedirs(directory, exist_ok=True)
+        return FileSystemCache(directory, threshold=int(config.get('CACHE_L2_THRESHOLD', 10000)),
+                               default_timeout=timeout)
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError:
+            logger.error("CACHE_L2_BACKEND='redis', mas o pacote 'redis' não está instalado. Cache compartilhado desabilitado.")
+            return NullCache()
+        client = redis.from_url(config['CACHE_L2_REDIS_URL'])
+        return RedisCache(client, default_timeout=timeout, key_prefix=config.get('CACHE_L2_KEY_PREFIX', 'disc:'))
+    if backend != 'null':
+        raise ValueError(f"CACHE_L2_BACKEND inválido: '{backend}'. Use um de {L2_BACKENDS}.")
+    return NullCache()
+
+
+def init_shared_cache(app) -> BaseCache:
+    """Cria o backend L2 da aplicação (compartilhado pelos TieredCache)."""
+    shared = build_shared_cache(app.config)
+    app.extensions['shared_cache'] = shared
+    return shared
+
+
+def get_shared_cache() -> BaseCache:
+    """Retorna o backend L2 da aplicação atual."""
+    return current_app.extensions['shared_cache']
@@ -0,0 +1,183 @@
+# backend/cli.py
+
+"""
+Comandos de manutenção do banco, registrados no Flask CLI como 'flask disc ...'.
+"""
+import json
+import logging
+import os
+import sqlite3
+
+import click
+import msgspec
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import select, update
+
+try:
+    from .db import db
+    from .disc_data import QUESTION_SET_VERSION
+    from .models.disc_result import DISCResult
+    from .response_codec import encode_responses
+    from .schemas import json_decoder
+    from .stats import refresh_daily_stats, StatsRefreshConflict
+    from .results_export import export_statement, stream_export, EXPORT_FORMATS
+    from .legacy_import import import_legacy_assessments, import_legacy_results_db
+except ImportError:
+    from backend.db import db
+    from backend.disc_data import QUESTION_SET_VERSION
+    from backend.models.disc_result import DISCResult
+    from backend.response_codec import encode_responses
+    from backend.schemas import json_decoder
+    from backend.stats import refresh_daily_stats, StatsRefreshConflict
+    from backend.results_export import export_statement, stream_export, EXPORT_FORMATS
+    from backend.legacy_import import import_legacy_assessments, import_legacy_results_db
+
+logger = logging.getLogger(__name__)
+
+disc_cli = AppGroup('disc', help="Comandos de manutenção dos resultados DISC.")
+
+
+@disc_cli.command('pack-responses')
+@click.option('--chunk-size', default=1000, show_default=True, help="Linhas por lote (cada lote é confirmado em separado).")
+def pack_responses_command(chunk_size: int):
+    """
+    Converte raw_responses_json das linhas existentes para o formato compacto.
+    Linhas que não podem ser codificadas sem perdas (ex: palavras de outro conjunto
+    de questões) continuam em JSON. Pode ser interrompido e executado de novo.
+    """
+    last_id, packed, kept = 0, 0, 0
+    while True:
+        rows = db.session.execute(
+            select(DISCResult.id, DISCResult.raw_responses_json)
+            .where(DISCResult.raw_responses_packed.is_(None),
+                   DISCResult.raw_responses_json.is_not(None),
+                   DISCResult.id > last_id)
+            .order_by(DISCResult.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+
+        params = []
+        for row_id, raw_json in rows:
+            try:
+                encoded = encode_responses(json_decoder.decode(raw_json))
+            except (msgspec.DecodeError, ValueError, TypeError):
+                encoded = None
+            if encoded is None:
+                kept += 1
+                continue
+            params.append({'id': row_id, 'raw_responses_packed': encoded,
+                           'raw_responses_json': None, 'question_set_version': QUESTION_SET_VERSION})
+        if params:
+            # UPDATE em lote por chave primária (ORM bulk update)
+            db.session.execute(update(DISCResult), params)
+        db.session.commit()
+        packed += len(params)
+        last_id = rows[-1].id
+        click.echo(f"... {packed} linha(s) compactadas até o ID {last_id}")
+
+    click.echo(f"Concluído: {packed} linha(s) compactadas, {kept} mantida(s) em JSON.")
+
+
+@disc_cli.command('refresh-stats')
+@click.option('--chunk-size', default=5000, show_default=True, help="Resultados por lote (cada lote é confirmado em separado).")
+@click.option('--lag-seconds', default=None, type=float, help="Ignora resultados mais recentes que isto (padrão: STATS_REFRESH_LAG_SECONDS).")
+def refresh_stats_command(chunk_size: int, lag_seconds):
+    """
+    Inclui os resultados novos nos agregados diários (disc_daily_stats). Incremental:
+    a primeira execução processa todo o histórico; as seguintes, só o que chegou
+    depois. Pode rodar periodicamente (cron) e ser interrompido.
+    """
+    if lag_seconds is None:
+        lag_seconds = float(current_app.config.get('STATS_REFRESH_LAG_SECONDS', 30))
+    try:
+        count = refresh_daily_stats(chunk_size=chunk_size, lag_seconds=lag_seconds)
+    except StatsRefreshConflict as e:
+        raise click.ClickException(f"Outra atualização dos agregados está em andamento ({e}).")
+    click.echo(f"Concluído: {count} resultado(s) incluídos nos agregados diários.")
+
+
+@disc_cli.command('export-results')
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='ndjson', show_default=True)
+@click.option('--output', '-o', type=click.File('wb'), default='-', help="Arquivo de saída (padrão: stdout).")
+@click.option('--since-id', type=int, default=None, help="Exporta só resultados com ID maior que este (marca d'água).")
+@click.option('--since', type=click.DateTime(), default=None, help="Exporta só resultados a partir desta data/hora.")
+@click.option('--include-raw', is_flag=True, help="Inclui as respostas brutas decodificadas.")
+@click.option('--yield-per', default=1000, show_default=True, help="Linhas lidas do cursor por lote.")
+@click.option('--lag-seconds', default=None, type=float, help="Para antes dos resultados mais recentes que isto (padrão: EXPORT_LAG_SECONDS).")
+def export_results_command(fmt: str, output, since_id, since, include_raw: bool, yield_per: int, lag_seconds):
+    """
+    Exporta os resultados (em ordem de ID) como NDJSON ou CSV, em fluxo e com memória
+    constante. Para cargas incrementais, guarde o maior 'id' exportado e passe-o em
+    --since-id na próxima execução: resultados mais novos que --lag-seconds (e os que
+    vêm depois deles) ficam para essa execução, então nenhuma transação ainda aberta
+    é pulada.
+    """
+    if lag_seconds is None:
+        lag_seconds = float(current_app.config.get('EXPORT_LAG_SECONDS', 30))
+    stmt = export_statement(since_id, since, include_raw, lag_seconds).execution_options(yield_per=yield_per)
+    rows = db.session.execute(stmt)
+    try:
+        for chunk in stream_export(rows, fmt, include_raw):
+            output.write(chunk)
+    finally:
+        rows.close()
+    output.flush()
+
+
+@disc_cli.command('import-legacy')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--source', default=None, help="Rótulo da origem nas chaves dos registros (padrão: nome do arquivo).")
+@click.option('--chunk-size', default=500, show_default=True, help="Registros por lote (cada lote é confirmado em separado).")
+@click.option('--report', type=click.File('w', encoding='utf-8'), default=None, help="Grava o resumo (com as rejeições) em JSON.")
+def import_legacy_command(path: str, source, chunk_size: int, report):
+    """
+    Importa avaliações legadas no formato de letras (backend/data/assessments.json)
+    para disc_results, recalculando os scores. Pode ser interrompido e executado de
+    novo com a mesma origem: retoma após o último registro importado.
+    """
+    source = source or os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, encoding='utf-8') as stream:
+            summary = import_legacy_assessments(stream, source, chunk_size=chunk_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    _echo_import_summary(summary, report)
+
+
+@disc_cli.command('import-legacy-db')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--source', default=None, help="Rótulo da origem nas chaves dos registros (padrão: nome do arquivo).")
+@click.option('--chunk-size', default=500, show_default=True, help="Linhas lidas e gravadas por lote (cada lote é confirmado em separado).")
+@click.option('--source-tz', default=None, help="Fuso em que o disc.db gravou created_at (ex.: America/Sao_Paulo; padrão: fuso local desta máquina).")
+@click.option('--report', type=click.File('w', encoding='utf-8'), default=None, help="Grava o resumo (com as rejeições) em JSON.")
+def import_legacy_db_command(path: str, source, chunk_size: int, source_tz, report):
+    """
+    Migra o banco sqlite3 avulso de models/results.py (disc.db) para disc_results,
+    recalculando os scores. Pode ser interrompido e executado de novo com a mesma
+    origem: retoma após o último ID migrado. O created_at, gravado em horário local,
+    é convertido para UTC (fuso de --source-tz ou, na falta, o desta máquina).
+    """
+    source = source or os.path.splitext(os.path.basename(path))[0]
+    try:
+        summary = import_legacy_results_db(path, source, chunk_size=chunk_size, source_tz=source_tz)
+    except (sqlite3.Error, ValueError) as e:
+        raise click.ClickException(f"Falha ao migrar '{path}': {e}")
+    _echo_import_summary(summary, report)
+
+
+def _echo_import_summary(summary, report) -> None:
+    """Mostra o resumo de uma importação legada e, se pedido, grava-o em JSON."""
+    if report is not None:
+        json.dump(summary, report, ensure_ascii=False, indent=2)
+    click.echo(f"Concluído: {summary['read']} registro(s) lido(s), {summary['imported']} importado(s), "
+               f"{summary['rejected']} rejeitado(s) (retomado a partir do registro {summary['resumed_from']}).")
+    for reason, count in summary['rejections_by_reason'].items():
+        click.echo(f"  {count} x {reason}")
+
+
+def init_cli(app) -> None:
+    """Registra os comandos 'flask disc ...' na aplicação."""
+    app.cli.add_command(disc_cli)
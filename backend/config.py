@@ -3,6 +3,7 @@
 # backend/config.py
 import os
 import secrets
+import tempfile
 from dotenv import load_dotenv
 
 # Determina o diretório base do projeto
@@ -28,6 +29,65 @@ class BaseConfig:
     SESSION_COOKIE_HTTPONLY = True
     REMEMBER_COOKIE_SECURE = True
     REMEMBER_COOKIE_HTTPONLY = True
+    # Número máximo de submissões aceitas por chamada a /api/calculate/batch
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 2000))
+    # Cache em disco (LRU) dos PDFs gerados; padrão: instance/pdf_cache, 256 MB
+    PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR') or os.path.join(instance_dir, 'pdf_cache')
+    PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    # Renderização de PDFs fora das threads do gunicorn (processos por worker; 0 = na própria thread)
+    PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', 1))
+    # Jobs na fila por worker antes de responder 503
+    PDF_RENDER_MAX_PENDING = int(os.environ.get('PDF_RENDER_MAX_PENDING', 8))
+    # Quanto /download_pdf espera pelo render antes de responder 202 com a URL de status
+    # (curto: a thread do gunicorn fica parada enquanto espera)
+    PDF_RENDER_WAIT_SECONDS = float(os.environ.get('PDF_RENDER_WAIT_SECONDS', 1))
+    # Marcadores de job no diretório do cache: '.pending' abandonado após este tempo e
+    # por quanto tempo uma falha é informada antes de permitir nova tentativa
+    PDF_RENDER_PENDING_TTL_SECONDS = float(os.environ.get('PDF_RENDER_PENDING_TTL_SECONDS', 120))
+    PDF_RENDER_FAILURE_TTL_SECONDS = float(os.environ.get('PDF_RENDER_FAILURE_TTL_SECONDS', 300))
+    # Cache compartilhado entre workers (L2 do backend/cache.py): 'filesystem', 'redis' ou 'null'
+    CACHE_L2_BACKEND = os.environ.get('CACHE_L2_BACKEND', 'filesystem').lower()
+    CACHE_L2_DIR = os.environ.get('CACHE_L2_DIR') or os.path.join(instance_dir, 'shared_cache')
+    CACHE_L2_THRESHOLD = int(os.environ.get('CACHE_L2_THRESHOLD', 10000))  # Máx. de arquivos (filesystem)
+    CACHE_L2_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_L2_DEFAULT_TIMEOUT', 900))
+    CACHE_L2_REDIS_URL = os.environ.get('CACHE_L2_REDIS_URL', 'redis://localhost:6379/0')
+    # Cache em memória (L1 por processo + L2) dos resultados hidratados usados por /results e pelo PDF
+    RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 1024))
+    RESULT_CACHE_TTL_SECONDS = float(os.environ.get('RESULT_CACHE_TTL_SECONDS', 900))
+    # Gravação em grupo de /api/calculate (opt-in): um INSERT/commit por lote de até
+    # WRITE_BEHIND_MAX_BATCH linhas ou WRITE_BEHIND_MAX_DELAY_MS de espera
+    WRITE_BEHIND_ENABLED = os.environ.get('WRITE_BEHIND_ENABLED', 'false').lower() in ('true', '1', 'yes')
+    WRITE_BEHIND_MAX_BATCH = int(os.environ.get('WRITE_BEHIND_MAX_BATCH', 200))
+    WRITE_BEHIND_MAX_DELAY_MS = float(os.environ.get('WRITE_BEHIND_MAX_DELAY_MS', 5))
+    WRITE_BEHIND_QUEUE_SIZE = int(os.environ.get('WRITE_BEHIND_QUEUE_SIZE', 2000))
+    # Quanto a requisição espera pelo commit do lote antes de responder 503
+    WRITE_BEHIND_TIMEOUT_SECONDS = float(os.environ.get('WRITE_BEHIND_TIMEOUT_SECONDS', 10))
+    # Submissões idempotentes (Idempotency-Key): por quanto tempo a chave fica em cache
+    # (depois disso a repetição ainda é detectada pelo índice único no banco)
+    IDEMPOTENCY_TTL_SECONDS = float(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 3600))
+    IDEMPOTENCY_CACHE_MAX_ENTRIES = int(os.environ.get('IDEMPOTENCY_CACHE_MAX_ENTRIES', 4096))
+    # Embute as questões no quiz.html (sem isso, o script.js busca /api/questions)
+    QUIZ_INLINE_QUESTIONS = os.environ.get('QUIZ_INLINE_QUESTIONS', 'true').lower() in ('true', '1', 'yes')
+    # Token (Bearer) da API administrativa /api/admin; sem ele a API fica desabilitada
+    ADMIN_API_TOKEN = os.environ.get('ADMIN_API_TOKEN')
+    # Tamanho máximo de página de /api/admin/results
+    ADMIN_RESULTS_MAX_PAGE_SIZE = int(os.environ.get('ADMIN_RESULTS_MAX_PAGE_SIZE', 500))
+    # Agregados diários (disc_daily_stats): atualizados por 'flask disc refresh-stats' (cron);
+    # /api/admin/stats só lê. Com STATS_REFRESH_ON_READ, a leitura inclui antes no máximo
+    # um lote de STATS_REFRESH_CHUNK_SIZE resultados. Resultados mais novos que o atraso
+    # entram na próxima atualização
+    STATS_REFRESH_ON_READ = os.environ.get('STATS_REFRESH_ON_READ', 'false').lower() in ('true', '1', 'yes')
+    STATS_REFRESH_CHUNK_SIZE = int(os.environ.get('STATS_REFRESH_CHUNK_SIZE', 5000))
+    STATS_REFRESH_LAG_SECONDS = float(os.environ.get('STATS_REFRESH_LAG_SECONDS', 30))
+    # Exportação em lote: exportações ZIP simultâneas por processo (renderizam no pool da fila
+    # de PDFs, PDF_RENDER_WORKERS), PDFs em andamento e linhas por lote do cursor
+    EXPORT_MAX_CONCURRENT = int(os.environ.get('EXPORT_MAX_CONCURRENT', 1))
+    EXPORT_RENDER_WINDOW = int(os.environ.get('EXPORT_RENDER_WINDOW', 8))
+    EXPORT_YIELD_PER = int(os.environ.get('EXPORT_YIELD_PER', 200))
+    # Tamanho aproximado dos blocos enviados pela exportação NDJSON/CSV
+    EXPORT_CHUNK_BYTES = int(os.environ.get('EXPORT_CHUNK_BYTES', 64 * 1024))
+    # A exportação de resultados para antes dos resultados mais novos que isto (transações ainda abertas)
+    EXPORT_LAG_SECONDS = float(os.environ.get('EXPORT_LAG_SECONDS', 30))
 
 class DevelopmentConfig(BaseConfig):
     """Configuração para o ambiente de desenvolvimento local."""
@@ -51,6 +111,14 @@ class TestingConfig(BaseConfig):
     TESTING = True
     SECRET_KEY = 'testing-secret-key'
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Caches em disco fora do repositório (tests/conftest.py usa um diretório temporário por sessão)
+    PDF_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'disc_pdf_cache_testing')
+    CACHE_L2_DIR = os.path.join(tempfile.gettempdir(), 'disc_shared_cache_testing')
+    PDF_RENDER_WORKERS = 0
+    ADMIN_API_TOKEN = 'testing-admin-token'
+    CACHE_L2_BACKEND = 'null'  # IDs se repetem entre testes (banco recriado)
+    STATS_REFRESH_LAG_SECONDS = 0
+    EXPORT_LAG_SECONDS = 0
 
 
 class ProductionConfig(BaseConfig):
@@ -1,6 +1,10 @@
 # backend/disc_data.py
 
+import hashlib
+import json
 import logging
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 
 # Cria um logger específico para este módulo
 logger = logging.getLogger(__name__)
@@ -114,7 +118,57 @@ disc_questions = [
 ]
 
 
-# --- Funções auxiliares (sem alterações da versão anterior) ---
+# --- Índice compilado palavra -> perfil ---
+# Ordem canônica dos fatores (também usada para desempates e codificação numérica)
+PROFILE_KEYS = ('D', 'I', 'S', 'C')
+
+def normalize_word(word: str) -> str:
+    """
+    Normaliza uma palavra para comparação: remove o conteúdo a partir de '(',
+    espaços extras e diferenças de maiúsculas/minúsculas (ex: " Determinado(a)" -> "determinado").
+    """
+    return word.split('(')[0].strip().lower()
+
+def _build_word_profile_index(questions) -> Mapping[Tuple[int, str], str]:
+    """
+    Constrói o índice imutável {(id_questão, palavra_normalizada): perfil}.
+    Em caso de palavra duplicada na mesma questão mantém o primeiro perfil
+    (mesmo comportamento da busca linear antiga); validate_disc_data reporta o erro.
+    """
+    index: Dict[Tuple[int, str], str] = {}
+    for question in questions:
+        q_id = question.get('id')
+        if not isinstance(q_id, int):
+            continue
+        for profile in PROFILE_KEYS:
+            word = question.get(profile)
+            if isinstance(word, str):
+                index.setdefault((q_id, normalize_word(word)), profile)
+    return MappingProxyType(index)
+
+# Construídos uma única vez na importação do módulo
+word_profile_index = _build_word_profile_index(disc_questions)
+# Atalho para a palavra exatamente como está em disc_questions (caso comum: frontend e
+# arquivos exportados), sem normalize_word; mesmo perfil que word_profile_index
+_exact_word_profile_index = MappingProxyType({
+    (q['id'], q[profile]): word_profile_index[(q['id'], normalize_word(q[profile]))]
+    for q in disc_questions if isinstance(q.get('id'), int)
+    for profile in PROFILE_KEYS if isinstance(q.get(profile), str)
+})
+_questions_by_id = MappingProxyType({q['id']: q for q in disc_questions if isinstance(q.get('id'), int)})
+# Posição (0..N-1) de cada questão, usada na codificação matricial do score em lote
+question_slots = MappingProxyType({q_id: slot for slot, q_id in enumerate(_questions_by_id)})
+
+
+def _question_set_version(questions) -> str:
+    """Hash curto do conjunto de questões (IDs, palavras e ordem). Muda se qualquer questão mudar."""
+    canonical = json.dumps(questions, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+# Versão do conjunto de questões contra o qual cada resultado é calculado/codificado
+QUESTION_SET_VERSION = _question_set_version(disc_questions)
+
+
 def get_question_by_id(question_id):
     """Retorna o dicionário da questão com o ID fornecido."""
     try:
@@ -123,50 +177,34 @@ def get_question_by_id(question_id):
         logger.warning(f"ID de questão inválido recebido: {question_id}. Não é um inteiro.")
         return None
 
-    for question in disc_questions:
-        if question.get('id') == target_id:
-            return question
-    logger.warning(f"Questão com ID {target_id} não encontrada em disc_questions.")
-    return None
+    question = _questions_by_id.get(target_id)
+    if question is None:
+        logger.warning(f"Questão com ID {target_id} não encontrada em disc_questions.")
+    return question
 
 def get_profile_for_word(question_id, selected_word):
     """
     Retorna o perfil (D, I, S, C) para uma palavra específica em uma questão,
-    ignorando maiúsculas/minúsculas e espaços extras.
+    ignorando maiúsculas/minúsculas e espaços extras. Consulta O(1) em word_profile_index.
     """
-    question = get_question_by_id(question_id)
-    if not question:
+    try:
+        target_id = int(question_id)
+    except (ValueError, TypeError):
+        logger.warning(f"ID de questão inválido recebido: {question_id}. Não é um inteiro.")
         return None
 
     if not selected_word or not isinstance(selected_word, str):
         logger.warning(f"Palavra selecionada inválida para Q{question_id}: {selected_word}")
         return None
 
-    # Normaliza a palavra selecionada
-    normalized_selected_word = selected_word.strip().lower()
-
-    found_profiles = []
-
-    for profile, word_in_data in question.items():
-        if profile in ['D', 'I', 'S', 'C'] and isinstance(word_in_data, str):
-            # Normaliza a palavra dos dados da questão
-            # Remove parênteses e conteúdo para normalização (ex: "Determinado(a)" -> "determinado")
-            word_to_normalize = word_in_data.split('(')[0].strip()
-            normalized_word_in_data = word_to_normalize.lower()
-            if normalized_word_in_data == normalized_selected_word:
-                found_profiles.append(profile)
-
-    # Tratamento de Múltiplos Matches (não deve ocorrer com os dados validados)
-    if len(found_profiles) == 1:
-        return found_profiles[0]
-    elif len(found_profiles) > 1:
-        # Log de erro caso a validação falhe ou não seja executada
-        logger.error(f"ERRO NOS DADOS (inesperado)! Q{question_id}: Palavra '{selected_word}' encontrada para múltiplos perfis: {found_profiles}. Retornando o primeiro ({found_profiles[0]}). VERIFICAR disc_questions!")
-        return found_profiles[0]
-    else:
-        # Log é feito no score_calculator se a palavra não for encontrada lá
-        # logger.warning(f"Q{question_id}: NENHUM perfil encontrado para a palavra '{selected_word}' (normalizada: '{normalized_selected_word}').")
-        return None
+    profile = _exact_word_profile_index.get((target_id, selected_word))
+    if profile is not None:
+        return profile
+    profile = word_profile_index.get((target_id, normalize_word(selected_word)))
+    if profile is None and target_id not in _questions_by_id:
+        logger.warning(f"Questão com ID {target_id} não encontrada em disc_questions.")
+    # Se a palavra não for encontrada o log é feito no score_calculator
+    return profile
 
 # --- Função de validação inicial dos dados (sem alterações) ---
 def validate_disc_data():
@@ -212,7 +250,7 @@ def validate_disc_data():
                  continue
 
             # Normaliza removendo parênteses para validação de duplicação
-            normalized_word = word.split('(')[0].strip().lower()
+            normalized_word = normalize_word(word)
             if not normalized_word: # Checa se sobrou algo após normalização
                  logger.error(f"Erro nos dados: Q{q_id}, Perfil {profile}, palavra resultou em string vazia após normalização: '{word}'")
                  valid = False
@@ -237,6 +275,19 @@ def validate_disc_data():
              logger.error(msg + f" Encontrados: {profiles_in_question}")
              valid = False
 
+    # Verifica se o índice compilado cobre exatamente as palavras de cada questão
+    for question in disc_questions:
+        q_id = question.get('id')
+        for profile in PROFILE_KEYS:
+            word = question.get(profile)
+            if isinstance(q_id, int) and isinstance(word, str) and word_profile_index.get((q_id, normalize_word(word))) != profile:
+                logger.error(f"Erro no índice: Q{q_id}, palavra '{word}' não mapeia para o perfil {profile} em word_profile_index.")
+                valid = False
+    expected_index_size = len(PROFILE_KEYS) * question_count
+    if len(word_profile_index) != expected_index_size:
+        logger.error(f"Erro no índice: word_profile_index tem {len(word_profile_index)} entradas, esperado {expected_index_size}.")
+        valid = False
+
     # Verifica se todos os IDs de 1 a 28 estão presentes (se o número de questões for 28)
     if question_count == 28:
         expected_ids = set(range(1, 29))
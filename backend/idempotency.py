@@ -0,0 +1,77 @@
+# backend/idempotency.py
+
+"""
+Submissões idempotentes de /api/calculate.
+
+O cliente envia uma chave única por tentativa de teste (cabeçalho
+'Idempotency-Key' ou campo 'idempotencyKey' do payload). A chave é gravada na
+linha (índice único) e lembrada por IDEMPOTENCY_TTL_SECONDS num TieredCache
+(memória + cache compartilhado). Uma submissão repetida (ex: retry numa conexão
+móvel instável) recebe o result_id já existente, sem recalcular nem inserir.
+"""
+import logging
+import re
+from typing import Any, Optional
+
+from flask import current_app
+from sqlalchemy import select
+
+try:
+    from .cache import TieredCache
+    from .db import db
+    from .models.disc_result import DISCResult
+except ImportError:
+    from backend.cache import TieredCache
+    from backend.db import db
+    from backend.models.disc_result import DISCResult
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_FIELD = 'idempotencyKey'
+# UUIDs e chaves opacas equivalentes; limitado ao tamanho da coluna. Chaves com '/' ficam
+# reservadas para uso interno (importação legada, backend/legacy_import.py)
+_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{8,64}$')
+
+
+def normalize_idempotency_key(value: Any) -> Optional[str]:
+    """Retorna a chave (sem espaços nas bordas) ou None se ausente. Levanta ValueError se inválida."""
+    if value is None:
+        return None
+    if not isinstance(value, str) or not _KEY_PATTERN.match(value.strip()):
+        raise ValueError("Chave de idempotência inválida (use 8 a 64 caracteres: letras, números, '-', '_', '.', ':').")
+    return value.strip()
+
+
+def find_result_id(key: str) -> Optional[int]:
+    """ID do resultado já gravado com a chave: do cache ou, na falta, do índice único."""
+    cache = get_idempotency_cache()
+    result_id = cache.get(key)
+    if result_id is not None:
+        return result_id
+    result_id = db.session.scalar(select(DISCResult.id).where(DISCResult.idempotency_key == key))
+    if result_id is not None:
+        cache.set(key, result_id)
+    return result_id
+
+
+def remember_result_id(key: str, result_id: int) -> None:
+    """Registra a chave de uma submissão recém-gravada."""
+    get_idempotency_cache().set(key, result_id)
+
+
+def init_idempotency(app) -> TieredCache:
+    """Cria o cache de chaves da aplicação (IDEMPOTENCY_CACHE_MAX_ENTRIES / IDEMPOTENCY_TTL_SECONDS)."""
+    cache = TieredCache(
+        'idempotency',
+        max_entries=int(app.config.get('IDEMPOTENCY_CACHE_MAX_ENTRIES', 4096)),
+        ttl_seconds=float(app.config.get('IDEMPOTENCY_TTL_SECONDS', 3600)),
+        shared=app.extensions.get('shared_cache')
+    )
+    app.extensions['idempotency_cache'] = cache
+    return cache
+
+
+def get_idempotency_cache() -> TieredCache:
+    """Retorna o cache de chaves de idempotência da aplicação atual."""
+    return current_app.extensions['idempotency_cache']
@@ -2,7 +2,7 @@
 import json
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -56,4 +56,49 @@ def get_professional_secondary_data() -> Optional[Dict[str, Any]]:
     # ATENÇÃO: O nome do arquivo deve corresponder ao JSON criado a partir de perfis_profissionais_secundarios.md
     return _load_json_data('professional_secondary_combinations.json') # Nome exemplo
 
-# Adicione aqui funções para carregar outros JSONs se necessário
\ No newline at end of file
+# Adicione aqui funções para carregar outros JSONs se necessário
+
+# --- Verificação de cobertura das combinações ---
+DISC_TYPES = ('D', 'I', 'S', 'C')
+INTENSITY_LEVELS = ('moderate', 'significant', 'high')
+
+def find_missing_combinations() -> Dict[str, List[Tuple[str, ...]]]:
+    """
+    Lista as combinações sem interpretação em cada arquivo JSON:
+    (tipo, nível) para os primários e (tipo, nível, secundário) para as combinações.
+    """
+    primary_sources = {
+        'general_primary.json': get_general_primary_data(),
+        'professional_primary.json': get_professional_primary_data(),
+    }
+    secondary_sources = {
+        'general_secondary_combinations.json': get_general_secondary_data(),
+        'professional_secondary_combinations.json': get_professional_secondary_data(),
+    }
+    missing: Dict[str, List[Tuple[str, ...]]] = {}
+    for filename, data in primary_sources.items():
+        data = data or {}
+        missing[filename] = [
+            (primary, level) for primary in DISC_TYPES for level in INTENSITY_LEVELS
+            if level not in (data.get(primary) or {})
+        ]
+    for filename, data in secondary_sources.items():
+        data = data or {}
+        missing[filename] = [
+            (primary, level, secondary)
+            for primary in DISC_TYPES for level in INTENSITY_LEVELS for secondary in DISC_TYPES
+            if secondary != primary and secondary not in (data.get(f"{primary}_{level}") or {})
+        ]
+    return missing
+
+def report_missing_combinations() -> int:
+    """Loga (na inicialização) as combinações ausentes nos JSONs. Retorna o total ausente."""
+    total_missing = 0
+    for filename, combinations in find_missing_combinations().items():
+        if combinations:
+            total_missing += len(combinations)
+            logger.warning(f"{filename}: {len(combinations)} combinação(ões) sem interpretação: {combinations}")
+    if total_missing == 0:
+        logger.info("Todas as combinações primário/nível/secundário possuem interpretação nos JSONs.")
+    return total_missing
+
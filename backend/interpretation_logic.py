@@ -1,6 +1,9 @@
 # backend/interpretation_logic.py
+import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 
 # Importa o loader e outras dependências se necessário
 try:
@@ -8,7 +11,10 @@ try:
         get_general_primary_data,
         get_general_secondary_data,
         get_professional_primary_data,
-        get_professional_secondary_data
+        get_professional_secondary_data,
+        report_missing_combinations,
+        DISC_TYPES,
+        INTENSITY_LEVELS
     )
     from .disc_data import disc_descriptions
 except ImportError:
@@ -18,13 +24,28 @@ except ImportError:
         get_general_primary_data,
         get_general_secondary_data,
         get_professional_primary_data,
-        get_professional_secondary_data
+        get_professional_secondary_data,
+        report_missing_combinations,
+        DISC_TYPES,
+        INTENSITY_LEVELS
     )
     from backend.disc_data import disc_descriptions
 
 logger = logging.getLogger(__name__)
 
 # --- Função Auxiliar de Intensidade (mantida) ---
+def intensity_level(score: int) -> str:
+    """
+    Faixa de intensidade de um score inteiro, sem logging (uso em lote, ex: colunas
+    d_level..c_level do DISCResult). Negativos contam como 'moderate'.
+    """
+    # Faixas confirmadas: 0-8, 9-15, 16+ (Ajuste se as faixas mudarem!)
+    if score >= 16:
+        return 'high'
+    if score >= 9:
+        return 'significant'
+    return 'moderate'
+
 def get_intensity_key(score: Optional[int]) -> Optional[str]:
     """
     Determina a chave de intensidade ('moderate', 'significant', 'high') com base na pontuação.
@@ -33,24 +54,144 @@ def get_intensity_key(score: Optional[int]) -> Optional[str]:
     if score is None:
         return None
 
-    # Faixas confirmadas: 0-8, 9-15, 16+ (Ajuste se as faixas mudarem!)
-    if 0 <= score <= 8:
-        return 'moderate'
-    elif 9 <= score <= 15:
-        return 'significant'
-    elif score >= 16:
-        return 'high'
-    else:
-        # Trata scores negativos ou outros inesperados como 'moderate' por segurança, mas loga
+    if score < 0 or score > 28: # Ajuste 28 se o máximo for outro
+        # Trata scores negativos ou outros inesperados pela faixa mais próxima, mas loga
         logger.warning(f"Pontuação inválida ou inesperada encontrada: {score}. Determinando nível baseado em 0 ou mais próximo.")
-        # Lógica de fallback para negativos (pode ajustar):
-        if score < 0: return 'moderate' # Ou a faixa mais baixa que fizer sentido
-        # Se por algum motivo score for > maximo esperado, considera high
-        if score > 28: return 'high' # Ajuste 28 se o máximo for outro
-        # Fallback geral
-        return 'moderate'
+    return intensity_level(score)
+
+# --- Composição das interpretações (independente dos scores) ---
+
+def _compose_interpretations(
+    primary_type: str,
+    primary_level_key: str,
+    secondary_type: Optional[str],
+    secondary_intensity_level: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Monta as interpretações gerais e profissionais de uma combinação
+    (primário, nível, secundário, nível secundário). Os campos 'score' ficam com
+    None e são preenchidos por get_all_interpretations com os scores do resultado.
+    """
+    all_interpretations: Dict[str, Any] = {
+        'general': {'primary': {}, 'secondary': {}},
+        'professional': {'primary': {}, 'secondary': {}}
+    }
+
+    gen_primary_data = get_general_primary_data()
+    gen_secondary_data = get_general_secondary_data()
+    prof_primary_data = get_professional_primary_data()
+    prof_secondary_data = get_professional_secondary_data()
+
+    # Geral Primário
+    if gen_primary_data and primary_type in gen_primary_data and primary_level_key in gen_primary_data[primary_type]:
+        all_interpretations['general']['primary'] = gen_primary_data[primary_type][primary_level_key].copy()
+        all_interpretations['general']['primary']['type'] = primary_type
+        all_interpretations['general']['primary']['level'] = primary_level_key
+        all_interpretations['general']['primary']['score'] = None
+        all_interpretations['general']['primary']['title'] = disc_descriptions.get(primary_type, {}).get('title', primary_type)
+    else:
+        logger.warning(f"Dados gerais primários não encontrados para {primary_type} - {primary_level_key}")
+
+    # Profissional Primário
+    if prof_primary_data and primary_type in prof_primary_data and primary_level_key in prof_primary_data[primary_type]:
+        all_interpretations['professional']['primary'] = prof_primary_data[primary_type][primary_level_key].copy()
+        all_interpretations['professional']['primary']['type'] = primary_type
+        all_interpretations['professional']['primary']['level'] = primary_level_key
+    else:
+        logger.warning(f"Dados profissionais primários não encontrados para {primary_type} - {primary_level_key}")
+
+    if not secondary_type:
+        return all_interpretations
+
+    # Chave para os dados de combinação secundária USA o nível do PRIMÁRIO (ex: "D_high");
+    # a chave secundária é APENAS o TIPO secundário (ex: "C")
+    primary_combination_key = f"{primary_type}_{primary_level_key}"
+    secondary_lookup_key = secondary_type
+
+    # Geral Secundário (Combinação)
+    if gen_secondary_data and primary_combination_key in gen_secondary_data and secondary_lookup_key in gen_secondary_data[primary_combination_key]:
+        secondary_interpretation_data = gen_secondary_data[primary_combination_key][secondary_lookup_key]
+
+        if isinstance(secondary_interpretation_data, str):
+            # Se for apenas um texto, coloca na chave 'Descrição'
+            all_interpretations['general']['secondary'] = {'Descrição': secondary_interpretation_data}
+        elif isinstance(secondary_interpretation_data, dict):
+            all_interpretations['general']['secondary'] = secondary_interpretation_data.copy()
+        else:
+            logger.error(f"Tipo inesperado ({type(secondary_interpretation_data)}) encontrado para interpretação secundária geral [{primary_combination_key}][{secondary_lookup_key}]")
+
+        if all_interpretations['general']['secondary']:
+            all_interpretations['general']['secondary']['type'] = secondary_type
+            all_interpretations['general']['secondary']['level'] = secondary_intensity_level # Nível do secundário (calculado)
+            all_interpretations['general']['secondary']['score'] = None
+            all_interpretations['general']['secondary']['title'] = disc_descriptions.get(secondary_type, {}).get('title', secondary_type)
+    else:
+        logger.warning(f"Dados gerais secundários (combinação) não encontrados em gen_secondary_data['{primary_combination_key}']['{secondary_lookup_key}']")
 
-# --- Função Principal Refatorada ---
+    # Profissional Secundário (Combinação)
+    if prof_secondary_data and primary_combination_key in prof_secondary_data and secondary_lookup_key in prof_secondary_data[primary_combination_key]:
+        secondary_prof_data = prof_secondary_data[primary_combination_key][secondary_lookup_key]
+
+        if isinstance(secondary_prof_data, dict):
+            all_interpretations['professional']['secondary'] = secondary_prof_data.copy()
+            all_interpretations['professional']['secondary']['type'] = secondary_type
+            all_interpretations['professional']['secondary']['level'] = secondary_intensity_level
+        else:
+            logger.error(f"Tipo inesperado ({type(secondary_prof_data)}) encontrado para interpretação secundária profissional [{primary_combination_key}][{secondary_lookup_key}]")
+    else:
+        logger.warning(f"Dados profissionais secundários (combinação) não encontrados em prof_secondary_data['{primary_combination_key}']['{secondary_lookup_key}']")
+
+    return all_interpretations
+
+
+# --- Tabela pré-calculada de todas as combinações ---
+# Chave: (primário, nível primário, secundário ou None, nível secundário ou None)
+InterpretationKey = Tuple[str, str, Optional[str], Optional[str]]
+
+def _freeze(value: Any) -> Any:
+    """Converte dicts/listas aninhados em MappingProxyType/tuplas (somente leitura)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def build_interpretation_table() -> Mapping[InterpretationKey, Mapping[str, Any]]:
+    """
+    Pré-calcula as interpretações de todas as combinações possíveis
+    (4 primários x 3 níveis x (3 secundários x 4 níveis secundários + sem secundário)).
+    """
+    report_missing_combinations()
+    secondary_levels: Tuple[Optional[str], ...] = INTENSITY_LEVELS + (None,)
+    table: Dict[InterpretationKey, Mapping[str, Any]] = {}
+    for primary_type in DISC_TYPES:
+        for primary_level in INTENSITY_LEVELS:
+            table[(primary_type, primary_level, None, None)] = _freeze(
+                _compose_interpretations(primary_type, primary_level, None, None)
+            )
+            for secondary_type in DISC_TYPES:
+                if secondary_type == primary_type:
+                    continue
+                for secondary_level in secondary_levels:
+                    table[(primary_type, primary_level, secondary_type, secondary_level)] = _freeze(
+                        _compose_interpretations(primary_type, primary_level, secondary_type, secondary_level)
+                    )
+    logger.info(f"Tabela de interpretações pré-calculada com {len(table)} combinações.")
+    return MappingProxyType(table)
+
+# Construída uma única vez na importação do módulo (inicialização da aplicação)
+interpretation_table = build_interpretation_table()
+
+
+def _with_score(section: Mapping[str, Any], score: Optional[int]) -> Dict[str, Any]:
+    """Cópia rasa de uma seção da tabela, preenchendo 'score' se a seção o possuir."""
+    data = dict(section)
+    if 'score' in data:
+        data['score'] = score
+    return data
+
+
+# --- Função Principal ---
 
 def get_all_interpretations(
     primary_type: Optional[str],
@@ -60,6 +201,7 @@ def get_all_interpretations(
     """
     Gera um dicionário completo com interpretações gerais e profissionais
     para os perfis primário e secundário, baseados em tipo e intensidade.
+    Consulta a tabela pré-calculada e apenas sobrepõe os scores do resultado.
 
     Args:
         primary_type: 'D', 'I', 'S', 'C' ou None/'?'.
@@ -71,129 +213,64 @@ def get_all_interpretations(
         'primary' e 'secondary' interpretations. Retorna estruturas vazias
         em caso de erro ou dados ausentes.
     """
-    all_interpretations = {
+    empty_interpretations = {
         'general': {'primary': {}, 'secondary': {}},
         'professional': {'primary': {}, 'secondary': {}}
     }
 
-    # Carrega todos os dados necessários no início
-    gen_primary_data = get_general_primary_data()
-    gen_secondary_data = get_general_secondary_data()
-    prof_primary_data = get_professional_primary_data()
-    prof_secondary_data = get_professional_secondary_data()
-
     # --- Validação e Cálculo de Níveis ---
-    if not primary_type or primary_type not in ['D', 'I', 'S', 'C']:
+    if not primary_type or primary_type not in DISC_TYPES:
         logger.error(f"Tipo primário inválido: {primary_type}. Não é possível gerar interpretações.")
-        return all_interpretations
+        return empty_interpretations
 
     primary_score = disc_scores.get(primary_type)
     primary_intensity_key = get_intensity_key(primary_score) # Ex: 'high'
 
     if not primary_intensity_key:
          logger.error(f"Não foi possível determinar a intensidade para o perfil primário {primary_type} com score {primary_score}.")
-         return all_interpretations # Não podemos prosseguir sem intensidade primária
+         return empty_interpretations # Não podemos prosseguir sem intensidade primária
 
-    logger.info(f"Gerando interpretações para Primário: {primary_type} ({primary_intensity_key}), Secundário: {secondary_type or 'Nenhum'}")
-
-    # --- Processamento Primário (sem alterações) ---
-    primary_key = primary_type # Ex: 'D'
-    primary_level_key = primary_intensity_key # Ex: 'high'
-
-    # Geral Primário
-    if gen_primary_data and primary_key in gen_primary_data and primary_level_key in gen_primary_data[primary_key]:
-        all_interpretations['general']['primary'] = gen_primary_data[primary_key][primary_level_key].copy()
-        all_interpretations['general']['primary']['type'] = primary_type
-        all_interpretations['general']['primary']['level'] = primary_level_key
-        all_interpretations['general']['primary']['score'] = primary_score
-        all_interpretations['general']['primary']['title'] = disc_descriptions.get(primary_type, {}).get('title', primary_type)
-    else:
-        logger.warning(f"Dados gerais primários não encontrados para {primary_key} - {primary_level_key}")
-
-    # Profissional Primário
-    if prof_primary_data and primary_key in prof_primary_data and primary_level_key in prof_primary_data[primary_key]:
-        all_interpretations['professional']['primary'] = prof_primary_data[primary_key][primary_level_key].copy()
-        all_interpretations['professional']['primary']['type'] = primary_type
-        all_interpretations['professional']['primary']['level'] = primary_level_key
-    else:
-        logger.warning(f"Dados profissionais primários não encontrados para {primary_key} - {primary_level_key}")
-
-
-    # --- Processamento Secundário (REVISADO CONFORME EXPLICAÇÃO) ---
-    if secondary_type and secondary_type in ['D', 'I', 'S', 'C'] and secondary_type != primary_type:
-        # Chave para os dados de combinação secundária USA o nível do PRIMÁRIO
-        primary_combination_key = f"{primary_type}_{primary_intensity_key}" # Ex: "D_high"
-        # Chave secundária é APENAS o TIPO secundário
-        secondary_lookup_key = secondary_type # Ex: "C"
-
-        # Calcula o score e nível secundário APENAS para informação adicional
+    secondary_score = None
+    secondary_intensity_level = None
+    if secondary_type and secondary_type in DISC_TYPES and secondary_type != primary_type:
         secondary_score = disc_scores.get(secondary_type)
         secondary_intensity_level = get_intensity_key(secondary_score)
+    else:
+        secondary_type = None
 
-        logger.info(f"Tentando encontrar interpretação secundária para combinação: Primário='{primary_combination_key}', Secundário (Tipo)='{secondary_lookup_key}'")
-
-        # Geral Secundário (Combinação) - LÓGICA DE BUSCA CORRIGIDA
-        if gen_secondary_data and primary_combination_key in gen_secondary_data and secondary_lookup_key in gen_secondary_data[primary_combination_key]:
-            # Pega o valor (texto ou objeto) associado a esta combinação
-            secondary_interpretation_data = gen_secondary_data[primary_combination_key][secondary_lookup_key]
-
-            # Monta o dicionário de resultado secundário geral
-            if isinstance(secondary_interpretation_data, str):
-                # Se for apenas um texto, coloca na chave 'Descrição'
-                all_interpretations['general']['secondary'] = {
-                    'Descrição': secondary_interpretation_data
-                }
-                logger.debug(f"Interpretação secundária geral encontrada como string para {primary_combination_key} + {secondary_lookup_key}")
-            elif isinstance(secondary_interpretation_data, dict):
-                # Se for um dicionário (mais flexível), copia ele
-                all_interpretations['general']['secondary'] = secondary_interpretation_data.copy()
-                logger.debug(f"Interpretação secundária geral encontrada como dict para {primary_combination_key} + {secondary_lookup_key}")
-            else:
-                logger.error(f"Tipo inesperado ({type(secondary_interpretation_data)}) encontrado para interpretação secundária geral [{primary_combination_key}][{secondary_lookup_key}]")
-                all_interpretations['general']['secondary'] = {} # Define como vazio em caso de tipo inesperado
-
-            # Adiciona informações extras SEMPRE, se o dict existir
-            if all_interpretations['general']['secondary'] is not None and isinstance(all_interpretations['general']['secondary'], dict):
-                all_interpretations['general']['secondary']['type'] = secondary_type
-                all_interpretations['general']['secondary']['level'] = secondary_intensity_level # Nível do secundário (calculado)
-                all_interpretations['general']['secondary']['score'] = secondary_score
-                all_interpretations['general']['secondary']['title'] = disc_descriptions.get(secondary_type, {}).get('title', secondary_type)
+    key = (primary_type, primary_intensity_key, secondary_type, secondary_intensity_level)
+    entry = interpretation_table.get(key)
+    if entry is None:
+        # Não deve ocorrer: a tabela cobre todas as combinações válidas
+        logger.error(f"Combinação {key} ausente da tabela de interpretações. Compondo sob demanda.")
+        entry = _freeze(_compose_interpretations(*key))
 
-        else:
-            logger.warning(f"Dados gerais secundários (combinação) não encontrados em gen_secondary_data['{primary_combination_key}']['{secondary_lookup_key}']")
-            # Garante que fique vazio se não encontrado
-            all_interpretations['general']['secondary'] = {}
-
-
-        # Profissional Secundário (Combinação) - LÓGICA DE BUSCA CORRIGIDA (ASSUMINDO MESMA ESTRUTURA DE CHAVE)
-        if prof_secondary_data and primary_combination_key in prof_secondary_data and secondary_lookup_key in prof_secondary_data[primary_combination_key]:
-             # Pega o objeto/dict profissional secundário
-             secondary_prof_data = prof_secondary_data[primary_combination_key][secondary_lookup_key]
-
-             if isinstance(secondary_prof_data, dict):
-                  all_interpretations['professional']['secondary'] = secondary_prof_data.copy()
-                  # Adiciona/Garante info extra
-                  all_interpretations['professional']['secondary']['type'] = secondary_type
-                  all_interpretations['professional']['secondary']['level'] = secondary_intensity_level
-                  # Não costuma precisar de title/score aqui, mas pode adicionar se necessário
-                  logger.debug(f"Interpretação secundária profissional encontrada como dict para {primary_combination_key} + {secondary_lookup_key}")
-             # Adapte aqui se o JSON profissional secundário for apenas uma string também
-             # elif isinstance(secondary_prof_data, str):
-             #      all_interpretations['professional']['secondary'] = {'Descrição': secondary_prof_data, ...}
-             else:
-                  logger.error(f"Tipo inesperado ({type(secondary_prof_data)}) encontrado para interpretação secundária profissional [{primary_combination_key}][{secondary_lookup_key}]")
-                  all_interpretations['professional']['secondary'] = {}
+    logger.debug(f"Interpretações para Primário: {primary_type} ({primary_intensity_key}), Secundário: {secondary_type or 'Nenhum'} ({secondary_intensity_level})")
 
-        else:
-            logger.warning(f"Dados profissionais secundários (combinação) não encontrados em prof_secondary_data['{primary_combination_key}']['{secondary_lookup_key}']")
-            # Garante que fique vazio se não encontrado
-            all_interpretations['professional']['secondary'] = {}
+    return {
+        'general': {
+            'primary': _with_score(entry['general']['primary'], primary_score),
+            'secondary': _with_score(entry['general']['secondary'], secondary_score),
+        },
+        'professional': {
+            'primary': dict(entry['professional']['primary']),
+            'secondary': dict(entry['professional']['secondary']),
+        }
+    }
 
-    # Garante que as chaves 'secondary' existam mesmo se não houve secundário válido
-    if 'secondary' not in all_interpretations['general']:
-        all_interpretations['general']['secondary'] = {}
-    if 'secondary' not in all_interpretations['professional']:
-        all_interpretations['professional']['secondary'] = {}
 
+_interpretation_fingerprint: Optional[str] = None
 
-    return all_interpretations
\ No newline at end of file
+def interpretation_fingerprint() -> str:
+    """
+    Hash do conteúdo da tabela de interpretações (JSONs + títulos de disc_descriptions).
+    Muda sempre que algum texto de interpretação muda; usado nas chaves de cache de PDFs.
+    """
+    global _interpretation_fingerprint
+    if _interpretation_fingerprint is None:
+        canonical = json.dumps(
+            [[list(key), entry] for key, entry in interpretation_table.items()],
+            default=dict, ensure_ascii=False, sort_keys=True
+        )
+        _interpretation_fingerprint = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    return _interpretation_fingerprint
@@ -0,0 +1,64 @@
+# backend/json_provider.py
+
+"""
+Provedor JSON da aplicação (app.json) baseado em msgspec.
+
+jsonify/app.json.response codificam direto para bytes, e request.get_json()
+decodifica com o decodificador msgspec, sem passar pelo módulo json da
+biblioteca padrão. Diferença em relação ao provedor padrão do Flask: datas e
+horas saem em ISO 8601 (o padrão usava o formato HTTP); as rotas já convertem
+timestamps com isoformat() antes de responder.
+"""
+import json
+from typing import Any, Union
+
+import msgspec
+from flask.json.provider import JSONProvider
+
+try:
+    from .schemas import json_decoder
+except ImportError:
+    from backend.schemas import json_decoder
+
+
+def _enc_hook(obj: Any) -> Any:
+    """Tipos que o msgspec não codifica nativamente (mesma convenção do provedor padrão)."""
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())  # Markup e afins
+    if isinstance(obj, str):
+        return str(obj)  # Subclasses de str
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+
+class MsgspecJSONProvider(JSONProvider):
+    """JSONProvider com codificação/decodificação msgspec."""
+
+    mimetype = 'application/json'
+
+    def __init__(self, app) -> None:
+        super().__init__(app)
+        self._encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Opções do módulo json (ex: sort_keys do filtro |tojson do Jinja)
+            kwargs.setdefault('default', _enc_hook)
+            return json.dumps(obj, **kwargs)
+        return self._encoder.encode(obj).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        try:
+            return json_decoder.decode(s)
+        except msgspec.DecodeError as e:
+            # request.get_json() trata ValueError como JSON inválido (400)
+            raise ValueError(str(e)) from e
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encoder.encode(obj) + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app) -> MsgspecJSONProvider:
+    """Instala o provedor msgspec em app.json (usado por jsonify, get_json e |tojson)."""
+    app.json = MsgspecJSONProvider(app)
+    return app.json
@@ -0,0 +1,370 @@
+# backend/legacy_import.py
+
+"""
+Importação dos dados legados para disc_results: as avaliações em letras
+(backend/data/assessments.json) e o banco sqlite3 avulso de models/results.py (disc.db).
+
+O formato legado (DISCAssessment, backend/models/disc.py) guarda as respostas
+por número de questão com letras: {"1": {"most": "A", "least": "D"}, ...}. Cada
+letra é mapeada por LETTER_TO_DISC para o fator e, daí, para a palavra desse
+fator na questão atual; as submissões resultantes são recalculadas em lote
+(calculate_disc_scores_batch) e gravadas com INSERT em lote, um commit por lote.
+
+O arquivo é lido de forma incremental (JSONDecoder.raw_decode sobre blocos de
+texto), aceitando um array JSON ou objetos concatenados/NDJSON, sem carregar o
+arquivo inteiro. Cada registro recebe a chave de idempotência
+'legacy/<origem>/<posição>': uma nova execução retoma após o último registro já
+gravado, e o índice único impede duplicatas mesmo se a execução anterior
+parou no meio de um lote. A '/' fica fora do padrão aceito de clientes
+(normalize_idempotency_key), então nenhuma submissão de /api/calculate gera,
+reutiliza ou atrapalha essas chaves.
+
+O disc.db é lido por uma única conexão somente leitura, em ordem de ID com
+fetchmany; as respostas (palavras ou letras) passam pelo mesmo recálculo em lote
+e a chave usa o ID da linha antiga como posição. O created_at do disc.db era
+gravado em horário local (datetime.now()); na migração ele é interpretado no fuso
+informado (padrão: o fuso desta máquina) e convertido para UTC, como os demais
+timestamps de disc_results.
+"""
+import json
+import logging
+import re
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone, tzinfo
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import func, insert, select
+
+try:
+    from .db import db
+    from .disc_data import disc_questions
+    from .models.disc import LETTER_TO_DISC
+    from .models.disc_result import DISCResult
+    from .score_calculator import calculate_disc_scores_batch, batch_result_dicts
+except ImportError:
+    from backend.db import db
+    from backend.disc_data import disc_questions
+    from backend.models.disc import LETTER_TO_DISC
+    from backend.models.disc_result import DISCResult
+    from backend.score_calculator import calculate_disc_scores_batch, batch_result_dicts
+
+logger = logging.getLogger(__name__)
+
+LEGACY_KEY_PREFIX = 'legacy'
+LEGACY_KEY_SEPARATOR = '/'  # Reservado: o padrão de chaves de clientes não aceita '/'
+_POSITION_DIGITS = 9
+# Amostras de rejeição guardadas no resumo (a contagem por motivo é sempre completa)
+MAX_REJECTION_SAMPLES = 100
+
+_QUESTIONS_BY_ID = {q['id']: q for q in disc_questions}
+_WHITESPACE = ' \t\r\n'
+
+
+class LegacyRecordError(ValueError):
+    """Registro legado que não pode ser importado (o motivo vai para o resumo)."""
+
+
+def iter_json_records(stream, chunk_chars: int = 64 * 1024) -> Iterator[Tuple[int, Any]]:
+    """
+    (posição, valor) de cada elemento de um array JSON (ou de objetos concatenados/NDJSON)
+    lido de stream em blocos de chunk_chars. Levanta ValueError se o arquivo estiver malformado.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    offset = 0          # Início do texto ainda não consumido em buffer
+    position = 0
+    in_array = None     # None = ainda não sabe se o arquivo é um array
+    expect_comma = False
+    eof = False
+    while True:
+        while True:
+            while offset < len(buffer) and buffer[offset] in _WHITESPACE:
+                offset += 1
+            if offset == len(buffer):
+                break
+            char = buffer[offset]
+            if in_array is None:
+                in_array = char == '['
+                offset += in_array
+                continue
+            if in_array and char == ']':
+                if buffer[offset + 1:].strip() or stream.read(1).strip():
+                    raise ValueError(f"Conteúdo após o fim do array JSON (elemento {position}).")
+                return
+            if expect_comma:
+                if char != ',':
+                    raise ValueError(f"',' esperada antes do elemento {position}.")
+                offset += 1
+                expect_comma = False
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, offset)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"JSON malformado no elemento {position}: {e}") from e
+                break  # Elemento incompleto: lê mais texto
+            yield position, value
+            position += 1
+            offset = end
+            expect_comma = in_array
+        buffer, offset = buffer[offset:], 0
+        if eof:
+            if in_array:
+                raise ValueError(f"Array JSON sem ']' final (após o elemento {position - 1}).")
+            return
+        chunk = stream.read(chunk_chars)
+        if not chunk:
+            eof = True
+        buffer += chunk
+
+
+def letter_answers(responses: Any) -> List[Dict[str, Any]]:
+    """
+    Converte as respostas legadas {número: {"most": letra, "least": letra}} em respostas
+    do formato atual ({'questionId', 'mais', 'menos'} com as palavras da questão).
+    """
+    if not isinstance(responses, dict) or not responses:
+        raise LegacyRecordError("'responses' ausente ou vazio")
+    answers = []
+    for number, answer in responses.items():
+        try:
+            question = _QUESTIONS_BY_ID[int(number)]
+        except (KeyError, ValueError, TypeError):
+            raise LegacyRecordError(f"questão desconhecida: {number!r}") from None
+        if not isinstance(answer, dict):
+            raise LegacyRecordError(f"resposta não é um objeto: questão {number}")
+        words = {}
+        for legacy_key, key in (('most', 'mais'), ('least', 'menos')):
+            factor = LETTER_TO_DISC.get(answer.get(legacy_key))
+            if factor is None:
+                raise LegacyRecordError(f"letra inválida: '{legacy_key}' da questão {number} = {answer.get(legacy_key)!r}")
+            words[key] = question[factor]
+        answers.append({'questionId': question['id'], **words})
+    return answers
+
+
+def _parse_timestamp(value: Any, naive_tz: Optional[tzinfo] = timezone.utc) -> Optional[datetime]:
+    """
+    Timestamp ISO 8601 (ou 'AAAA-MM-DD HH:MM:SS' do disc.db) em UTC sem tzinfo, como as
+    demais linhas de disc_results; None se ausente. Horários sem fuso são interpretados
+    em naive_tz (None = fuso local do sistema).
+    """
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise LegacyRecordError(f"timestamp inválido: {value!r}") from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=naive_tz) if naive_tz is not None else parsed.astimezone()
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _source_timezone(name: Optional[str]) -> Optional[tzinfo]:
+    """Fuso IANA (ex.: 'America/Sao_Paulo'); None para usar o fuso local do sistema."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Fuso horário desconhecido: {name!r}.") from None
+
+
+def _clean_text(value: Any) -> Optional[str]:
+    return (value.strip() or None) if isinstance(value, str) else None
+
+
+def _record_user(record: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Nome e email, se o registro tiver (DISCAssessment.to_dict grava 'name')."""
+    user_info = record.get('user_info') if isinstance(record.get('user_info'), dict) else {}
+    return _clean_text(user_info.get('name', record.get('name'))), _clean_text(user_info.get('email', record.get('email')))
+
+
+def legacy_key(source: str, position: int) -> str:
+    """Chave de idempotência do registro (ordenável pela posição), fora do espaço de chaves dos clientes."""
+    return LEGACY_KEY_SEPARATOR.join((LEGACY_KEY_PREFIX, source, f"{position:0{_POSITION_DIGITS}d}"))
+
+
+def _normalize_source(source: str) -> str:
+    """Rótulo da origem restrito a [A-Za-z0-9_.-], curto o bastante para caber na chave."""
+    cleaned = re.sub(r'[^A-Za-z0-9_.-]+', '-', source).strip('-')[:40]
+    if not cleaned:
+        raise ValueError("Nome de origem vazio para a importação legada.")
+    return cleaned
+
+
+def resume_position(source: str) -> int:
+    """
+    Posição do primeiro registro ainda não importado desta origem (0 se nenhum).
+    Chaves com o prefixo da origem mas sem uma posição numérica são ignoradas.
+    """
+    prefix = f"{LEGACY_KEY_PREFIX}{LEGACY_KEY_SEPARATOR}{source}{LEGACY_KEY_SEPARATOR}"
+    keys = db.session.scalars(
+        select(DISCResult.idempotency_key)
+        .where(DISCResult.idempotency_key.startswith(prefix, autoescape=True),
+               func.length(DISCResult.idempotency_key) == len(prefix) + _POSITION_DIGITS)
+        .order_by(DISCResult.idempotency_key.desc())
+    )
+    for key in keys:
+        position = key[len(prefix):]
+        if position.isascii() and position.isdigit():
+            return int(position) + 1
+    return 0
+
+
+class _ImportSummary:
+    def __init__(self, source: str, resumed_from: int):
+        self.source = source
+        self.resumed_from = resumed_from
+        self.read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.reasons: Counter = Counter()
+        self.samples: List[Dict[str, Any]] = []
+
+    def reject(self, position: int, reason: str) -> None:
+        self.rejected += 1
+        self.reasons[reason.split(':')[0]] += 1
+        if len(self.samples) < MAX_REJECTION_SAMPLES:
+            self.samples.append({'position': position, 'reason': reason})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'source': self.source,
+            'resumed_from': self.resumed_from,
+            'read': self.read,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'rejections_by_reason': dict(self.reasons),
+            'rejection_samples': self.samples,
+        }
+
+
+def _flush_chunk(pending: List[Tuple[int, List[Dict[str, Any]], Optional[datetime], Tuple]], summary: _ImportSummary) -> None:
+    """Recalcula o lote com o score em lote e grava as linhas válidas (um INSERT, um commit)."""
+    batch = calculate_disc_scores_batch([answers for _, answers, _, _ in pending])
+    rows = []
+    for (position, answers, timestamp, user), result_dict, valid_count in zip(
+            pending, batch_result_dicts(batch), batch.valid_counts.tolist()):
+        if result_dict is None or valid_count == 0:
+            summary.reject(position, "nenhuma resposta válida")
+            continue
+        row = DISCResult.row_values(user[0], user[1], answers, result_dict, legacy_key(summary.source, position))
+        if timestamp is not None:
+            row['timestamp'] = timestamp
+        rows.append(row)
+    if rows:
+        db.session.execute(insert(DISCResult), rows)
+    db.session.commit()
+    summary.imported += len(rows)
+    logger.info(f"Importação legada '{summary.source}': {summary.imported} registro(s) gravados até a posição {pending[-1][0]}.")
+
+
+def import_legacy_assessments(stream, source: str, chunk_size: int = 500) -> Dict[str, Any]:
+    """
+    Importa as avaliações legadas de stream (texto) para disc_results, retomando após o
+    último registro já importado desta origem. Retorna o resumo da importação
+    (lidos, importados, rejeitados por motivo e amostras das rejeições).
+    """
+    source = _normalize_source(source)
+    start = resume_position(source)
+    summary = _ImportSummary(source, start)
+    if start:
+        logger.info(f"Importação legada '{source}': retomando a partir do registro {start}.")
+
+    pending: List[Tuple[int, List[Dict[str, Any]], Optional[datetime], Tuple]] = []
+    for position, record in iter_json_records(stream):
+        if position < start:
+            continue
+        summary.read += 1
+        try:
+            if not isinstance(record, dict):
+                raise LegacyRecordError("registro não é um objeto")
+            pending.append((position, letter_answers(record.get('responses')), _parse_timestamp(record.get('timestamp')), _record_user(record)))
+        except LegacyRecordError as e:
+            summary.reject(position, str(e))
+            continue
+        if len(pending) >= chunk_size:
+            _flush_chunk(pending, summary)
+            pending = []
+    if pending:
+        _flush_chunk(pending, summary)
+
+    logger.info(f"Importação legada '{source}' concluída: {summary.imported} importado(s), {summary.rejected} rejeitado(s).")
+    return summary.to_dict()
+
+
+# --- Banco sqlite3 avulso (models/results.py, disc.db) ---
+
+# Nome gravado por save_results quando o usuário não se identificava
+LEGACY_ANONYMOUS_NAME = 'Anônimo'
+
+
+def legacy_db_answers(raw_answers: Any) -> List[Dict[str, Any]]:
+    """
+    Respostas da coluna 'answers' do disc.db no formato atual. Aceita a lista de
+    {'questionId', 'mais', 'menos'} (palavras) e o formato de letras, como dict por
+    número de questão ou lista de {'questionId', 'most', 'least'}.
+    """
+    try:
+        answers = json.loads(raw_answers) if isinstance(raw_answers, (str, bytes)) else raw_answers
+    except ValueError:
+        raise LegacyRecordError("'answers' não é JSON válido") from None
+    if isinstance(answers, dict):
+        return letter_answers(answers)
+    if not isinstance(answers, list) or not answers or not all(isinstance(a, dict) for a in answers):
+        raise LegacyRecordError("respostas em formato desconhecido")
+    if all('mais' in a and 'menos' in a for a in answers):
+        return [{'questionId': a.get('questionId', a.get('question_id')), 'mais': a['mais'], 'menos': a['menos']}
+                for a in answers]
+    if all('most' in a and 'least' in a for a in answers):
+        return letter_answers({a.get('questionId', a.get('question_id')): a for a in answers})
+    raise LegacyRecordError("respostas em formato desconhecido")
+
+
+def import_legacy_results_db(path: str, source: str, chunk_size: int = 500,
+                             source_tz: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Migra a tabela disc_results do disc.db (models/results.py) para disc_results,
+    recalculando os scores. Uma única conexão somente leitura, lida em blocos de
+    chunk_size linhas (fetchmany) por ordem de ID; retoma após o último ID já migrado.
+    O created_at (horário local de quem gravou) é lido no fuso source_tz (padrão: fuso
+    local do sistema) e gravado em UTC. Levanta sqlite3.Error se o arquivo não for um
+    disc.db legado e ValueError se o fuso for desconhecido.
+    """
+    source = _normalize_source(source)
+    created_tz = _source_timezone(source_tz)
+    start = resume_position(source)
+    summary = _ImportSummary(source, start)
+    if start:
+        logger.info(f"Migração do disc.db '{source}': retomando a partir do ID {start}.")
+
+    connection = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        cursor = connection.execute(
+            "SELECT id, user_name, email, answers, created_at FROM disc_results WHERE id >= ? ORDER BY id",
+            (start,)
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            pending: List[Tuple[int, List[Dict[str, Any]], Optional[datetime], Tuple]] = []
+            for legacy_id, user_name, email, raw_answers, created_at in rows:
+                summary.read += 1
+                user_name = _clean_text(user_name)
+                user = (None if user_name == LEGACY_ANONYMOUS_NAME else user_name, _clean_text(email))
+                try:
+                    pending.append((legacy_id, legacy_db_answers(raw_answers), _parse_timestamp(created_at, created_tz), user))
+                except LegacyRecordError as e:
+                    summary.reject(legacy_id, str(e))
+            if pending:
+                _flush_chunk(pending, summary)
+    finally:
+        connection.close()
+
+    logger.info(f"Migração do disc.db '{source}' concluída: {summary.imported} importado(s), {summary.rejected} rejeitado(s).")
+    return summary.to_dict()
@@ -1,4 +1,13 @@
 # Modelo de avaliação DISC 
+
+# Mapeamento de letra para fator DISC (formato legado {"most": "A", "least": "D"})
+LETTER_TO_DISC = {
+    'A': 'D',  # Dominância
+    'B': 'I',  # Influência
+    'C': 'S',  # Estabilidade
+    'D': 'C'   # Conformidade
+}
+
 class DISCAssessment:
     """
     Modelo para representar uma avaliação DISC.
@@ -26,14 +35,6 @@ class DISCAssessment:
     
     def calculate_scores(self):
         """Calcula as pontuações DISC com base nas respostas"""
-        # Mapeamento de letra para fator DISC
-        letter_to_disc = {
-            'A': 'D',  # Dominância
-            'B': 'I',  # Influência
-            'C': 'S',  # Estabilidade
-            'D': 'C'   # Conformidade
-        }
-        
         # Inicializar contadores
         disc_counts = {
             'D': {'most': 0, 'least': 0},
@@ -46,12 +47,12 @@ class DISCAssessment:
         for question_id, answer in self.responses.items():
             if 'most' in answer:
                 letter = answer['most']
-                disc_factor = letter_to_disc[letter]
+                disc_factor = LETTER_TO_DISC[letter]
                 disc_counts[disc_factor]['most'] += 1
             
             if 'least' in answer:
                 letter = answer['least']
-                disc_factor = letter_to_disc[letter]
+                disc_factor = LETTER_TO_DISC[letter]
                 disc_counts[disc_factor]['least'] += 1
         
         # Calcular os resultados finais (MAIS - MENOS)
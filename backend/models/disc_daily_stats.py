@@ -0,0 +1,69 @@
+# backend/models/disc_daily_stats.py
+
+"""
+Agregados diários dos resultados DISC, mantidos de forma incremental
+(backend/stats.py) a partir de disc_results.
+"""
+from datetime import date
+from typing import Optional
+
+try:
+    from ..db import db
+except (ImportError, ValueError):
+    from backend.db import db
+
+# Fatores agregados, na ordem D, I, S, C (prefixos das colunas de soma)
+FACTORS = ('d', 'i', 's', 'c')
+
+
+class DISCDailyStats(db.Model):
+    """
+    Uma linha por (dia, perfil primário, perfil secundário): quantidade de resultados
+    e, para os que têm scores, soma e soma dos quadrados de cada fator. Médias e
+    desvios de qualquer período saem destas somas sem ler disc_results.
+    """
+    __tablename__ = 'disc_daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    primary_type = db.Column(db.String(1), primary_key=True)
+    secondary_type = db.Column(db.String(1), primary_key=True)
+
+    result_count = db.Column(db.Integer, nullable=False, default=0)
+    # Resultados com as quatro colunas de score preenchidas (base das somas)
+    scored_count = db.Column(db.Integer, nullable=False, default=0)
+    d_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    i_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    s_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    c_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    d_sumsq = db.Column(db.BigInteger, nullable=False, default=0)
+    i_sumsq = db.Column(db.BigInteger, nullable=False, default=0)
+    s_sumsq = db.Column(db.BigInteger, nullable=False, default=0)
+    c_sumsq = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __init__(self, day: date, primary_type: str, secondary_type: str):
+        self.day = day
+        self.primary_type = primary_type
+        self.secondary_type = secondary_type
+        self.result_count = 0
+        self.scored_count = 0
+        for factor in FACTORS:
+            setattr(self, f'{factor}_sum', 0)
+            setattr(self, f'{factor}_sumsq', 0)
+
+    def __repr__(self) -> str:
+        return f"<DISCDailyStats(day={self.day}, {self.primary_type}/{self.secondary_type}, count={self.result_count})>"
+
+
+class StatsWatermark(db.Model):
+    """Último ID de disc_results já incluído em um agregado (atualizado por compare-and-set)."""
+    __tablename__ = 'disc_stats_watermarks'
+
+    name = db.Column(db.String(40), primary_key=True)
+    last_result_id = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, name: str, last_result_id: Optional[int] = 0):
+        self.name = name
+        self.last_result_id = last_result_id or 0
+
+    def __repr__(self) -> str:
+        return f"<StatsWatermark(name='{self.name}', last_result_id={self.last_result_id})>"
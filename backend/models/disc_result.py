@@ -1,9 +1,10 @@
 # backend/models/disc_result.py (Refatorado e mais robusto)
 
-import json
 from datetime import datetime
 import logging # Adicionado para logging
 from typing import Dict, Any, Optional, List # Melhora type hinting
+import msgspec
+from sqlalchemy.orm import deferred, load_only, undefer_group
 from sqlalchemy.types import Text # Import Text explicitamente
 
 # Import relativo seguro
@@ -19,9 +20,30 @@ except (ImportError, ValueError):
         # Em um app real, talvez queira um erro mais explícito ou sair
         raise
 
+try:
+    from ..disc_data import QUESTION_SET_VERSION
+    from ..interpretation_logic import intensity_level
+    from ..response_codec import encode_responses, decode_for_version, ResponseCodecError
+    from ..score_calculator import build_detailed_report
+    from ..schemas import json_encoder, json_decoder
+except (ImportError, ValueError):
+    from backend.disc_data import QUESTION_SET_VERSION
+    from backend.interpretation_logic import intensity_level
+    from backend.response_codec import encode_responses, decode_for_version, ResponseCodecError
+    from backend.score_calculator import build_detailed_report
+    from backend.schemas import json_encoder, json_decoder
+
 # Configuração do logger para este módulo
 logger = logging.getLogger(__name__)
 
+# Colunas de score/nível, na ordem D, I, S, C (mesmas chaves de calculate_disc_scores)
+SCORE_COLUMNS = ('d_score', 'i_score', 's_score', 'c_score')
+LEVEL_COLUMNS = ('d_level', 'i_level', 's_level', 'c_level')
+# Colunas de listagem (perfil de carga 'summary')
+SUMMARY_COLUMNS = ('id', 'user_name', 'user_email', 'timestamp', 'primary_type', 'secondary_type')
+# Grupo das colunas pesadas (JSON/binário), carregadas sob demanda
+PAYLOAD_GROUP = 'payload'
+
 
 class DISCResult(db.Model):
     """
@@ -38,30 +60,56 @@ class DISCResult(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True) # Não nulo, indexado
 
     # Respostas brutas fornecidas pelo usuário (JSON armazenado como string)
-    # Renomeado de raw_responses para clareza que é JSON string
-    raw_responses_json = db.Column(Text, nullable=False)
+    # Renomeado de raw_responses para clareza que é JSON string.
+    # Nulo quando as respostas estão em raw_responses_packed.
+    # Colunas do grupo PAYLOAD_GROUP são adiadas: só vêm do banco ao serem acessadas
+    # (ou com o perfil de carga 'full'), ver loader_options.
+    raw_responses_json = deferred(db.Column(Text, nullable=True), group=PAYLOAD_GROUP)
+
+    # Respostas codificadas em ~15 bytes (backend/response_codec.py), preferidas ao JSON
+    # sempre que a codificação é sem perdas; question_set_version identifica o conjunto
+    # de questões usado no cálculo (e na codificação) desta linha.
+    raw_responses_packed = deferred(db.Column(db.LargeBinary, nullable=True), group=PAYLOAD_GROUP)
+    question_set_version = db.Column(db.String(16), nullable=True)
 
     # Resultados calculados completos (todo o dict retornado por calculate_disc_scores)
     # Armazenado como string JSON. Inclui scores, perfis, relatório detalhado, etc.
-    calculated_result_json = db.Column(Text, nullable=False)
+    calculated_result_json = deferred(db.Column(Text, nullable=False), group=PAYLOAD_GROUP)
 
     # Perfis principais extraídos do JSON para acesso rápido e consultas
     # Mantidos como colunas separadas e indexadas.
     primary_type = db.Column(db.String(1), nullable=False, index=True) # Não nulo, indexado
     secondary_type = db.Column(db.String(1), nullable=False)           # Não nulo
 
+    # Scores e níveis de intensidade em colunas próprias, para filtros e agregações
+    # no banco (sem decodificar JSON por linha). Nulos apenas em linhas antigas cujo JSON
+    # não pôde ser lido no backfill (migração 3b7e1c9a4f20).
+    d_score = db.Column(db.SmallInteger, nullable=True)
+    i_score = db.Column(db.SmallInteger, nullable=True)
+    s_score = db.Column(db.SmallInteger, nullable=True)
+    c_score = db.Column(db.SmallInteger, nullable=True)
+    d_level = db.Column(db.String(12), nullable=True)
+    i_level = db.Column(db.String(12), nullable=True)
+    s_level = db.Column(db.String(12), nullable=True)
+    c_level = db.Column(db.String(12), nullable=True)
+
+    # Chave de idempotência enviada pelo cliente (Idempotency-Key): uma submissão
+    # repetida devolve o resultado já gravado em vez de criar outra linha
+    idempotency_key = db.Column(db.String(64), nullable=True)
+
     # Definição explícita de índices (alternativa ou complemento aos inline index=True)
-    # __table_args__ = (
-    #     db.Index('ix_disc_results_user_email', 'user_email'),
-    #     db.Index('ix_disc_results_timestamp', 'timestamp'),
-    #     db.Index('ix_disc_results_primary_type', 'primary_type'),
-    # )
+    __table_args__ = (
+        # Consultas analíticas por perfil em um período (ex: média de D dos C-primários no mês)
+        db.Index('ix_disc_results_primary_type_timestamp', 'primary_type', 'timestamp'),
+        db.Index('ix_disc_results_idempotency_key', 'idempotency_key', unique=True),
+    )
 
     def __init__(self,
                  user_name: Optional[str] = None,
                  user_email: Optional[str] = None,
                  raw_responses: Optional[List[Dict[str, Any]]] = None, # Espera lista de dicts
-                 disc_result: Optional[Dict[str, Any]] = None):       # Espera o dict calculado
+                 disc_result: Optional[Dict[str, Any]] = None,        # Espera o dict calculado
+                 idempotency_key: Optional[str] = None):
         """
         Inicializa uma nova instância de DISCResult.
 
@@ -71,24 +119,48 @@ class DISCResult(db.Model):
             raw_responses: Lista de dicionários das respostas brutas do usuário.
             disc_result: Dicionário completo contendo os resultados calculados
                          pela função `calculate_disc_scores`.
+            idempotency_key: Chave de idempotência da submissão (opcional).
+        """
+        for column, value in self.row_values(user_name, user_email, raw_responses, disc_result, idempotency_key).items():
+            setattr(self, column, value)
+
+    @classmethod
+    def row_values(cls,
+                   user_name: Optional[str] = None,
+                   user_email: Optional[str] = None,
+                   raw_responses: Optional[List[Dict[str, Any]]] = None,
+                   disc_result: Optional[Dict[str, Any]] = None,
+                   idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Monta o dicionário {coluna: valor} de uma linha de disc_results, com as mesmas
+        regras de serialização e fallback do construtor. Usado pelo construtor e por
+        inserções em lote (ex: insert(DISCResult) com vários dicts em uma transação).
         """
-        self.user_name = user_name
-        self.user_email = user_email
-        # Garante que o timestamp seja definido na criação da instância Python
-        # O default=datetime.utcnow no db.Column lida com o nível do DB
-        self.timestamp = datetime.utcnow()
+        values: Dict[str, Any] = {
+            'user_name': user_name,
+            'user_email': user_email,
+            # Garante que o timestamp seja definido na criação da linha
+            # O default=datetime.utcnow no db.Column lida com o nível do DB
+            'timestamp': datetime.utcnow(),
+            'idempotency_key': idempotency_key,
+        }
+        values.update(dict.fromkeys(SCORE_COLUMNS + LEVEL_COLUMNS))
 
         # --- Processamento de raw_responses ---
+        values['question_set_version'] = QUESTION_SET_VERSION
+        values['raw_responses_packed'] = encode_responses(raw_responses)
         # Garante que raw_responses seja uma lista antes de tentar serializar
-        if raw_responses is not None and isinstance(raw_responses, list):
+        if values['raw_responses_packed'] is not None:
+            values['raw_responses_json'] = None # Formato compacto, sem perdas
+        elif raw_responses is not None and isinstance(raw_responses, list):
             try:
-                self.raw_responses_json = json.dumps(raw_responses)
-            except (TypeError, OverflowError) as e:
+                values['raw_responses_json'] = json_encoder.encode(raw_responses).decode('utf-8')
+            except (TypeError, OverflowError, msgspec.EncodeError) as e:
                 logger.error(f"Erro ao serializar 'raw_responses' para JSON: {e}. Armazenando lista vazia.")
-                self.raw_responses_json = '[]' # Default seguro
+                values['raw_responses_json'] = '[]' # Default seguro
         else:
             logger.warning(f"Tipo '{type(raw_responses)}' inválido ou não fornecido para 'raw_responses'. Armazenando lista vazia.")
-            self.raw_responses_json = '[]' # Default seguro
+            values['raw_responses_json'] = '[]' # Default seguro
 
         # --- Processamento de disc_result ---
         # Define valores padrão indicando erro/incompleto
@@ -106,36 +178,74 @@ class DISCResult(db.Model):
                 # Validação simples do tipo e tamanho dos perfis extraídos
                 if not isinstance(primary, str) or len(primary) != 1 or primary not in ['D', 'I', 'S', 'C']:
                     logger.error(f"Valor de 'primary_profile' inválido ('{primary}') no dicionário disc_result. Usando fallback '{default_primary}'.")
-                    self.primary_type = default_primary
+                    values['primary_type'] = default_primary
                 else:
-                    self.primary_type = primary
+                    values['primary_type'] = primary
 
                 if not isinstance(secondary, str) or len(secondary) != 1 or secondary not in ['D', 'I', 'S', 'C']:
                     logger.error(f"Valor de 'secondary_profile' inválido ('{secondary}') no dicionário disc_result. Usando fallback '{default_secondary}'.")
-                    self.secondary_type = default_secondary
+                    values['secondary_type'] = default_secondary
                 else:
-                    self.secondary_type = secondary
+                    values['secondary_type'] = secondary
+
+                values.update(cls.score_column_values(disc_result))
 
                 # Serializa o dicionário *completo* para a coluna JSON
-                self.calculated_result_json = json.dumps(disc_result)
-                logger.debug(f"Resultado DISC processado e serializado. Primário: {self.primary_type}, Secundário: {self.secondary_type}")
+                values['calculated_result_json'] = json_encoder.encode(disc_result).decode('utf-8')
+                logger.debug(f"Resultado DISC processado e serializado. Primário: {values['primary_type']}, Secundário: {values['secondary_type']}")
 
-            except (TypeError, OverflowError) as e:
+            except (TypeError, OverflowError, msgspec.EncodeError) as e:
                 logger.error(f"Erro ao serializar 'disc_result' para JSON: {e}. Armazenando objeto vazio e perfis de fallback.", exc_info=True)
-                self.calculated_result_json = default_result_json
-                self.primary_type = default_primary
-                self.secondary_type = default_secondary
+                values['calculated_result_json'] = default_result_json
+                values['primary_type'] = default_primary
+                values['secondary_type'] = default_secondary
             except Exception as e: # Captura outras exceções inesperadas durante o processamento
                 logger.exception(f"Erro inesperado ao processar 'disc_result': {e}")
-                self.calculated_result_json = default_result_json
-                self.primary_type = default_primary
-                self.secondary_type = default_secondary
+                values['calculated_result_json'] = default_result_json
+                values['primary_type'] = default_primary
+                values['secondary_type'] = default_secondary
         else:
             # Se disc_result for None ou não for um dicionário vindo do calculador
             logger.error(f"Dicionário 'disc_result' inválido ({type(disc_result)}) ou não fornecido por calculate_disc_scores. Armazenando dados vazios e perfis de fallback ('?').")
-            self.calculated_result_json = default_result_json
-            self.primary_type = default_primary
-            self.secondary_type = default_secondary
+            values['calculated_result_json'] = default_result_json
+            values['primary_type'] = default_primary
+            values['secondary_type'] = default_secondary
+
+        return values
+
+    @classmethod
+    def loader_options(cls, profile: str) -> tuple:
+        """
+        Opções de carga para select(DISCResult).options(*...) / session.get(..., options=...):
+
+            'summary'  id, nome, email, data e perfis (listagens)
+            'scores'   'summary' + colunas de score/nível (páginas de resultado, PDF, exportações)
+            'full'     todas as colunas, inclusive as JSON/binárias adiadas
+
+        Colunas fora do perfil continuam acessíveis, mas cada acesso custa uma consulta.
+        """
+        if profile == 'summary':
+            return (load_only(*(getattr(cls, name) for name in SUMMARY_COLUMNS)),)
+        if profile == 'scores':
+            return (load_only(*(getattr(cls, name) for name in SUMMARY_COLUMNS + SCORE_COLUMNS + LEVEL_COLUMNS)),)
+        if profile == 'full':
+            return (undefer_group(PAYLOAD_GROUP),)
+        raise ValueError(f"Perfil de carga desconhecido: '{profile}'. Use 'summary', 'scores' ou 'full'.")
+
+    @staticmethod
+    def score_column_values(disc_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extrai d_score..c_score e d_level..c_level de um dicionário de calculate_disc_scores.
+        Scores ausentes ou não inteiros ficam None (assim como o nível correspondente).
+        """
+        values: Dict[str, Any] = {}
+        for score_column, level_column in zip(SCORE_COLUMNS, LEVEL_COLUMNS):
+            score = disc_result.get(score_column)
+            if isinstance(score, bool) or not isinstance(score, int):
+                score = None
+            values[score_column] = score
+            values[level_column] = intensity_level(score) if score is not None else None
+        return values
 
     # --- Métodos Getters para acessar dados desserializados com cache e erro handling ---
 
@@ -145,12 +255,18 @@ class DISCResult(db.Model):
         Retorna None em caso de erro na desserialização. Cacheia o resultado ou o erro.
         """
         # Usa um nome de cache prefixado com _
+        if not hasattr(self, '_cached_raw_responses') and self.raw_responses_packed is not None:
+             try:
+                 self._cached_raw_responses = decode_for_version(self.raw_responses_packed, self.question_set_version)
+             except ResponseCodecError as e:
+                 logger.error(f"Erro ao decodificar raw_responses_packed (ID: {self.id}, conjunto {self.question_set_version}): {e}")
+                 self._cached_raw_responses = None # Cacheia o erro (None)
         if not hasattr(self, '_cached_raw_responses'):
              try:
                  # Usa or '[]' para evitar erro se raw_responses_json for None (não deveria ser, mas por segurança)
-                 self._cached_raw_responses = json.loads(self.raw_responses_json or '[]')
-             except (json.JSONDecodeError, TypeError) as e:
-                 logger.error(f"Erro ao desserializar raw_responses_json (ID: {self.id}): {e}. Conteúdo: '{self.raw_responses_json[:100]}...'")
+                 self._cached_raw_responses = json_decoder.decode(self.raw_responses_json or '[]')
+             except (msgspec.DecodeError, TypeError) as e:
+                 logger.error(f"Erro ao desserializar raw_responses_json (ID: {self.id}): {e}. Conteúdo: '{(self.raw_responses_json or '')[:100]}...'")
                  self._cached_raw_responses = None # Cacheia o erro (None)
         return self._cached_raw_responses
 
@@ -163,8 +279,8 @@ class DISCResult(db.Model):
         if not hasattr(self, '_cached_calculated_result'):
             try:
                 # Usa or '{}' para evitar erro se for None
-                self._cached_calculated_result = json.loads(self.calculated_result_json or '{}')
-            except (json.JSONDecodeError, TypeError) as e:
+                self._cached_calculated_result = json_decoder.decode(self.calculated_result_json or '{}')
+            except (msgspec.DecodeError, TypeError) as e:
                 logger.error(f"Erro ao desserializar calculated_result_json (ID: {self.id}): {e}. Conteúdo: '{self.calculated_result_json[:100]}...'")
                 self._cached_calculated_result = None # Cacheia o erro (None)
         return self._cached_calculated_result
@@ -178,6 +294,10 @@ class DISCResult(db.Model):
         não contiver as chaves esperadas (d_score, i_score, s_score, c_score).
         Retorna None apenas se a desserialização falhar completamente.
         """
+        # Colunas preenchidas (linhas novas ou já migradas): dispensa a decodificação do JSON
+        if None not in (self.d_score, self.i_score, self.s_score, self.c_score):
+            return {'D': self.d_score, 'I': self.i_score, 'S': self.s_score, 'C': self.c_score}
+
         result = self.get_calculated_result() # Obtem do cache/desserializa
         if result is None:
              logger.warning(f"Não foi possível obter resultado calculado (ID: {self.id}) para extrair scores.")
@@ -203,26 +323,40 @@ class DISCResult(db.Model):
 
     def get_detailed_report(self) -> Optional[Dict[str, Any]]:
         """
-        Retorna o relatório detalhado extraído do resultado calculado (chave 'detailed_report').
-        Retorna None se o resultado não puder ser carregado ou não contiver um dict válido
-        na chave 'detailed_report'.
+        Retorna o relatório detalhado do resultado. Linhas antigas (esquema v1) trazem
+        o relatório gravado na chave 'detailed_report'; nas novas ele é reconstruído a
+        partir dos scores e perfis (build_detailed_report) e guardado na instância.
+        Retorna None se o resultado não puder ser carregado ou estiver incompleto.
         """
+        if hasattr(self, '_cached_detailed_report'):
+            return self._cached_detailed_report
+
         result = self.get_calculated_result() # Obtem do cache/desserializa
         if result is None:
              logger.warning(f"Não foi possível obter resultado calculado (ID: {self.id}) para extrair relatório detalhado.")
              return None # Falha na desserialização
 
-        if isinstance(result, dict):
-            report = result.get('detailed_report') # Chave retornada pelo calculador
-            if isinstance(report, dict):
-                return report
-            else:
-                 logger.warning(f"Chave 'detailed_report' não encontrada ou não é um dicionário no resultado calculado (ID: {self.id}). Valor: {report}")
-                 return None # Retorna None se não for um dict
-        else:
+        if not isinstance(result, dict):
             logger.error(f"Resultado calculado (ID: {self.id}) desserializado não é um dicionário ({type(result)}). Não é possível extrair relatório.")
             return None
 
+        report = result.get('detailed_report') # Linha legada (esquema v1)
+        if isinstance(report, dict):
+            return report
+
+        scores = self.get_scores()
+        primary = result.get('primary_profile', self.primary_type)
+        secondary = result.get('secondary_profile', self.secondary_type)
+        if not scores or not primary or not secondary:
+            logger.warning(f"Dados insuficientes para reconstruir o relatório detalhado (ID: {self.id}).")
+            return None
+
+        self._cached_detailed_report = build_detailed_report({
+            'primary_profile': primary, 'secondary_profile': secondary,
+            'd_score': scores['D'], 'i_score': scores['I'], 's_score': scores['S'], 'c_score': scores['C'],
+        })
+        return self._cached_detailed_report
+
     # Opcional: Método para obter o resumo diretamente
     def get_profile_summary(self) -> Optional[str]:
         """Retorna o resumo textual do perfil extraído do relatório detalhado."""
@@ -249,6 +383,9 @@ class DISCResult(db.Model):
             Um dicionário representando o objeto DISCResult.
         """
         calculated_result_data = self.get_calculated_result() # Usa getter com cache/erro handling
+        if isinstance(calculated_result_data, dict) and 'detailed_report' not in calculated_result_data:
+            # Mantém o formato da API: o relatório não é mais gravado, é reconstruído
+            calculated_result_data = {**calculated_result_data, 'detailed_report': self.get_detailed_report()}
 
         data = {
             'id': self.id,
@@ -0,0 +1,190 @@
+# backend/pdf_cache.py
+
+"""
+Cache em disco (LRU) dos relatórios PDF gerados.
+
+Os resultados são imutáveis depois de gravados, então o PDF de um resultado só
+muda se o texto das interpretações ou o layout do relatório mudarem. A chave do
+cache combina o ID do resultado com os hashes desses dois insumos, de modo que
+qualquer alteração invalida os arquivos antigos automaticamente (eles deixam de
+ser consultados e saem pela política LRU).
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+def pdf_cache_key(result_id: int, interpretation_hash: str, layout_hash: str) -> str:
+    """Chave de conteúdo do PDF: ID do resultado + hash das interpretações + hash do layout."""
+    raw = f"{result_id}:{interpretation_hash}:{layout_hash}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class PDFCache:
+    """
+    Armazena PDFs como arquivos '<chave>.pdf' em um diretório, limitado a max_bytes.
+    O mtime de cada arquivo é atualizado a cada leitura; na escrita, os arquivos
+    menos usados recentemente são removidos até o total caber no limite.
+    Seguro entre threads e entre processos (escritas atômicas com os.replace).
+
+    Ao lado dos PDFs ficam marcadores '<chave>.<tipo>' (ex.: '.pending', '.failed')
+    com o estado dos jobs de renderização, visíveis a todos os processos que usam o
+    diretório. Eles não contam para o limite de tamanho.
+    """
+
+    SUFFIX = '.pdf'
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna o caminho do PDF em cache (marcando-o como usado) ou None."""
+        path = self.path_for(key)
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Cache PDF: falha ao acessar {path}: {e}")
+            return None
+        return path
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Retorna os bytes do PDF em cache ou None."""
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError as e:
+            logger.warning(f"Cache PDF: falha ao ler {path}: {e}")
+            return None
+
+    def put(self, key: str, data: bytes) -> str:
+        """Grava o PDF de forma atômica, aplica o limite de tamanho e retorna o caminho."""
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._evict(keep=path)
+        return path
+
+    def marker_path(self, key: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{key}.{kind}")
+
+    def create_marker(self, key: str, kind: str, text: str = '') -> bool:
+        """Cria o marcador só se ainda não existir (O_EXCL). Retorna False se já existia."""
+        try:
+            fd = os.open(self.marker_path(key, kind), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return True
+
+    def write_marker(self, key: str, kind: str, text: str = '') -> None:
+        """Grava (ou substitui) o marcador de forma atômica."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self.marker_path(key, kind))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def read_marker(self, key: str, kind: str) -> Optional[Tuple[float, str]]:
+        """(idade em segundos, conteúdo) do marcador ou None se não existir."""
+        path = self.marker_path(key, kind)
+        try:
+            age = time.time() - os.stat(path).st_mtime
+            with open(path, encoding='utf-8') as f:
+                return age, f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Cache PDF: falha ao ler o marcador {path}: {e}")
+            return None
+
+    def remove_marker(self, key: str, kind: str) -> None:
+        try:
+            os.unlink(self.marker_path(key, kind))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Cache PDF: falha ao remover o marcador {key}.{kind}: {e}")
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Remove os arquivos menos usados recentemente até o total caber em max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            try:
+                with os.scandir(self.directory) as it:
+                    for entry in it:
+                        if not entry.name.endswith(self.SUFFIX):
+                            continue
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+            except OSError as e:
+                logger.warning(f"Cache PDF: falha ao listar {self.directory}: {e}")
+                return
+
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.unlink(path)
+                    total -= size
+                    logger.debug(f"Cache PDF: removido (LRU) {path}")
+                except FileNotFoundError:
+                    total -= size
+                except OSError as e:
+                    logger.warning(f"Cache PDF: falha ao remover {path}: {e}")
+
+
+def init_pdf_cache(app) -> PDFCache:
+    """Cria o cache de PDFs da aplicação (PDF_CACHE_DIR / PDF_CACHE_MAX_BYTES)."""
+    directory = app.config.get('PDF_CACHE_DIR') or os.path.join(app.instance_path, 'pdf_cache')
+    cache = PDFCache(directory, int(app.config.get('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024)))
+    app.extensions['pdf_cache'] = cache
+    return cache
+
+
+def get_pdf_cache() -> PDFCache:
+    """Retorna o cache de PDFs da aplicação atual."""
+    return current_app.extensions['pdf_cache']
@@ -0,0 +1,122 @@
+# backend/pdf_export.py
+
+"""
+Exportação em lote dos relatórios PDF como um ZIP transmitido aos poucos.
+
+O ZIP é escrito em um buffer não-seekable (zipfile usa data descriptors nesse
+caso) que é esvaziado a cada entrada, então nada além da janela de PDFs em
+renderização fica em memória, seja o lote de 50 ou de 50.000 relatórios. Os PDFs
+são renderizados no pool de processos compartilhado da fila de PDFs (pdf_jobs),
+sem criar processos por exportação, com no máximo `window` jobs em andamento;
+PDFs já presentes no cache são lidos do disco.
+"""
+import io
+import logging
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+try:
+    from .pdf_jobs import PDFRenderQueue, build_report_payload, result_pdf_cache_key
+except ImportError:
+    from backend.pdf_jobs import PDFRenderQueue, build_report_payload, result_pdf_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Destino write-only do ZipFile: acumula os bytes escritos até o próximo drain()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_filename(result_data) -> str:
+    """Nome da entrada no ZIP: '<id>_<nome>.pdf'."""
+    safe_name = ''.join(c for c in (result_data.user_name or 'Resultado') if c.isalnum() or c in ['_', '-']).strip('_')
+    return f"{result_data.id}_{safe_name or 'Resultado'}.pdf"
+
+
+def stream_pdf_zip(results: Iterable[Any], queue: PDFRenderQueue, window: int) -> Iterator[bytes]:
+    """
+    Gera os bytes de um ZIP com o PDF de cada resultado, na ordem recebida.
+
+    Args:
+        results: Iterável de DISCResult (idealmente vindo de um SELECT com yield_per).
+        queue: Fila de PDFs da aplicação: seu pool renderiza os PDFs novos e seu cache
+               fornece os PDFs prontos e os fragmentos de interpretação.
+        window: Máximo de PDFs em renderização/aguardando escrita ao mesmo tempo.
+    """
+    buffer = _ZipStreamBuffer()
+    cache = queue.cache
+    window = max(1, window)
+    pending: 'deque[Tuple[str, Callable[[], bytes], Optional[Future]]]' = deque()
+    exported = failed = 0
+
+    def schedule(result_data) -> Optional[Tuple[str, Callable[[], bytes], Optional[Future]]]:
+        cached = cache.read(result_pdf_cache_key(result_data.id))
+        name = export_filename(result_data)
+        if cached is not None:
+            return name, lambda: cached, None
+        try:
+            report = build_report_payload(result_data)
+        except Exception as e:
+            logger.error(f"Exportação: resultado ID {result_data.id} ignorado ({e}).")
+            return None
+        future = queue.render_bytes(report)
+        return name, future.result, future
+
+    try:
+        with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED) as archive:
+            def write_oldest() -> Optional[bytes]:
+                nonlocal exported, failed
+                name, get_pdf, _ = pending.popleft()
+                try:
+                    data = get_pdf()
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Exportação: falha ao renderizar '{name}': {e}")
+                    return None
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_STORED  # PDFs já são compactados
+                archive.writestr(info, data)
+                exported += 1
+                return buffer.drain()
+
+            for result_data in results:
+                entry = schedule(result_data)
+                if entry is None:
+                    failed += 1
+                    continue
+                pending.append(entry)
+                if len(pending) >= window:
+                    chunk = write_oldest()
+                    if chunk:
+                        yield chunk
+
+            while pending:
+                chunk = write_oldest()
+                if chunk:
+                    yield chunk
+        # Diretório central do ZIP, escrito no close()
+        yield buffer.drain()
+        logger.info(f"Exportação de PDFs concluída: {exported} relatório(s), {failed} falha(s).")
+    finally:
+        # Se o cliente desconectar no meio, descarta os renders que ainda não começaram
+        for _, _, future in pending:
+            if future is not None:
+                future.cancel()
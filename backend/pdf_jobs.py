@@ -0,0 +1,288 @@
+# backend/pdf_jobs.py
+
+"""
+Renderização assíncrona dos relatórios PDF.
+
+O ReportLab consome CPU e segura o GIL; rodando nas threads do gunicorn, poucos
+downloads simultâneos travam o quiz e a /api/calculate. Aqui os PDFs são
+renderizados em um ProcessPoolExecutor limitado (um por processo worker, criado
+sob demanda) e gravados direto no cache em disco (pdf_cache). O ID do job é a
+própria chave do cache, e o estado do job também fica no disco: o processo que
+aceita o job cria '<chave>.pending' de forma atômica (O_EXCL) ao lado do PDF e,
+se a renderização falhar, troca-o por '<chave>.failed'. Assim qualquer worker do
+gunicorn responde o mesmo status, e um pedido que cai em outro worker acompanha
+o job existente em vez de renderizar o PDF de novo. Marcadores '.pending' mais
+velhos que PDF_RENDER_PENDING_TTL_SECONDS (processo que morreu no meio) são
+ignorados; '.failed' vale por PDF_RENDER_FAILURE_TTL_SECONDS.
+
+Backpressure: no máximo PDF_RENDER_MAX_PENDING jobs na fila por processo; além
+disso submit() levanta PDFQueueFull e a rota responde 503 com Retry-After. A
+exportação em lote (pdf_export) usa o mesmo pool, com no máximo
+EXPORT_MAX_CONCURRENT exportações simultâneas por processo.
+Com PDF_RENDER_WORKERS = 0 o PDF é renderizado na própria thread (testes/dev).
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from flask import current_app
+
+try:
+    from .interpretation_logic import get_all_interpretations, interpretation_fingerprint
+    from .pdf_cache import PDFCache, pdf_cache_key
+    from .pdf_report import build_pdf_report, build_pdf_report_with_fragments, report_layout_fingerprint
+except ImportError:
+    from backend.interpretation_logic import get_all_interpretations, interpretation_fingerprint
+    from backend.pdf_cache import PDFCache, pdf_cache_key
+    from backend.pdf_report import build_pdf_report, build_pdf_report_with_fragments, report_layout_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Status possíveis de um job
+STATUS_READY = 'ready'
+STATUS_PENDING = 'pending'
+STATUS_FAILED = 'failed'
+STATUS_NOT_STARTED = 'not_started'
+
+# Marcadores de estado dos jobs no diretório do cache (PDFCache.create_marker etc.)
+PENDING_MARKER = 'pending'
+FAILED_MARKER = 'failed'
+
+
+class PDFQueueFull(Exception):
+    """A fila de renderização atingiu PDF_RENDER_MAX_PENDING."""
+
+
+def result_pdf_cache_key(result_id: int) -> str:
+    """Chave (e ID do job) do PDF de um resultado: muda só se as interpretações ou o layout mudarem."""
+    return pdf_cache_key(result_id, interpretation_fingerprint(), report_layout_fingerprint())
+
+
+def build_report_payload(result_data) -> Dict[str, Any]:
+    """
+    Monta o dicionário (serializável, enviado ao processo filho) consumido por
+    build_pdf_report a partir de um DISCResult ou ResultView. Levanta ValueError se os scores
+    não puderem ser carregados.
+    """
+    scores = result_data.get_scores()
+    if scores is None:
+        raise ValueError(f"scores indisponíveis para o resultado ID {result_data.id}")
+    return {
+        'result_id': result_data.id,
+        'user_name': result_data.user_name,
+        'user_email': result_data.user_email,
+        'timestamp': result_data.timestamp,
+        'primary_type': result_data.primary_type,
+        'secondary_type': result_data.secondary_type,
+        'scores': scores,
+        # Obtém todas as interpretações usando a mesma lógica da página de resultados
+        'interpretations': get_all_interpretations(result_data.primary_type, result_data.secondary_type, scores),
+        # Versão dos textos: identifica as páginas de interpretação reaproveitáveis no cache
+        'interpretation_hash': interpretation_fingerprint(),
+    }
+
+
+def render_report(cache: PDFCache, report: Dict[str, Any]) -> bytes:
+    """
+    Gera o PDF reaproveitando as páginas de interpretação da combinação guardadas no
+    próprio cache. 'interpretation_hash' no relatório identifica a versão dos textos;
+    sem ele o PDF é renderizado por inteiro.
+    """
+    namespace = report.get('interpretation_hash')
+    if not namespace:
+        return build_pdf_report(report)
+    return build_pdf_report_with_fragments(report, cache, namespace)
+
+
+def render_pdf_to_cache(directory: str, max_bytes: int, key: str, report: Dict[str, Any]) -> str:
+    """Executada no processo filho: gera o PDF e grava no cache. Retorna o caminho do arquivo."""
+    cache = PDFCache(directory, max_bytes)
+    return cache.put(key, render_report(cache, report))
+
+
+def render_pdf_bytes(directory: str, max_bytes: int, report: Dict[str, Any]) -> bytes:
+    """Executada no processo filho: gera o PDF (usando só os fragmentos do cache) e retorna os bytes."""
+    return render_report(PDFCache(directory, max_bytes), report)
+
+
+class PDFRenderQueue:
+    """
+    Fila limitada de renderização de PDFs, deduplicada pela chave do cache entre
+    threads (Futures em memória) e entre processos (marcadores no diretório do cache).
+    """
+
+    def __init__(self, cache: PDFCache, workers: int, max_pending: int,
+                 pending_ttl: float = 120, failure_ttl: float = 300, max_exports: int = 1):
+        self.cache = cache
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending_ttl = pending_ttl
+        self.failure_ttl = failure_ttl
+        self.max_exports = max(1, max_exports)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, Future] = {}
+        self._export_slots = threading.BoundedSemaphore(self.max_exports)
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Criado sob demanda para que cada worker do gunicorn tenha o próprio pool
+        # (após o fork). 'spawn' evita herdar threads e conexões do processo pai.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"Pool de renderização de PDFs iniciado com {self.workers} processo(s).")
+        return self._executor
+
+    def _submit_to_pool(self, fn, *args) -> Future:
+        """Envia a tarefa ao pool (chamado com self._lock), recriando-o se estiver quebrado."""
+        try:
+            return self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            logger.error("Pool de renderização de PDFs quebrado; recriando.")
+            broken, self._executor = self._executor, None
+            broken.shutdown(wait=False, cancel_futures=True)  # Libera os processos e threads do pool antigo
+            return self._get_executor().submit(fn, *args)
+
+    def _pending_elsewhere(self, key: str) -> bool:
+        """Se há um marcador '.pending' recente (outro processo renderizando o PDF)."""
+        marker = self.cache.read_marker(key, PENDING_MARKER)
+        return marker is not None and marker[0] < self.pending_ttl
+
+    def _claim(self, key: str) -> bool:
+        """Reivindica o job criando o marcador '.pending'. False se outro processo chegou antes."""
+        owner = str(os.getpid())
+        if not self.cache.create_marker(key, PENDING_MARKER, owner):
+            if self._pending_elsewhere(key):
+                return False
+            # Marcador abandonado (o processo que renderizava morreu): assume o job
+            logger.warning(f"Marcador de renderização abandonado para o PDF {key}; renderizando de novo.")
+            self.cache.write_marker(key, PENDING_MARKER, owner)
+        self.cache.remove_marker(key, FAILED_MARKER)
+        return True
+
+    def submit(self, key: str, report: Dict[str, Any]) -> Optional[Future]:
+        """
+        Enfileira a renderização do PDF 'key' (ou retorna o job já em andamento neste
+        processo). O resultado do Future é o caminho do PDF no cache. Retorna None se
+        outro processo já estiver renderizando o mesmo PDF (acompanhe por status()).
+        """
+        with self._lock:
+            existing = self._jobs.get(key)
+            if existing is not None:
+                return existing
+            if self._pending_elsewhere(key):
+                return None
+            if len(self._jobs) >= self.max_pending:
+                raise PDFQueueFull(f"{len(self._jobs)} PDFs já na fila de renderização.")
+            if not self._claim(key):
+                return None
+
+            try:
+                if self.workers <= 0:
+                    future: Future = Future()
+                else:
+                    future = self._submit_to_pool(
+                        render_pdf_to_cache, self.cache.directory, self.cache.max_bytes, key, report
+                    )
+            except BaseException:
+                self.cache.remove_marker(key, PENDING_MARKER)
+                raise
+            self._jobs[key] = future
+
+        future.add_done_callback(lambda f, key=key: self._on_done(key, f))
+        if self.workers <= 0:
+            try:
+                future.set_result(self.cache.put(key, render_report(self.cache, report)))
+            except Exception as e:
+                future.set_exception(e)
+        return future
+
+    def _on_done(self, key: str, future: Future) -> None:
+        with self._lock:
+            self._jobs.pop(key, None)
+        error = future.exception() if not future.cancelled() else None
+        if future.cancelled() or error is not None:
+            # Gravado antes de remover '.pending', para nenhum processo ver 'not_started' no meio
+            try:
+                self.cache.write_marker(key, FAILED_MARKER, str(error) if error else 'cancelado')
+            except OSError as e:
+                logger.warning(f"Falha ao registrar o erro do PDF {key}: {e}")
+        self.cache.remove_marker(key, PENDING_MARKER)
+        if error is not None:
+            logger.error(f"Falha ao renderizar PDF {key}: {error}")
+
+    def status(self, key: str) -> str:
+        """Status do job (o mesmo em qualquer processo que use o cache): ready / pending / failed / not_started."""
+        if self.cache.get(key):
+            return STATUS_READY
+        with self._lock:
+            if key in self._jobs:
+                return STATUS_PENDING
+        if self._pending_elsewhere(key):
+            return STATUS_PENDING
+        failure = self.cache.read_marker(key, FAILED_MARKER)
+        if failure is not None:
+            if failure[0] < self.failure_ttl:
+                return STATUS_FAILED
+            self.cache.remove_marker(key, FAILED_MARKER)  # Falha antiga: permite nova tentativa
+        return STATUS_NOT_STARTED
+
+    def render_bytes(self, report: Dict[str, Any]) -> Future:
+        """
+        Renderiza um PDF no mesmo pool dos jobs e devolve os bytes no Future, sem gravar
+        no cache. Usado pela exportação em lote, que limita os renders em andamento
+        (janela) e só roda com uma vaga de exportação (acquire_export_slot).
+        """
+        if self.workers > 0:
+            with self._lock:
+                return self._submit_to_pool(render_pdf_bytes, self.cache.directory, self.cache.max_bytes, report)
+        future: Future = Future()
+        try:
+            future.set_result(render_report(self.cache, report))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def acquire_export_slot(self) -> bool:
+        """Reserva uma das max_exports vagas de exportação em lote (sem esperar). False se cheias."""
+        return self._export_slots.acquire(blocking=False)
+
+    def release_export_slot(self) -> None:
+        self._export_slots.release()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def init_pdf_jobs(app, cache: PDFCache) -> PDFRenderQueue:
+    """Cria a fila de renderização da aplicação (PDF_RENDER_WORKERS / PDF_RENDER_MAX_PENDING)."""
+    queue = PDFRenderQueue(
+        cache,
+        workers=int(app.config.get('PDF_RENDER_WORKERS', 1)),
+        max_pending=int(app.config.get('PDF_RENDER_MAX_PENDING', 8)),
+        pending_ttl=float(app.config.get('PDF_RENDER_PENDING_TTL_SECONDS', 120)),
+        failure_ttl=float(app.config.get('PDF_RENDER_FAILURE_TTL_SECONDS', 300)),
+        max_exports=int(app.config.get('EXPORT_MAX_CONCURRENT', 1))
+    )
+    app.extensions['pdf_jobs'] = queue
+    atexit.register(queue.shutdown)
+    return queue
+
+
+def get_pdf_jobs() -> PDFRenderQueue:
+    """Retorna a fila de renderização da aplicação atual."""
+    return current_app.extensions['pdf_jobs']
@@ -0,0 +1,466 @@
+# backend/pdf_report.py
+
+"""
+Geração do relatório PDF completo (ReportLab) de um resultado DISC.
+
+Não depende do contexto Flask nem do banco: recebe um dicionário simples
+(serializável) com os dados do resultado e as interpretações já calculadas e
+devolve os bytes do PDF. Qualquer alteração no layout deste módulo muda
+report_layout_fingerprint() e invalida os PDFs em cache.
+"""
+import hashlib
+import logging
+from io import BytesIO
+from typing import Dict, Any, Optional, List, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch, cm
+from reportlab.platypus import (
+    Paragraph, Spacer, Table, TableStyle,
+    BaseDocTemplate, PageTemplate, Frame, Flowable, PageBreak
+)
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
+
+try:
+    from .disc_data import disc_descriptions
+except ImportError:
+    from backend.disc_data import disc_descriptions
+
+# pypdf é opcional: sem ele, os relatórios são sempre renderizados por inteiro
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
+
+logger = logging.getLogger(__name__)
+
+# Incrementar ao mudar o layout de forma que o hash do código não capture
+# (ex: fontes ou imagens externas). Faz parte da chave do cache de PDFs.
+PDF_LAYOUT_VERSION = 2
+
+# --- Estilos Globais para ReportLab ---
+styles = getSampleStyleSheet()
+styles.add(ParagraphStyle(name='Center', alignment=TA_CENTER))
+styles.add(ParagraphStyle(name='Justify', alignment=TA_JUSTIFY, spaceAfter=6))
+styles.add(ParagraphStyle(name='Right', alignment=TA_RIGHT)) # Estilo para alinhar à direita (pag num)
+styles.add(ParagraphStyle(name='Footer', alignment=TA_CENTER, textColor=colors.grey, fontSize=8)) # Estilo Footer
+styles.add(ParagraphStyle(name='H2', parent=styles['h2'], spaceBefore=12, spaceAfter=8)) # Ajuste H2
+styles.add(ParagraphStyle(name='H3', parent=styles['h3'], spaceBefore=10, spaceAfter=6)) # Ajuste H3
+styles.add(ParagraphStyle(name='H4PDF', parent=styles['h4'], spaceBefore=8, spaceAfter=4, alignment=TA_LEFT)) # H4 para subtítulos PDF
+styles.add(ParagraphStyle(name='SubTitlePDF', parent=styles['Normal'], fontName='Helvetica-Bold', spaceBefore=6, spaceAfter=3)) # Subtítulos menores
+styles.add(ParagraphStyle(name='ListItem', parent=styles['Normal'], leftIndent=18, spaceAfter=3))
+styles.add(ParagraphStyle(name='AlertInfoPDF', parent=styles['Normal'], backColor=colors.lightblue, borderColor=colors.darkblue, borderPadding=5, spaceBefore=8, spaceAfter=8, leading=14)) # Estilo alerta
+styles.add(ParagraphStyle(name='AlertWarningPDF', parent=styles['Normal'], backColor=colors.lightyellow, borderColor=colors.orange, borderPadding=5, spaceBefore=8, spaceAfter=8, leading=14)) # Estilo alerta
+styles.add(ParagraphStyle(name='SmallMuted', parent=styles['Normal'], textColor=colors.grey, fontSize=styles['Normal'].fontSize * 0.9))
+# Estilo Italic provavelmente já existe, não adicionar
+
+# --- Funções Auxiliares para PDF ---
+
+def normalize_score_to_100(score: Optional[float], min_possible: float = -28.0, max_possible: float = 28.0) -> float:
+    """Normaliza o score DISC para uma escala de 0 a 100 (Python version)."""
+    if score is None:
+        return 0.0 # Ou talvez 50.0? 0 parece mais seguro para gráfico de barra
+    # Garante que score é float
+    try:
+        numeric_score = float(score)
+    except (ValueError, TypeError):
+        return 0.0
+
+    range_val = max_possible - min_possible
+    if range_val == 0:
+        return 50.0 # Avoid division by zero
+
+    normalized = ((numeric_score - min_possible) / range_val) * 100.0
+    return max(0.0, min(100.0, normalized)) # Clamp between 0 and 100
+
+def add_interpretation_section_pdf(
+    story: List[Flowable],
+    title: str,
+    interpretation_data: Optional[Dict[str, Any]],
+    fields_to_include: List[Tuple[str, str, ParagraphStyle]], # Lista de (chave_json, titulo_pdf, estilo_paragrafo)
+    title_style: ParagraphStyle = styles['H4PDF'],
+    alert_fields: Optional[Dict[str, ParagraphStyle]] = None # Mapeia chave_json para estilo de alerta
+):
+    """Adiciona uma seção de interpretação formatada ao story do PDF."""
+    if not interpretation_data:
+        story.append(Paragraph(f"<i>{title}: Dados não disponíveis.</i>", styles['Italic']))
+        story.append(Spacer(1, 0.1*inch))
+        return
+
+    story.append(Paragraph(title, title_style))
+    story.append(Spacer(1, 0.05*inch))
+
+    alert_fields = alert_fields or {}
+
+    for json_key, pdf_subtitle, content_style in fields_to_include:
+        content = interpretation_data.get(json_key)
+        if content:
+            # Define o estilo, verificando se é um campo de alerta
+            current_style = alert_fields.get(json_key, content_style)
+            current_title_style = styles['SubTitlePDF']
+
+            # Adiciona subtítulo apenas se não for alerta (alertas têm o título implícito)
+            if json_key not in alert_fields:
+                 story.append(Paragraph(pdf_subtitle, current_title_style))
+
+            if isinstance(content, list):
+                for item in content:
+                    # Garante que item é string e remove espaços extras
+                    item_text = str(item).strip()
+                    if item_text:
+                        story.append(Paragraph(f"• {item_text}", styles['ListItem']))
+                story.append(Spacer(1, 0.05*inch)) # Espaço após lista
+            elif isinstance(content, str):
+                 # Substitui \n por <br/> para quebras de linha no PDF
+                 formatted_content = content.strip().replace('\n', '<br/>')
+                 if formatted_content:
+                     story.append(Paragraph(formatted_content, current_style))
+                     story.append(Spacer(1, 0.1*inch))
+            else:
+                 # Tenta converter para string se não for lista ou string
+                 try:
+                     str_content = str(content).strip().replace('\n', '<br/>')
+                     if str_content:
+                         story.append(Paragraph(str_content, current_style))
+                         story.append(Spacer(1, 0.1*inch))
+                 except Exception as e:
+                      logger.error(f"Erro ao formatar conteúdo PDF para {json_key}: {e}")
+
+def header_footer(canvas, doc):
+    """Adiciona cabeçalho/rodapé simples a cada página."""
+    canvas.saveState()
+    # Rodapé com número da página
+    # page_offset: páginas que antecedem este documento quando ele é um fragmento
+    # concatenado a uma capa (ver build_pdf_report_with_fragments)
+    page_num = canvas.getPageNumber() + getattr(doc, 'page_offset', 0)
+    text = f"Página {page_num}"
+    canvas.setFont('Helvetica', 9)
+    canvas.setFillColor(colors.grey)
+    canvas.drawRightString(A4[0] - doc.rightMargin - 0.5*cm, doc.bottomMargin - 0.5*cm, text)
+    # Pode adicionar um header aqui se desejar
+    # canvas.drawString(doc.leftMargin, A4[1] - doc.topMargin + 0.5*cm, "Relatório DISC Confidencial")
+    canvas.restoreState()
+
+
+def _split_interpretations(report: Dict[str, Any]) -> Tuple[Dict, Dict, Dict, Dict]:
+    """Separa as interpretações (geral/profissional, primária/secundária) para facilitar o acesso."""
+    all_interpretations = report.get('interpretations') or {}
+    return (
+        all_interpretations.get('general', {}).get('primary', {}),
+        all_interpretations.get('general', {}).get('secondary', {}),
+        all_interpretations.get('professional', {}).get('primary', {}),
+        all_interpretations.get('professional', {}).get('secondary', {}),
+    )
+
+
+def _new_document(buffer: BytesIO, page_offset: int = 0) -> BaseDocTemplate:
+    """Documento A4 com margens, frame único e rodapé numerado (deslocado de page_offset)."""
+    margin = 1.5 * cm
+
+    # Usar BaseDocTemplate para permitir header/footer
+    doc = BaseDocTemplate(buffer, pagesize=A4,
+                          leftMargin=margin, rightMargin=margin,
+                          topMargin=margin, bottomMargin=margin * 1.5) # Mais espaço no bottom para footer
+    doc.page_offset = page_offset
+
+    # Define o frame principal
+    frame = Frame(doc.leftMargin, doc.bottomMargin,
+                  doc.width, doc.height,
+                  id='normal')
+
+    # Cria o PageTemplate com o frame e a função onPage para header/footer
+    main_template = PageTemplate(id='main', frames=[frame], onPage=header_footer)
+    doc.addPageTemplates([main_template])
+    return doc
+
+
+def _cover_story(report: Dict[str, Any]) -> List[Flowable]:
+    """Parte personalizada do relatório: dados do usuário, resumo, tabela de scores e gráfico."""
+    result_id = report.get('result_id')
+    primary_type = report.get('primary_type')
+    secondary_type = report.get('secondary_type')
+    scores = report.get('scores') or {}
+    primary_gen, secondary_gen, _, _ = _split_interpretations(report)
+
+    story = []
+
+    # --- Montagem do PDF Completo ---
+    story.append(Paragraph("Relatório de Perfil Comportamental DISC", styles['h1']))
+    story.append(Spacer(1, 0.3*inch))
+
+    # Informações do Usuário e Data/Hora
+    user_info_lines = []
+    if report.get('user_name'): user_info_lines.append(f"<b>Nome:</b> {report.get('user_name')}")
+    if report.get('user_email'): user_info_lines.append(f"<b>Email:</b> {report.get('user_email')}")
+    if report.get('timestamp'): user_info_lines.append(f"<b>Data:</b> {report.get('timestamp').strftime('%d/%m/%Y %H:%M:%S')} (UTC)")
+    else: user_info_lines.append(f"<b>Data:</b> Indisponível")
+    for line in user_info_lines: story.append(Paragraph(line, styles['Center']))
+    story.append(Spacer(1, 0.4*inch))
+
+    # --- Seção de Resumo e Gráfico ---
+    story.append(Paragraph("Resumo do Perfil e Pontuações", styles['H2']))
+    story.append(Spacer(1, 0.1*inch))
+
+    # Resumo dos Perfis
+    primary_title_pdf = primary_gen.get('title', primary_type)
+    secondary_title_pdf = secondary_gen.get('title', secondary_type if secondary_type != '?' else 'N/A')
+
+    story.append(Paragraph(f"<b>Perfil Primário:</b> {primary_type} ({primary_title_pdf}) - Nível: {primary_gen.get('level', '?').capitalize()}", styles['Normal']))
+    if secondary_gen and secondary_gen.get('type'):
+         story.append(Paragraph(f"<b>Influência Secundária:</b> {secondary_gen['type']} ({secondary_title_pdf}) - Nível: {secondary_gen.get('level', '?').capitalize()}", styles['Normal']))
+    else:
+         story.append(Paragraph("<b>Influência Secundária:</b> Nenhuma significativa", styles['Normal']))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Tabela de Scores (Originais)
+    score_data = [['Fator', 'Pontuação Original']]
+    score_colors = {'D': colors.HexColor('#FF7F7F'), 'I': colors.HexColor('#FFBF7F'), 'S': colors.HexColor('#FFFF7F'), 'C': colors.HexColor('#7FFFFF')}
+    for factor, score in scores.items():
+        factor_name = disc_descriptions.get(factor, {}).get('title', factor)
+        score_data.append([factor_name, str(score)])
+    score_table = Table(score_data, colWidths=[2*inch, 1.5*inch]) # Ajuste largura
+    score_table.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.darkgrey), # Cor Header
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0,0), (-1,0), 10),
+        ('BACKGROUND', (0,1), (-1,-1), colors.white), # Fundo branco
+        ('GRID', (0,0), (-1,-1), 1, colors.black)
+    ]))
+    story.append(score_table)
+    story.append(Spacer(1, 0.3*inch))
+
+    # Gráfico de Barras (NORMALIZADO 0-100)
+    try:
+        drawing = Drawing(400, 200)
+        # Normaliza os scores para o gráfico
+        norm_d = normalize_score_to_100(scores.get('D'))
+        norm_i = normalize_score_to_100(scores.get('I'))
+        norm_s = normalize_score_to_100(scores.get('S'))
+        norm_c = normalize_score_to_100(scores.get('C'))
+        bc_data = [(norm_d, norm_i, norm_s, norm_c)] # Reportlab precisa de lista de tuplas/listas
+
+        bc = VerticalBarChart()
+        bc.x = 50; bc.y = 50; bc.height = 125; bc.width = 300
+        bc.data = bc_data
+        bc.strokeColor = colors.black
+        bc.valueAxis.valueMin = 0
+        bc.valueAxis.valueMax = 100 # Eixo vai até 100
+        bc.valueAxis.valueStep = 20 # Steps de 20
+        bc.valueAxis.labelTextFormat = '%d%%' # Adiciona % ao label do eixo Y
+        bc.categoryAxis.labels.boxAnchor = 'ne'; bc.categoryAxis.labels.dx = 8; bc.categoryAxis.labels.dy = -2
+        cat_names = [
+            disc_descriptions.get('D', {}).get('title', 'D'), disc_descriptions.get('I', {}).get('title', 'I'),
+            disc_descriptions.get('S', {}).get('title', 'S'), disc_descriptions.get('C', {}).get('title', 'C')
+        ]
+        bc.categoryAxis.categoryNames = cat_names
+        bc.bars[(0, 0)].fillColor = score_colors.get('D', colors.black)
+        bc.bars[(0, 1)].fillColor = score_colors.get('I', colors.black)
+        bc.bars[(0, 2)].fillColor = score_colors.get('S', colors.black)
+        bc.bars[(0, 3)].fillColor = score_colors.get('C', colors.black)
+
+        chart_title = Paragraph("Gráfico do Perfil (Intensidade Normalizada %)", styles['Center'])
+        story.append(chart_title)
+        story.append(Spacer(1, 0.1*inch))
+        drawing.add(bc)
+        story.append(drawing)
+        story.append(Spacer(1, 0.3*inch))
+    except Exception as chart_err:
+        logger.error(f"Erro ao gerar gráfico normalizado PDF para ID {result_id}: {chart_err}", exc_info=True)
+        story.append(Paragraph("<i>Erro ao gerar o gráfico de pontuações.</i>", styles.get('Italic', styles['Normal'])))
+        story.append(Spacer(1, 0.3*inch))
+    return story
+
+
+def _interpretation_story(report: Dict[str, Any]) -> List[Flowable]:
+    """
+    Textos de interpretação (visão geral e análise profissional). Dependem apenas da
+    combinação (primário, nível, secundário, nível), nunca do usuário, e por isso
+    podem ser renderizados uma vez e reaproveitados (ver interpretation_fragment_id).
+    """
+    primary_type = report.get('primary_type')
+    secondary_type = report.get('secondary_type')
+    primary_gen, secondary_gen, primary_prof, secondary_prof = _split_interpretations(report)
+
+    story = []
+    # --- Seção de Interpretação Geral ---
+    story.append(Paragraph("Visão Geral do Perfil", styles['H2']))
+    story.append(Spacer(1, 0.1*inch))
+
+    # Campos a incluir e seus estilos
+    general_fields = [
+        ('Descrição', 'Descrição', styles['Justify']),
+        ('Motivação', 'Motivação', styles['Justify']),
+        ('Características', 'Características', styles['Justify']),
+        ('Pontos Fortes', 'Pontos Fortes', styles['Justify']),
+        ('Áreas de Desenvolvimento', 'Áreas de Desenvolvimento', styles['Justify']),
+        ('Relacionamento/Dicas', 'Relacionamento/Dicas', styles['Justify']),
+        ('Como Você É (Tendência Natural)', 'Tendência Natural:', styles['AlertInfoPDF']), # Alerta
+        ('Como Pode Melhorar (Reflexão para Crescimento)', 'Reflexão para Crescimento:', styles['AlertWarningPDF']) # Alerta
+    ]
+    alert_styles_gen = {
+        'Como Você É (Tendência Natural)': styles['AlertInfoPDF'],
+        'Como Pode Melhorar (Reflexão para Crescimento)': styles['AlertWarningPDF']
+    }
+
+    # Geral Primário
+    if primary_gen and primary_gen.get('type'):
+         title = f"Perfil Primário: {primary_gen['title']} ({primary_gen['type']}) - Nível {primary_gen.get('level', '?').capitalize()}"
+         add_interpretation_section_pdf(story, title, primary_gen, general_fields, title_style=styles['H3'], alert_fields=alert_styles_gen)
+    else:
+         story.append(Paragraph("Interpretação geral primária não disponível.", styles['Normal']))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Geral Secundário
+    if secondary_gen and secondary_gen.get('type'):
+        title = f"Influência Secundária: {secondary_gen['title']} ({secondary_gen['type']}) - Nível {secondary_gen.get('level', '?').capitalize()}"
+        story.append(Paragraph("<i>Esta influência secundária complementa suas características principais.</i>", styles.get('Italic', styles['Normal'])))
+        story.append(Spacer(1, 0.1*inch))
+        # Ajusta títulos para indicar influência
+        secondary_general_fields = [ (k, f"{v} (Influência)", s) if k not in alert_styles_gen else (k,v,s) for k,v,s in general_fields]
+        add_interpretation_section_pdf(story, title, secondary_gen, secondary_general_fields, title_style=styles['H3'], alert_fields=alert_styles_gen)
+    elif primary_type != '?' and secondary_type != '?': # Só mostra se o secundário era esperado
+        story.append(Paragraph(f"Interpretação da influência secundária ({secondary_type}) não encontrada.", styles['Normal']))
+    story.append(Spacer(1, 0.2*inch))
+
+
+    # --- Seção de Análise Profissional ---
+    story.append(Paragraph("Análise Profissional", styles['H2']))
+    story.append(Spacer(1, 0.1*inch))
+
+    # Função auxiliar para pegar os campos profissionais (assumindo que são todas as chaves exceto as de controle)
+    def get_professional_fields(data: Dict[str, Any]) -> List[Tuple[str, str, ParagraphStyle]]:
+        fields = []
+        if not data: return fields
+        control_keys = ['type', 'level', 'title', 'score']
+        for key, value in data.items():
+            if key not in control_keys and value: # Inclui apenas se a chave não for de controle e tiver valor
+                 fields.append((key, key.replace('_', ' '), styles['Justify'])) # Usa a chave como título
+        return fields
+
+    # Profissional Primário
+    if primary_prof and primary_prof.get('type'):
+         title = f"Tendências Profissionais - {primary_gen.get('title', primary_type)} ({primary_type})" # Usa título geral
+         prof_fields = get_professional_fields(primary_prof)
+         add_interpretation_section_pdf(story, title, primary_prof, prof_fields, title_style=styles['H3'])
+    else:
+         story.append(Paragraph("Análise profissional primária não disponível.", styles['Normal']))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Profissional Secundário
+    if secondary_prof and secondary_prof.get('type'):
+        title = f"Influência Profissional Secundária - {secondary_gen.get('title', secondary_type)} ({secondary_type})" # Usa título geral
+        story.append(Paragraph("<i>Como a influência secundária molda suas tendências profissionais.</i>", styles.get('Italic', styles['Normal'])))
+        story.append(Spacer(1, 0.1*inch))
+        prof_fields_sec = get_professional_fields(secondary_prof)
+        # Ajusta títulos para indicar influência
+        secondary_prof_fields = [ (k, f"{v} (Influência)", s) for k,v,s in prof_fields_sec]
+        add_interpretation_section_pdf(story, title, secondary_prof, secondary_prof_fields, title_style=styles['H3'])
+    elif primary_type != '?' and secondary_type != '?':
+        story.append(Paragraph(f"Análise da influência profissional secundária ({secondary_type}) não encontrada.", styles['Normal']))
+    story.append(Spacer(1, 0.2*inch))
+    return story
+
+
+def build_pdf_report(report: Dict[str, Any]) -> bytes:
+    """
+    Monta o relatório PDF completo em um único documento e retorna seus bytes.
+
+    Args:
+        report: Dicionário com 'result_id', 'user_name', 'user_email', 'timestamp'
+                (datetime ou None), 'primary_type', 'secondary_type', 'scores'
+                ({'D': int, ...}) e 'interpretations' (saída de get_all_interpretations).
+    """
+    buffer = BytesIO()
+    doc = _new_document(buffer)
+    # As interpretações começam sempre em página nova, como nos fragmentos
+    story = _cover_story(report) + [PageBreak()] + _interpretation_story(report)
+    doc.build(story)
+    logger.info(f"Documento PDF completo construído com sucesso para ID {report.get('result_id')}.")
+    return buffer.getvalue()
+
+
+def build_cover_pdf(report: Dict[str, Any]) -> bytes:
+    """Renderiza apenas a parte personalizada (capa, scores e gráfico)."""
+    buffer = BytesIO()
+    _new_document(buffer).build(_cover_story(report))
+    return buffer.getvalue()
+
+
+def build_interpretation_pdf(report: Dict[str, Any], page_offset: int) -> bytes:
+    """Renderiza apenas as páginas de interpretação, numeradas a partir de page_offset + 1."""
+    buffer = BytesIO()
+    _new_document(buffer, page_offset=page_offset).build(_interpretation_story(report))
+    return buffer.getvalue()
+
+
+def interpretation_fragment_id(report: Dict[str, Any]) -> str:
+    """Identifica a combinação que determina as páginas de interpretação: 'D-high-I-moderate'."""
+    primary_gen, secondary_gen, _, _ = _split_interpretations(report)
+    return '-'.join(str(part) for part in (
+        report.get('primary_type'), primary_gen.get('level'),
+        report.get('secondary_type'), secondary_gen.get('level'),
+    ))
+
+
+def fragment_cache_key(namespace: str, fragment_id: str, page_offset: int) -> str:
+    """Chave do fragmento no cache: namespace (hash das interpretações) + layout + combinação + deslocamento."""
+    raw = f"fragment:{namespace}:{report_layout_fingerprint()}:{fragment_id}:{page_offset}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def fragments_supported() -> bool:
+    """A concatenação de fragmentos depende do pypdf (opcional)."""
+    return PdfWriter is not None
+
+
+def build_pdf_report_with_fragments(report: Dict[str, Any], fragment_cache, namespace: str) -> bytes:
+    """
+    Monta o relatório renderizando só a capa personalizada e concatenando as páginas
+    de interpretação da combinação, que ficam em fragment_cache (get/read/put por
+    chave, ex: PDFCache). Sem pypdf, cai para build_pdf_report.
+
+    O fragmento depende do número de páginas da capa (numeração do rodapé), então
+    é guardado por (combinação, deslocamento).
+    """
+    if not fragments_supported():
+        return build_pdf_report(report)
+
+    cover = build_cover_pdf(report)
+    cover_reader = PdfReader(BytesIO(cover))
+    page_offset = len(cover_reader.pages)
+
+    key = fragment_cache_key(namespace, interpretation_fragment_id(report), page_offset)
+    fragment = fragment_cache.read(key)
+    if fragment is None:
+        fragment = build_interpretation_pdf(report, page_offset)
+        try:
+            fragment_cache.put(key, fragment)
+        except OSError as e:
+            logger.warning(f"Falha ao gravar fragmento de interpretação no cache: {e}")
+        logger.info(f"Fragmento de interpretação '{interpretation_fragment_id(report)}' renderizado (deslocamento {page_offset}).")
+
+    writer = PdfWriter()
+    writer.append(cover_reader)
+    writer.append(PdfReader(BytesIO(fragment)))
+    output = BytesIO()
+    writer.write(output)
+    logger.info(f"Documento PDF montado a partir de fragmentos para ID {report.get('result_id')}.")
+    return output.getvalue()
+
+
+_layout_fingerprint: Optional[str] = None
+
+def report_layout_fingerprint() -> str:
+    """Hash do código deste módulo + PDF_LAYOUT_VERSION (muda sempre que o layout muda)."""
+    global _layout_fingerprint
+    if _layout_fingerprint is None:
+        with open(__file__, 'rb') as f:
+            source = f.read()
+        _layout_fingerprint = hashlib.sha256(f"v{PDF_LAYOUT_VERSION}:".encode() + source).hexdigest()
+    return _layout_fingerprint
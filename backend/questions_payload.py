@@ -0,0 +1,64 @@
+# backend/questions_payload.py
+
+"""
+Resposta pré-serializada de /api/questions.
+
+As questões só mudam a cada deploy, então o JSON (puro e gzip) e os ETags fortes
+(um por codificação, já que os bytes diferem) são calculados uma única vez na importação. A versão (prefixo do hash) entra na URL
+usada pelo quiz (/api/questions?v=<versão>), o que permite cache longo e imutável
+no navegador: um deploy com questões novas gera outra URL. A mesma serialização,
+escapada para HTML, pode ser embutida no quiz.html (QUIZ_INLINE_QUESTIONS).
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, List, NamedTuple
+
+try:
+    from .disc_data import disc_questions
+except ImportError:
+    from backend.disc_data import disc_questions
+
+
+class QuestionsPayload(NamedTuple):
+    body: bytes        # JSON compacto (UTF-8)
+    gzip_body: bytes   # Mesmo JSON comprimido com gzip (determinístico, mtime=0)
+    etag: str          # sha256 do JSON (ETag forte da versão sem compressão)
+    gzip_etag: str     # ETag forte da versão gzip ('<etag>-gz')
+    version: str       # Prefixo do hash, usado em ?v=
+    inline_json: str   # JSON seguro para <script type="application/json"> no quiz.html
+
+
+# Caracteres que não podem aparecer crus dentro de uma tag <script>
+_HTML_UNSAFE = {
+    '<': '\\u003c',
+    '>': '\\u003e',
+    '&': '\\u0026',
+    '\u2028': '\\u2028',
+    '\u2029': '\\u2029',
+}
+
+
+def html_safe_json(text: str) -> str:
+    """Escapa um JSON para ser embutido em HTML sem fechar a tag <script> (equivale a |tojson)."""
+    for char, escaped in _HTML_UNSAFE.items():
+        text = text.replace(char, escaped)
+    return text
+
+
+def build_questions_payload(questions: List[Any]) -> QuestionsPayload:
+    """Serializa a lista de questões e calcula os dados de cache HTTP."""
+    text = json.dumps(questions, ensure_ascii=False, separators=(',', ':'))
+    body = text.encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()
+    return QuestionsPayload(
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        etag=digest,
+        gzip_etag=f"{digest}-gz",
+        version=digest[:12],
+        inline_json=html_safe_json(text),
+    )
+
+
+questions_payload = build_questions_payload(disc_questions)
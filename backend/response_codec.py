@@ -0,0 +1,118 @@
+# backend/response_codec.py
+
+"""
+Codificação binária compacta das respostas brutas (raw_responses).
+
+Formato v1 (1 + ceil(N/2) bytes; 15 bytes para as 28 questões atuais):
+
+    byte 0      versão do codec (1)
+    bytes 1..   um nibble por questão, na ordem de disc_questions (nibble alto
+                primeiro): (índice MAIS << 2) | índice MENOS, com índices na
+                ordem D, I, S, C. MAIS == MENOS é impossível numa resposta
+                válida, então o nibble 0 (D/D) marca questão não respondida.
+
+Só são codificadas listas que o decodificador reproduz exatamente (formato do
+frontend: {'questionId', 'mais', 'menos'} em ordem de questão, palavras idênticas
+às do conjunto). Qualquer outra coisa devolve None e continua como JSON.
+As palavras dependem do conjunto de questões, por isso cada linha guarda
+QUESTION_SET_VERSION; conjuntos antigos devem continuar registrados em
+question_sets para que linhas antigas possam ser decodificadas.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+try:
+    from .disc_data import disc_questions, PROFILE_KEYS, QUESTION_SET_VERSION
+except ImportError:
+    from backend.disc_data import disc_questions, PROFILE_KEYS, QUESTION_SET_VERSION
+
+CODEC_VERSION = 1
+_ABSENT = 0
+
+# Conjuntos de questões conhecidos, por versão (manter versões antigas ao alterar as questões)
+question_sets: Mapping[str, Sequence[Dict[str, Any]]] = MappingProxyType({
+    QUESTION_SET_VERSION: disc_questions,
+})
+
+
+class ResponseCodecError(ValueError):
+    """Dados codificados inválidos ou de versão/conjunto de questões desconhecido."""
+
+
+def packed_size(questions: Sequence[Dict[str, Any]] = disc_questions) -> int:
+    """Tamanho em bytes de um conjunto de respostas codificado."""
+    return 1 + (len(questions) + 1) // 2
+
+
+def _option_index(question: Dict[str, Any], word: Any) -> Optional[int]:
+    """Índice (0..3, ordem D, I, S, C) da palavra exata na questão, ou None."""
+    for index, profile in enumerate(PROFILE_KEYS):
+        if question[profile] == word:
+            return index
+    return None
+
+
+def encode_responses(raw_responses: Any, questions: Sequence[Dict[str, Any]] = disc_questions) -> Optional[bytes]:
+    """
+    Codifica a lista de respostas no formato v1. Retorna None se a lista não puder
+    ser reproduzida sem perdas pelo decodificador (nesse caso, guarde o JSON).
+    """
+    if not isinstance(raw_responses, list):
+        return None
+    nibbles = [_ABSENT] * len(questions)
+    slot = 0
+    for answer in raw_responses:
+        if not isinstance(answer, dict) or len(answer) != 3:
+            return None
+        question_id = answer.get('questionId')
+        if isinstance(question_id, bool) or not isinstance(question_id, int):
+            return None
+        # Avança até a questão (as respostas precisam vir na ordem das questões)
+        while slot < len(questions) and questions[slot]['id'] != question_id:
+            slot += 1
+        if slot == len(questions):
+            return None
+        mais = _option_index(questions[slot], answer.get('mais'))
+        menos = _option_index(questions[slot], answer.get('menos'))
+        if mais is None or menos is None or mais == menos:
+            return None
+        nibbles[slot] = (mais << 2) | menos
+        slot += 1
+
+    if len(nibbles) % 2:
+        nibbles.append(_ABSENT)
+    packed = bytearray([CODEC_VERSION])
+    packed.extend((nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles), 2))
+    return bytes(packed)
+
+
+def decode_responses(data: bytes, questions: Sequence[Dict[str, Any]] = disc_questions) -> List[Dict[str, Any]]:
+    """Decodifica bytes v1 de volta para a lista de respostas no formato do frontend."""
+    if not data or data[0] != CODEC_VERSION:
+        raise ResponseCodecError(f"Versão de codec desconhecida: {data[:1]!r}")
+    if len(data) != packed_size(questions):
+        raise ResponseCodecError(f"Tamanho inválido: {len(data)} bytes (esperado {packed_size(questions)}).")
+
+    responses: List[Dict[str, Any]] = []
+    for slot, question in enumerate(questions):
+        byte = data[1 + slot // 2]
+        nibble = byte >> 4 if slot % 2 == 0 else byte & 0x0F
+        if nibble == _ABSENT:
+            continue
+        mais, menos = nibble >> 2, nibble & 0x03
+        if mais == menos:
+            raise ResponseCodecError(f"Resposta inválida na questão {question['id']}.")
+        responses.append({
+            'questionId': question['id'],
+            'mais': question[PROFILE_KEYS[mais]],
+            'menos': question[PROFILE_KEYS[menos]],
+        })
+    return responses
+
+
+def decode_for_version(data: bytes, question_set_version: Optional[str]) -> List[Dict[str, Any]]:
+    """Decodifica usando o conjunto de questões com o qual a linha foi gravada."""
+    questions = question_sets.get(question_set_version or '')
+    if questions is None:
+        raise ResponseCodecError(f"Conjunto de questões desconhecido: {question_set_version!r}")
+    return decode_responses(data, questions)
@@ -0,0 +1,149 @@
+# backend/result_cache.py
+
+"""
+Cache dos resultados já hidratados (scores + interpretações).
+
+O fluxo típico é abrir /results e baixar o PDF logo em seguida; as duas rotas
+precisam do mesmo resultado com scores e interpretações. Como um resultado nunca
+muda depois de gravado, a visão montada no insert (/api/calculate) é guardada
+aqui e servida sem acessar o banco. Fica em memória (L1, LRU + TTL) e no cache
+compartilhado (L2, ver backend/cache.py), para que o worker que atende /results
+não precise ser o mesmo que gravou o resultado. Não há invalidação além do TTL.
+"""
+import logging
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional
+
+from cachelib import BaseCache
+from flask import current_app
+
+try:
+    from .cache import TieredCache
+    from .interpretation_logic import get_all_interpretations, _freeze
+except ImportError:
+    from backend.cache import TieredCache
+    from backend.interpretation_logic import get_all_interpretations, _freeze
+
+logger = logging.getLogger(__name__)
+
+
+class ResultView(NamedTuple):
+    """Visão somente leitura de um DISCResult, com os mesmos atributos usados pelas rotas e templates."""
+    id: int
+    user_name: Optional[str]
+    user_email: Optional[str]
+    timestamp: Optional[datetime]
+    primary_type: Optional[str]
+    secondary_type: Optional[str]
+    scores: Optional[Mapping[str, int]]
+    interpretations: Mapping[str, Any]
+
+    def get_scores(self) -> Optional[Dict[str, int]]:
+        """Mesma interface de DISCResult.get_scores (cópia mutável)."""
+        return dict(self.scores) if self.scores is not None else None
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[str, Any]) -> 'ResultView':
+        """Monta a visão a partir dos campos do resultado (calcula as interpretações)."""
+        scores = fields['scores']
+        if scores is None:
+            interpretations = {'general': {'primary': {}, 'secondary': {}},
+                               'professional': {'primary': {}, 'secondary': {}}}
+        else:
+            interpretations = get_all_interpretations(fields['primary_type'], fields['secondary_type'], dict(scores))
+        return cls(
+            id=fields['id'],
+            user_name=fields['user_name'],
+            user_email=fields['user_email'],
+            timestamp=fields['timestamp'],
+            primary_type=fields['primary_type'],
+            secondary_type=fields['secondary_type'],
+            scores=MappingProxyType(dict(scores)) if scores is not None else None,
+            interpretations=_freeze(interpretations),
+        )
+
+    @classmethod
+    def from_result(cls, result) -> 'ResultView':
+        """Monta a visão a partir de um DISCResult."""
+        return cls.from_fields({
+            'id': result.id,
+            'user_name': result.user_name,
+            'user_email': result.user_email,
+            'timestamp': result.timestamp,
+            'primary_type': result.primary_type,
+            'secondary_type': result.secondary_type,
+            'scores': result.get_scores(),
+        })
+
+    @classmethod
+    def from_row(cls, result_id: int, row: Mapping[str, Any]) -> 'ResultView':
+        """Monta a visão a partir do dict de DISCResult.row_values já gravado com o ID result_id."""
+        scores = {'D': row['d_score'], 'I': row['i_score'], 'S': row['s_score'], 'C': row['c_score']}
+        return cls.from_fields({
+            'id': result_id,
+            'user_name': row['user_name'],
+            'user_email': row['user_email'],
+            'timestamp': row['timestamp'],
+            'primary_type': row['primary_type'],
+            'secondary_type': row['secondary_type'],
+            'scores': None if None in scores.values() else scores,
+        })
+
+    def to_fields(self) -> Dict[str, Any]:
+        """Campos serializáveis (sem as interpretações, refeitas a partir da tabela ao ler)."""
+        return {
+            'id': self.id,
+            'user_name': self.user_name,
+            'user_email': self.user_email,
+            'timestamp': self.timestamp,
+            'primary_type': self.primary_type,
+            'secondary_type': self.secondary_type,
+            'scores': self.get_scores(),
+        }
+
+
+class ResultCache(TieredCache):
+    """
+    Mapa ID -> ResultView: L1 limitado a max_entries (LRU) e ttl_seconds, seguro
+    entre threads (workers gthread), na frente do cache compartilhado opcional.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, shared: Optional[BaseCache] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__('result', max_entries, ttl_seconds, shared=shared,
+                         serialize=ResultView.to_fields, deserialize=ResultView.from_fields, clock=clock)
+
+    def put(self, view: ResultView) -> ResultView:
+        """Guarda a visão nos dois níveis."""
+        return self.set(view.id, view)
+
+    def get_or_load(self, result_id: int, loader: Callable[[int], Any]) -> Optional[ResultView]:
+        """
+        Retorna a visão do cache ou carrega o DISCResult com loader(result_id), monta a
+        visão e guarda. Retorna None se o resultado não existir.
+        """
+        view = self.get(result_id)
+        if view is not None:
+            return view
+        result = loader(result_id)
+        if result is None:
+            return None
+        return self.put(ResultView.from_result(result))
+
+
+def init_result_cache(app) -> ResultCache:
+    """Cria o cache de resultados da aplicação (RESULT_CACHE_MAX_ENTRIES / RESULT_CACHE_TTL_SECONDS)."""
+    cache = ResultCache(
+        max_entries=int(app.config.get('RESULT_CACHE_MAX_ENTRIES', 1024)),
+        ttl_seconds=float(app.config.get('RESULT_CACHE_TTL_SECONDS', 900)),
+        shared=app.extensions.get('shared_cache')
+    )
+    app.extensions['result_cache'] = cache
+    return cache
+
+
+def get_result_cache() -> ResultCache:
+    """Retorna o cache de resultados da aplicação atual."""
+    return current_app.extensions['result_cache']
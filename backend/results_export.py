@@ -0,0 +1,137 @@
+# backend/results_export.py
+
+"""
+Exportação em fluxo (NDJSON ou CSV) dos resultados, para carga no data warehouse.
+
+As linhas são lidas como tuplas de colunas (sem objetos ORM no identity map) com
+yield_per, que usa cursor do lado do servidor onde o driver suporta; cada linha
+é decodificada e serializada individualmente e a saída sai em blocos de
+~EXPORT_CHUNK_BYTES. A memória do worker não depende do número de linhas.
+Exportações incrementais usam since_id (marca d'água por ID, preferível) ou
+since (timestamp).
+
+Como em refresh_daily_stats, a exportação para antes do primeiro resultado mais
+novo que lag_seconds (EXPORT_LAG_SECONDS): IDs menores ainda podem estar em
+transações abertas (lotes da gravação em grupo, requisições concorrentes) e
+apareceriam depois abaixo da marca d'água. O maior 'id' exportado é, portanto,
+um since_id seguro para a próxima carga, desde que nenhuma transação de gravação
+dure mais que o atraso configurado.
+"""
+import csv
+import io
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import msgspec
+from sqlalchemy import func, or_, select
+
+try:
+    from .models.disc_result import DISCResult, SUMMARY_COLUMNS, SCORE_COLUMNS, LEVEL_COLUMNS
+    from .response_codec import decode_for_version, ResponseCodecError
+    from .schemas import json_encoder, json_decoder
+except ImportError:
+    from backend.models.disc_result import DISCResult, SUMMARY_COLUMNS, SCORE_COLUMNS, LEVEL_COLUMNS
+    from backend.response_codec import decode_for_version, ResponseCodecError
+    from backend.schemas import json_encoder, json_decoder
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Campos exportados, na ordem das colunas do CSV
+EXPORT_FIELDS = SUMMARY_COLUMNS + SCORE_COLUMNS + LEVEL_COLUMNS + ('question_set_version',)
+RAW_RESPONSES_FIELD = 'raw_responses'
+_RAW_COLUMNS = ('raw_responses_packed', 'raw_responses_json')
+
+
+def export_statement(since_id: Optional[int] = None, since: Optional[datetime] = None,
+                     include_raw: bool = False, lag_seconds: float = 0, now: Optional[datetime] = None):
+    """
+    SELECT das colunas exportadas, em ordem de ID (since_id exclusivo, since inclusivo).
+    Com lag_seconds > 0, só inclui os IDs anteriores ao primeiro resultado gravado
+    depois de now - lag_seconds (o maior ID exportado serve de próximo since_id).
+    """
+    columns = EXPORT_FIELDS + (_RAW_COLUMNS if include_raw else ())
+    stmt = select(*(getattr(DISCResult, name) for name in columns))
+    if since_id is not None:
+        stmt = stmt.where(DISCResult.id > since_id)
+    if since is not None:
+        stmt = stmt.where(DISCResult.timestamp >= since)
+    if lag_seconds > 0:
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=lag_seconds)
+        # Primeira linha recente demais após a marca (sem os demais filtros): a exportação para nela
+        first_recent = select(func.min(DISCResult.id)).where(DISCResult.timestamp >= cutoff)
+        if since_id is not None:
+            first_recent = first_recent.where(DISCResult.id > since_id)
+        first_recent = first_recent.scalar_subquery()
+        stmt = stmt.where(or_(first_recent.is_(None), DISCResult.id < first_recent))
+    return stmt.order_by(DISCResult.id)
+
+
+def _decode_raw_responses(mapping) -> Optional[List[Dict[str, Any]]]:
+    """Respostas brutas da linha (formato compacto ou JSON); None se ilegíveis."""
+    try:
+        if mapping['raw_responses_packed'] is not None:
+            return decode_for_version(mapping['raw_responses_packed'], mapping['question_set_version'])
+        return json_decoder.decode(mapping['raw_responses_json'] or '[]')
+    except (ResponseCodecError, msgspec.DecodeError, ValueError, TypeError) as e:
+        logger.warning(f"Exportação: respostas brutas ilegíveis no resultado ID {mapping['id']}: {e}")
+        return None
+
+
+def iter_export_records(rows: Iterable, include_raw: bool = False) -> Iterator[Dict[str, Any]]:
+    """Converte cada linha do cursor em um dict de campos exportados (datas em ISO 8601)."""
+    for row in rows:
+        mapping = row._mapping
+        record = {name: mapping[name] for name in EXPORT_FIELDS}
+        if record['timestamp'] is not None:
+            record['timestamp'] = record['timestamp'].isoformat()
+        if include_raw:
+            record[RAW_RESPONSES_FIELD] = _decode_raw_responses(mapping)
+        yield record
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]], chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """Um objeto JSON por linha, agrupados em blocos de ~chunk_bytes."""
+    buffer: List[bytes] = []
+    size = 0
+    for record in records:
+        line = json_encoder.encode(record) + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_csv(records: Iterable[Dict[str, Any]], include_raw: bool = False,
+             chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """CSV com cabeçalho; raw_responses (se incluído) vai como JSON na coluna."""
+    fields = EXPORT_FIELDS + ((RAW_RESPONSES_FIELD,) if include_raw else ())
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(fields)
+    for record in records:
+        if include_raw:
+            record[RAW_RESPONSES_FIELD] = json_encoder.encode(record[RAW_RESPONSES_FIELD]).decode('utf-8')
+        writer.writerow([record[name] for name in fields])
+        if text.tell() >= chunk_bytes:
+            yield text.getvalue().encode('utf-8')
+            text.seek(0)
+            text.truncate()
+    if text.tell():
+        yield text.getvalue().encode('utf-8')
+
+
+def stream_export(rows: Iterable, fmt: str, include_raw: bool = False,
+                  chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """Blocos de bytes da exportação no formato pedido ('ndjson' ou 'csv')."""
+    records = iter_export_records(rows, include_raw)
+    if fmt == 'ndjson':
+        return iter_ndjson(records, chunk_bytes)
+    if fmt == 'csv':
+        return iter_csv(records, include_raw, chunk_bytes)
+    raise ValueError(f"Formato de exportação inválido: '{fmt}'. Use um de {EXPORT_FORMATS}.")
@@ -0,0 +1,73 @@
+# backend/schemas.py
+
+"""
+Esquemas msgspec dos payloads da API e codificadores JSON compartilhados.
+
+O corpo de /api/calculate é decodificado direto para CalculatePayload: parse do
+JSON e validação de tipos numa única passada em C, sem o dict intermediário de
+request.get_json() nem as cadeias de isinstance. Os mesmos codificadores
+(json_encoder/json_decoder) servem o provedor JSON da aplicação e as colunas
+JSON de DISCResult.
+"""
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Union
+
+import msgspec
+
+# Campos obrigatórios de texto: presentes e não vazios
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+
+
+class Answer(msgspec.Struct):
+    """Uma resposta do questionário (chaves camelCase enviadas pelo frontend)."""
+    questionId: Union[int, NonEmptyStr]  # O frontend envia int; IDs em texto ("3") seguem aceitos
+    mais: NonEmptyStr
+    menos: NonEmptyStr
+
+
+class UserInfo(msgspec.Struct):
+    """Identificação opcional do participante."""
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+    def cleaned(self) -> Tuple[Optional[str], Optional[str]]:
+        """Nome e email sem espaços extras (None quando vazios)."""
+        user_name = self.name.strip() if self.name else None
+        user_email = self.email.strip() if self.email else None
+        return (user_name or None), (user_email or None)
+
+
+class CalculatePayload(msgspec.Struct):
+    """Corpo de POST /api/calculate. Campos desconhecidos são ignorados."""
+    answers: Annotated[List[Answer], msgspec.Meta(min_length=1)]
+    userInfo: Optional[UserInfo] = None
+    idempotencyKey: Optional[str] = None
+
+    def answer_dicts(self) -> List[Dict[str, Any]]:
+        """Respostas como dicts (formato esperado pelo cálculo e pelo codec de respostas)."""
+        return msgspec.to_builtins(self.answers)
+
+
+json_encoder = msgspec.json.Encoder()
+json_decoder = msgspec.json.Decoder()
+calculate_payload_decoder = msgspec.json.Decoder(CalculatePayload)
+
+
+def decode_calculate_payload(data: bytes) -> CalculatePayload:
+    """Decodifica e valida o corpo de /api/calculate. Levanta ValueError com a mensagem do problema."""
+    try:
+        return calculate_payload_decoder.decode(data)
+    except msgspec.ValidationError as e:
+        raise ValueError(f"Payload inválido: {e}") from e
+    except msgspec.DecodeError as e:
+        raise ValueError(f"JSON malformado: {e}") from e
+
+
+def convert_calculate_item(item: Any) -> CalculatePayload:
+    """
+    Valida um item já decodificado (ex.: um elemento de /api/calculate/batch) com o mesmo
+    esquema de /api/calculate. Levanta ValueError com a mensagem do problema.
+    """
+    try:
+        return msgspec.convert(item, CalculatePayload)
+    except msgspec.ValidationError as e:
+        raise ValueError(f"Payload inválido: {e}") from e
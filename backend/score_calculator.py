@@ -5,21 +5,35 @@ Algoritmo de pontuação para a avaliação DISC.
 Calcula o perfil DISC com base nas respostas MAIS e MENOS, utilizando as palavras selecionadas.
 """
 import logging
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, NamedTuple, Sequence, Tuple, TYPE_CHECKING
 from datetime import datetime # Manter a importação
 
 # Importa as descrições e a função para buscar o perfil pela palavra
 try:
     # Tenta import relativo primeiro
-    from .disc_data import disc_descriptions, get_profile_for_word, disc_questions
+    from .disc_data import (
+        disc_descriptions, get_profile_for_word, disc_questions,
+        PROFILE_KEYS, normalize_word, question_slots, word_profile_index
+    )
 except ImportError:
     # Fallback para absoluto (menos ideal dentro de um pacote)
-    from disc_data import disc_descriptions, get_profile_for_word, disc_questions
+    from disc_data import (
+        disc_descriptions, get_profile_for_word, disc_questions,
+        PROFILE_KEYS, normalize_word, question_slots, word_profile_index
+    )
     logging.warning("Usando import absoluto em score_calculator.py")
 
+if TYPE_CHECKING:
+    import numpy as np
+
 # Cria um logger específico para este módulo
 logger = logging.getLogger(__name__)
 
+# Versão do formato do resultado salvo: 1 = 'detailed_report' gravado no JSON;
+# 2 = apenas scores/perfis (relatório reconstruído por build_detailed_report)
+REPORT_SCHEMA_VERSION = 2
+
 def calculate_disc_scores(responses: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Calcula as pontuações DISC com base nas respostas fornecidas (palavras).
@@ -40,8 +54,11 @@ def calculate_disc_scores(responses: List[Dict[str, Any]]) -> Optional[Dict[str,
     disc_scores = {'D': 0, 'I': 0, 'S': 0, 'C': 0}
     valid_responses_processed = 0 # Contador para respostas válidas
 
+    # Logs por resposta só são formatados se DEBUG estiver ativo (o f-string tem custo mesmo descartado)
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
     # Loga as primeiras respostas para verificar o formato recebido
-    if responses:
+    if debug_enabled:
         logger.debug(f"Recebido {len(responses)} respostas. Exemplo da primeira: {responses[0] if responses else 'N/A'}") # Log seguro
 
     # Processa cada resposta
@@ -57,7 +74,8 @@ def calculate_disc_scores(responses: List[Dict[str, Any]]) -> Optional[Dict[str,
             mais_word = answer.get('mais')
             menos_word = answer.get('menos')
             # Log para cada resposta no formato esperado
-            logger.debug(f"Processando resposta {idx+1}/{len(responses)}: ID={question_id_val}, Mais='{mais_word}', Menos='{menos_word}'")
+            if debug_enabled:
+                logger.debug(f"Processando resposta {idx+1}/{len(responses)}: ID={question_id_val}, Mais='{mais_word}', Menos='{menos_word}'")
         else:
              # Loga se o formato não for reconhecido
              logger.warning(f"Formato de resposta inesperado no índice {idx}, ignorando: {answer}")
@@ -75,15 +93,12 @@ def calculate_disc_scores(responses: List[Dict[str, Any]]) -> Optional[Dict[str,
         profile_mais = None
         profile_menos = None
         try:
-            # Encontra o perfil para a palavra MAIS (passa question_id_val)
-            # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-            # !!! IMPORTANTE: A CORREÇÃO DE get_profile_for_word DEPENDE !!!
-            # !!! DO CONTEÚDO DE backend/disc_data.py                    !!!
-            # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+            # Encontra o perfil para a palavra MAIS (consulta O(1) no word_profile_index de disc_data)
             profile_mais = get_profile_for_word(question_id_val, mais_word)
             if profile_mais:
                 disc_scores[profile_mais] += 1
-                logger.debug(f"  -> Q{question_id_val} MAIS='{mais_word}' -> Perfil={profile_mais}. Score {profile_mais} agora = {disc_scores[profile_mais]}")
+                if debug_enabled:
+                    logger.debug(f"  -> Q{question_id_val} MAIS='{mais_word}' -> Perfil={profile_mais}. Score {profile_mais} agora = {disc_scores[profile_mais]}")
             else:
                 # Este warning é crucial para saber se o mapeamento está falhando
                 logger.warning(f"  -> Q{question_id_val} MAIS='{mais_word}' -> Perfil NÃO ENCONTRADO. Verifique disc_data.py e a palavra exata enviada.")
@@ -97,7 +112,8 @@ def calculate_disc_scores(responses: List[Dict[str, Any]]) -> Optional[Dict[str,
                      logger.warning(f"  -> Q{question_id_val}: Mesma palavra ('{mais_word}') ou perfil ({profile_mais}) para MAIS e MENOS. Pontuação MENOS ignorada.")
                 else:
                     disc_scores[profile_menos] -= 1
-                    logger.debug(f"  -> Q{question_id_val} MENOS='{menos_word}' -> Perfil={profile_menos}. Score {profile_menos} agora = {disc_scores[profile_menos]}")
+                    if debug_enabled:
+                        logger.debug(f"  -> Q{question_id_val} MENOS='{menos_word}' -> Perfil={profile_menos}. Score {profile_menos} agora = {disc_scores[profile_menos]}")
             else:
                 # Este warning é crucial
                 logger.warning(f"  -> Q{question_id_val} MENOS='{menos_word}' -> Perfil NÃO ENCONTRADO. Verifique disc_data.py e a palavra exata enviada.")
@@ -168,42 +184,200 @@ def calculate_disc_scores(responses: List[Dict[str, Any]]) -> Optional[Dict[str,
         # >>> FIM DA CORREÇÃO <<<
     }
 
-    # Gera o relatório detalhado (função auxiliar não modificada, assume que está ok)
-    # Passa as descrições para a função de relatório, se necessário
-    detailed_report_data = generate_detailed_report(result_base, disc_descriptions) # Passa descrições explicitamente
-
-    # Combina o resultado base com o relatório detalhado
-    # O model DISCResult salvará este dicionário inteiro no campo JSON
+    # O relatório detalhado não é mais gravado: é reconstruído sob demanda a partir
+    # de disc_descriptions (build_detailed_report). Só scores, perfis e a versão do
+    # esquema vão para o JSON salvo pelo model DISCResult.
     final_result = {
         **result_base,
-        'detailed_report': detailed_report_data
-     }
+        'report_schema_version': REPORT_SCHEMA_VERSION
+    }
 
     logger.info(f"Scores DISC calculados: D={final_result['d_score']}, I={final_result['i_score']}, S={final_result['s_score']}, C={final_result['c_score']}. Primário: {primary_profile}, Secundário: {secondary_profile}. Processadas {valid_responses_processed}/{len(responses)} respostas.")
     # Log do resultado final antes de retornar
-    logger.debug(f"Retornando resultado final: {final_result}")
+    if debug_enabled:
+        logger.debug(f"Retornando resultado final: {final_result}")
     return final_result
 
 
-# --- Funções Auxiliares (get_profile_summary, generate_detailed_report) ---
-# Modificar generate_detailed_report para aceitar descrições
+# --- Score em Lote (NumPy) ---
+# O numpy é importado dentro das funções de lote para não pesar no import do
+# caminho escalar (rota /api/calculate).
+
+# Código numérico de cada perfil na matriz codificada (-1 = resposta ausente/inválida)
+PROFILE_CODES = {profile: code for code, profile in enumerate(PROFILE_KEYS)}
+# Colunas reordenadas alfabeticamente (C, D, I, S): argmax devolve o primeiro máximo,
+# reproduzindo o desempate de sorted(key=(-score, letra)) do cálculo escalar
+_ALPHABETICAL_COLUMNS = [PROFILE_CODES[p] for p in sorted(PROFILE_KEYS)]
+_ALPHABETICAL_LETTERS = sorted(PROFILE_KEYS)
+# Atalho para a palavra exatamente como está em disc_questions (caso comum vindo do
+# frontend), evitando normalize_word; o valor já inclui o deslocamento +1 de encode_submissions
+_EXACT_WORD_CODES = {
+    (question['id'], question[profile]): PROFILE_CODES[profile] + 1
+    for question in disc_questions for profile in PROFILE_KEYS
+}
+
+
+class BatchScores(NamedTuple):
+    """Resultado do score em lote para N submissões."""
+    scores: 'np.ndarray'              # (N, 4) int32, colunas na ordem D, I, S, C
+    primary_profiles: List[str]       # Perfil primário de cada submissão
+    secondary_profiles: List[str]     # Perfil secundário de cada submissão
+    valid_counts: 'np.ndarray'        # (N,) respostas com ao menos um perfil reconhecido
+    answered_counts: 'np.ndarray'     # (N,) respostas recebidas (0 = submissão vazia/inválida)
+
+
+def _word_code(q_id: int, word: Any) -> int:
+    """Código (+1) do perfil da palavra na questão, 0 se não reconhecida."""
+    if not isinstance(word, str):
+        return 0
+    code = _EXACT_WORD_CODES.get((q_id, word))
+    if code is None:
+        profile = word_profile_index.get((q_id, normalize_word(word)))
+        code = PROFILE_CODES[profile] + 1 if profile is not None else 0
+    return code
+
+
+def encode_submissions(submissions: Sequence[Any]) -> 'np.ndarray':
+    """
+    Codifica N submissões (listas de {'questionId', 'mais', 'menos'}) em uma matriz
+    int8 (N x colunas x 2) com o código do perfil MAIS/MENOS de cada resposta.
+    Aplica as regras de calculate_disc_scores: a resposta só conta se tiver
+    questionId, mais e menos preenchidos, e cada palavra é reconhecida de forma
+    independente. As colunas são as questões, na ordem de question_slots; se a
+    mesma questão aparecer mais de uma vez na submissão, cada repetição também
+    conta e vai para colunas extras após as questões. Posições vazias ou palavras
+    não reconhecidas ficam com -1.
+    """
+    import numpy as np
+
+    n_questions = len(question_slots)
+    # bytearray com deslocamento +1 (0 = ausente): atribuições por item em bytearray são
+    # muito mais baratas que em um ndarray, que é montado de uma vez no final
+    buffer = bytearray(len(submissions) * n_questions * 2)
+    repeated: Dict[int, List[Tuple[int, int]]] = {}  # Linha -> códigos das respostas repetidas
+    for row, answers in enumerate(submissions):
+        if not isinstance(answers, list):
+            continue
+        row_offset = row * n_questions * 2
+        seen = bytearray(n_questions)
+        for answer in answers:
+            if not isinstance(answer, dict):
+                continue
+            q_value, mais_word, menos_word = answer.get('questionId'), answer.get('mais'), answer.get('menos')
+            if not q_value or not mais_word or not menos_word:
+                continue  # Resposta incompleta: ignorada por inteiro, como no cálculo escalar
+            try:
+                q_id = int(q_value)
+            except (ValueError, TypeError):
+                continue
+            slot = question_slots.get(q_id)
+            if slot is None:
+                continue
+            codes = (_word_code(q_id, mais_word), _word_code(q_id, menos_word))
+            if seen[slot]:
+                repeated.setdefault(row, []).append(codes)
+                continue
+            seen[slot] = 1
+            offset = row_offset + slot * 2
+            buffer[offset], buffer[offset + 1] = codes
+    encoded = (np.frombuffer(buffer, dtype=np.uint8).astype(np.int8) - 1).reshape(len(submissions), n_questions, 2)
+    if not repeated:
+        return encoded
+    extra = np.full((len(submissions), max(len(codes) for codes in repeated.values()), 2), -1, dtype=np.int8)
+    for row, codes in repeated.items():
+        extra[row, :len(codes)] = np.array(codes, dtype=np.int8) - 1
+    return np.concatenate([encoded, extra], axis=1)
+
+
+def score_encoded_batch(encoded: 'np.ndarray', answered_counts: Optional['np.ndarray'] = None) -> BatchScores:
+    """
+    Calcula scores, perfil primário e secundário de uma matriz codificada por
+    encode_submissions usando apenas reduções NumPy. Segue as mesmas regras de
+    calculate_disc_scores: MAIS soma 1, MENOS subtrai 1 (ignorado se for o mesmo
+    perfil do MAIS) e o desempate é alfabético.
+    """
+    import numpy as np
+
+    encoded = np.asarray(encoded)
+    n_rows = encoded.shape[0]
+    profile_codes = np.arange(len(PROFILE_KEYS), dtype=encoded.dtype)
+    mais = encoded[..., 0]
+    menos = encoded[..., 1]
+
+    # Contagens por perfil via one-hot (N x Q x 4) reduzido no eixo das questões
+    plus = (mais[..., None] == profile_codes).sum(axis=1, dtype=np.int32)
+    menos_effective = np.where(menos == mais, -1, menos)
+    minus = (menos_effective[..., None] == profile_codes).sum(axis=1, dtype=np.int32)
+    scores = plus - minus
+
+    valid_counts = ((mais >= 0) | (menos >= 0)).sum(axis=1)
+    if answered_counts is None:
+        answered_counts = valid_counts
+
+    alphabetical = scores[:, _ALPHABETICAL_COLUMNS]
+    primary_idx = alphabetical.argmax(axis=1)
+    masked = alphabetical.copy()
+    masked[np.arange(n_rows), primary_idx] = np.iinfo(np.int32).min
+    secondary_idx = masked.argmax(axis=1)
+
+    letters = np.array(_ALPHABETICAL_LETTERS)
+    return BatchScores(
+        scores=scores,
+        primary_profiles=letters[primary_idx].tolist(),
+        secondary_profiles=letters[secondary_idx].tolist(),
+        valid_counts=valid_counts,
+        answered_counts=np.asarray(answered_counts),
+    )
+
+
+def calculate_disc_scores_batch(submissions: Sequence[Any]) -> BatchScores:
+    """
+    Versão em lote de calculate_disc_scores para N submissões (ex: rescore de
+    histórico ou importação de arquivos de parceiros). Não gera logs por resposta.
+    """
+    import numpy as np
 
-def get_profile_summary(disc_result: Dict[str, Any], descriptions: Dict) -> str:
-    """Gera um resumo textual do perfil DISC."""
-    # Verifica as chaves esperadas no disc_result que vem do CALCULATOR
-    if not disc_result or not all(k in disc_result for k in ['primary_profile', 'secondary_profile', 'd_score', 'i_score', 's_score', 'c_score']):
-        logger.error("Dados de resultado inválidos para gerar resumo.")
-        return "Não foi possível gerar o resumo do perfil (dados de resultado inválidos)."
+    answered_counts = np.array(
+        [len(answers) if isinstance(answers, list) else 0 for answers in submissions],
+        dtype=np.int32
+    )
+    batch = score_encoded_batch(encode_submissions(submissions), answered_counts)
+    logger.info(f"Score em lote concluído: {len(submissions)} submissões.")
+    return batch
 
-    primary = disc_result['primary_profile']
-    secondary = disc_result['secondary_profile']
-    scores = {
-        'D': disc_result['d_score'], 'I': disc_result['i_score'],
-        'S': disc_result['s_score'], 'C': disc_result['c_score']
-    }
-    # Usa as descrições passadas como argumento
-    if not descriptions: descriptions = {} # Fallback
 
+def batch_result_dicts(batch: BatchScores) -> List[Optional[Dict[str, Any]]]:
+    """
+    Converte um BatchScores nos mesmos dicionários retornados por calculate_disc_scores
+    (None para submissões vazias), prontos para DISCResult.
+    """
+    timestamp_iso = datetime.now().isoformat()
+    results: List[Optional[Dict[str, Any]]] = []
+    for row, (d, i, s, c) in enumerate(batch.scores.tolist()):
+        if batch.answered_counts[row] == 0:
+            results.append(None)
+            continue
+        result_base = {
+            'd_score': d,
+            'i_score': i,
+            's_score': s,
+            'c_score': c,
+            'primary_profile': batch.primary_profiles[row],
+            'secondary_profile': batch.secondary_profiles[row],
+            'calculation_timestamp_iso': timestamp_iso
+        }
+        results.append({
+            **result_base,
+            'report_schema_version': REPORT_SCHEMA_VERSION
+        })
+    return results
+
+
+# --- Funções Auxiliares (get_profile_summary, generate_detailed_report) ---
+# Modificar generate_detailed_report para aceitar descrições
+
+def _summary_head(primary: str, secondary: str, descriptions: Dict) -> str:
+    """Primeira parte do resumo (perfis), independente dos scores."""
     primary_title = descriptions.get(primary, {}).get('title', primary)
     secondary_title = descriptions.get(secondary, {}).get('title', secondary)
 
@@ -212,14 +386,21 @@ def get_profile_summary(disc_result: Dict[str, Any], descriptions: Dict) -> str:
          summary += f", com uma influência secundária significativa de **{secondary_title} ({secondary})**.\n\n"
     else:
          summary += ".\n\n"
+    return summary
 
-    summary += "**Intensidade por Fator (Scores):**\n"
+def _summary_scores(scores: Dict[str, Any], descriptions: Dict) -> str:
+    """Bloco de intensidade por fator do resumo (única parte que depende dos scores)."""
+    summary = "**Intensidade por Fator (Scores):**\n"
     # Garante a ordem D, I, S, C
     for factor in ['D', 'I', 'S', 'C']:
         factor_name = descriptions.get(factor, {}).get('title', factor)
         score = scores.get(factor, 'N/A')
         summary += f"- **{factor} ({factor_name}):** {score}\n" # Mostra o score diretamente
+    return summary
 
+def _summary_tail(primary: str, secondary: str, descriptions: Dict) -> str:
+    """Parte final do resumo (motivações), independente dos scores."""
+    summary = ""
     primary_desc_data = descriptions.get(primary, {})
     if primary_desc_data:
         summary += f"\nComo perfil **{primary}** dominante, você tende a ser motivado(a) por: *{primary_desc_data.get('motivation', 'N/A')}*.\n"
@@ -233,9 +414,32 @@ def get_profile_summary(disc_result: Dict[str, Any], descriptions: Dict) -> str:
              summary += f"\nSua influência secundária **{secondary}** pode adicionar traços relacionados à motivação por: *{secondary_desc_data.get('motivation', 'N/A')}*.\n"
         else:
              logger.warning(f"Descrição não encontrada para o perfil secundário: {secondary}")
+    return summary
 
+def _has_summary_keys(disc_result: Dict[str, Any]) -> bool:
+    return bool(disc_result) and all(k in disc_result for k in ['primary_profile', 'secondary_profile', 'd_score', 'i_score', 's_score', 'c_score'])
 
-    return summary
+def _result_scores(disc_result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'D': disc_result['d_score'], 'I': disc_result['i_score'],
+        'S': disc_result['s_score'], 'C': disc_result['c_score']
+    }
+
+def get_profile_summary(disc_result: Dict[str, Any], descriptions: Dict) -> str:
+    """Gera um resumo textual do perfil DISC."""
+    # Verifica as chaves esperadas no disc_result que vem do CALCULATOR
+    if not _has_summary_keys(disc_result):
+        logger.error("Dados de resultado inválidos para gerar resumo.")
+        return "Não foi possível gerar o resumo do perfil (dados de resultado inválidos)."
+
+    primary = disc_result['primary_profile']
+    secondary = disc_result['secondary_profile']
+    # Usa as descrições passadas como argumento
+    if not descriptions: descriptions = {} # Fallback
+
+    return (_summary_head(primary, secondary, descriptions)
+            + _summary_scores(_result_scores(disc_result), descriptions)
+            + _summary_tail(primary, secondary, descriptions))
 
 def generate_detailed_report(disc_result_base: Dict[str, Any], descriptions: Dict) -> Dict[str, Any]:
     """
@@ -247,20 +451,22 @@ def generate_detailed_report(disc_result_base: Dict[str, Any], descriptions: Dic
         logger.error("Dados de resultado base inválidos para gerar relatório detalhado.")
         return {"error": "Dados de resultado inválidos para gerar relatório detalhado."}
 
-    primary = disc_result_base['primary_profile']
-    secondary = disc_result_base['secondary_profile']
     # Usa as descrições passadas como argumento
     if not descriptions: descriptions = {} # Fallback
 
+    # Cria o resumo usando os dados base e as descrições passadas
+    return {
+        'profile_summary': get_profile_summary(disc_result_base, descriptions),
+        **_report_body(disc_result_base['primary_profile'], disc_result_base['secondary_profile'], descriptions)
+    }
+
+def _report_body(primary: str, secondary: str, descriptions: Dict) -> Dict[str, Any]:
+    """Detalhes dos perfis e áreas de desenvolvimento: dependem só do par (primário, secundário)."""
     primary_desc = descriptions.get(primary, {})
     secondary_desc = descriptions.get(secondary, {})
 
-    # Cria o resumo usando os dados base e as descrições passadas
-    profile_summary_text = get_profile_summary(disc_result_base, descriptions)
-
     # Usa .get com fallback para listas vazias para evitar erros no template
     report = {
-        'profile_summary': profile_summary_text,
         'primary_profile_details': {
             'title': primary_desc.get('title', primary),
             'description': primary_desc.get('description', 'N/A'), # Adicionado description
@@ -322,4 +528,181 @@ def generate_detailed_report(disc_result_base: Dict[str, Any], descriptions: Dic
     # Garante que sempre seja uma lista
     report['development_areas_list'] = development_areas if development_areas else ["Nenhuma sugestão específica gerada."]
 
-    return report
\ No newline at end of file
+    return report
+
+
+# --- Relatório derivado sob demanda (esquema v2) ---
+
+@lru_cache(maxsize=64)
+def _cached_report_sections(primary: str, secondary: str) -> Tuple[str, str, Dict[str, Any]]:
+    """Partes estáticas do relatório de um par (primário, secundário), geradas uma vez."""
+    return (
+        _summary_head(primary, secondary, disc_descriptions),
+        _summary_tail(primary, secondary, disc_descriptions),
+        _report_body(primary, secondary, disc_descriptions),
+    )
+
+def _copy_report(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copia os dicts/listas do relatório memoizado. As listas internas continuam
+    compartilhadas com disc_descriptions, como em generate_detailed_report.
+    """
+    return {key: dict(value) if isinstance(value, dict) else list(value) if isinstance(value, list) else value
+            for key, value in body.items()}
+
+def build_detailed_report(disc_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reconstrói o 'detailed_report' (mesmo conteúdo de generate_detailed_report com
+    disc_descriptions) a partir de um resultado com scores e perfis. O texto fixo de
+    cada par é memoizado; só o bloco de scores é formatado a cada chamada.
+    """
+    if not _has_summary_keys(disc_result):
+        return generate_detailed_report(disc_result, disc_descriptions)
+    head, tail, body = _cached_report_sections(disc_result['primary_profile'], disc_result['secondary_profile'])
+    return {
+        'profile_summary': head + _summary_scores(_result_scores(disc_result), disc_descriptions) + tail,
+        **_copy_report(body)  # Cópia: quem recebe pode alterar o relatório
+    }
+
+
+
+# --- CLI: python -m backend.score_calculator ---
+# Pontua submissões em NDJSON (arquivos ou stdin) e escreve os resultados em NDJSON
+# no stdout, sem carregar Flask/SQLAlchemy/ReportLab. Cada linha de entrada é um
+# objeto {"answers": [...], ...} (os demais campos, ex: "id", são repassados na
+# saída) ou diretamente a lista de respostas. Linhas inválidas saem como
+# {"line": n, "error": "..."}; a ordem da saída é a ordem da entrada.
+
+@lru_cache(maxsize=1)
+def _line_codec() -> Tuple[Any, Any, Any]:
+    """(decode, encode, erro de decodificação) para linhas JSON: msgspec se instalado, senão o json da stdlib."""
+    try:
+        import msgspec
+        return msgspec.json.decode, msgspec.json.encode, msgspec.DecodeError
+    except ImportError:
+        import json
+        encode = lambda obj: json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return json.loads, encode, ValueError
+
+
+def score_ndjson_chunk(first_line: int, lines: Sequence[bytes]) -> Tuple[bytes, int, int]:
+    """
+    Pontua um bloco de linhas NDJSON (first_line = número da primeira, a partir de 1).
+    Retorna (saída NDJSON do bloco, linhas pontuadas, linhas com erro).
+    """
+    decode, encode, decode_error = _line_codec()
+    output: List[bytes] = []
+    scored = errors = 0
+    for line_number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        try:
+            submission = decode(line)
+        except decode_error as e:
+            submission, error = None, f"JSON inválido: {e}"
+        else:
+            error = None
+        extra: Dict[str, Any] = {}
+        if isinstance(submission, dict):
+            answers = submission.get('answers')
+            extra = {key: value for key, value in submission.items() if key != 'answers'}
+        else:
+            answers = submission
+        if error is None and (not isinstance(answers, list) or not answers):
+            error = "'answers' ausente ou formato incorreto."
+        result = calculate_disc_scores(answers) if error is None else None
+        if result is None:
+            errors += 1
+            output.append(encode({'line': line_number, **extra, 'error': error or "Falha no cálculo dos scores."}))
+        else:
+            scored += 1
+            output.append(encode({**extra, **result}))
+    return (b'\n'.join(output) + b'\n' if output else b''), scored, errors
+
+
+def _iter_line_chunks(streams, chunk_size: int):
+    """(número da primeira linha, linhas) em blocos de até chunk_size linhas, lendo sob demanda."""
+    chunk: List[bytes] = []
+    first_line = line_number = 1
+    for stream in streams:
+        for line in stream:
+            chunk.append(line)
+            line_number += 1
+            if len(chunk) >= chunk_size:
+                yield first_line, chunk
+                chunk, first_line = [], line_number
+    if chunk:
+        yield first_line, chunk
+
+
+def _open_inputs(paths: Sequence[str]):
+    """Streams binários das entradas ('-' = stdin), abertos um por vez."""
+    import sys
+    for path in paths:
+        if path == '-':
+            yield sys.stdin.buffer
+        else:
+            with open(path, 'rb') as stream:
+                yield stream
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(
+        prog='python -m backend.score_calculator',
+        description="Pontua submissões DISC em NDJSON (arquivos ou stdin) e escreve os resultados em NDJSON no stdout."
+    )
+    parser.add_argument('inputs', nargs='*', default=['-'], help="Arquivos NDJSON ('-' = stdin, o padrão).")
+    parser.add_argument('--workers', type=int, default=1, help="Processos de cálculo (padrão: 1, no próprio processo).")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="Linhas por bloco enviado a cada processo.")
+    parser.add_argument('--log-level', default='ERROR', help="Nível de log do cálculo no stderr (padrão: ERROR).")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers e --chunk-size devem ser maiores que zero.")
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(levelname)s: %(message)s', stream=sys.stderr)
+    out = sys.stdout.buffer
+    chunks = _iter_line_chunks(_open_inputs(args.inputs), args.chunk_size)
+    started = time.perf_counter()
+    scored = errors = 0
+    try:
+        if args.workers == 1:
+            for first_line, lines in chunks:
+                block, chunk_scored, chunk_errors = score_ndjson_chunk(first_line, lines)
+                out.write(block)
+                scored, errors = scored + chunk_scored, errors + chunk_errors
+        else:
+            from collections import deque
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Janela limitada de blocos em andamento: memória constante e saída na ordem da entrada
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                pending = deque()
+                for first_line, lines in chunks:
+                    pending.append(executor.submit(score_ndjson_chunk, first_line, lines))
+                    if len(pending) >= args.workers * 2:
+                        block, chunk_scored, chunk_errors = pending.popleft().result()
+                        out.write(block)
+                        scored, errors = scored + chunk_scored, errors + chunk_errors
+                while pending:
+                    block, chunk_scored, chunk_errors = pending.popleft().result()
+                    out.write(block)
+                    scored, errors = scored + chunk_scored, errors + chunk_errors
+        out.flush()
+    except BrokenPipeError:
+        # Consumidor fechou a saída (ex: '| head'): encerra sem traceback
+        sys.stderr.close()
+        return 1
+    except OSError as e:
+        print(f"Erro de E/S: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"{scored} submissão(ões) pontuada(s), {errors} linha(s) com erro em {elapsed:.2f}s.", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
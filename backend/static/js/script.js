@@ -1,5 +1,5 @@
 // backend/static/js/script.js
-// Versão 1.1.3 - Coleta nome/email e envia para API
+// Versão 1.1.6 - Envia Idempotency-Key e repete o POST em falhas de rede/503 sem duplicar o resultado
 
 // --- Variáveis Globais e Elementos DOM (como antes) ---
 let currentQuestionIndex = 0;
@@ -24,13 +24,43 @@ const instructionsFooterDiv = document.querySelector('.instructions-footer');
 // NOVOS Elementos para Nome/Email
 const userNameInput = document.getElementById('user-name');
 const userEmailInput = document.getElementById('user-email');
+// URL versionada das questões (definida pelo servidor em #quiz-container)
+const quizContainer = document.getElementById('quiz-container');
+const questionsUrl = (quizContainer && quizContainer.dataset.questionsUrl) || '/api/questions';
+
+// Chave de idempotência da tentativa atual: a mesma em todos os reenvios do POST,
+// para que o servidor devolva o resultado já gravado em vez de criar outro.
+let submissionKey = null;
+const MAX_SUBMIT_ATTEMPTS = 3;
+
+function newSubmissionKey() {
+    if (window.crypto && typeof window.crypto.randomUUID === 'function') return window.crypto.randomUUID();
+    // Fallback (contextos sem HTTPS): 128 bits aleatórios em hexadecimal
+    const bytes = new Uint8Array(16);
+    window.crypto.getRandomValues(bytes);
+    return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// Questões embutidas pelo servidor em <script type="application/json" id="disc-questions-data">.
+// Retorna null se ausentes ou inválidas (nesse caso fetchQuestions busca a API).
+function readInlineQuestions() {
+    const dataElement = document.getElementById('disc-questions-data');
+    if (!dataElement) return null;
+    try {
+        const data = JSON.parse(dataElement.textContent);
+        return Array.isArray(data) && data.length > 0 ? data : null;
+    } catch (error) {
+        console.warn("readInlineQuestions: JSON embutido inválido, buscando da API.", error);
+        return null;
+    }
+}
 
 
 // --- Funções fetchQuestions, startAssessment, loadQuestion, addOptionListeners, ---
 // --- handleContainerClick, handleSelectionChange, saveCurrentResponse, startCountdown, ---
 // --- checkAndAdvance, advanceQuestion (permanecem iguais à resposta anterior) ---
 
-async function fetchQuestions() { console.log("fetchQuestions: Buscando questões..."); if(loadingIndicator) loadingIndicator.style.display = 'block'; try { const response = await fetch('/api/questions'); if (!response.ok) throw new Error(`Erro HTTP ${response.status}`); questions = await response.json(); totalQuestions = questions.length; console.log(`fetchQuestions: ${totalQuestions} questões carregadas.`); if (totalQuestions > 0) { if(progressText) progressText.textContent = `Questão 1 / ${totalQuestions}`; return true; } else { console.error("fetchQuestions: Nenhuma questão recebida."); if(optionsList) optionsList.innerHTML = '<p class="warning">Erro: Nenhuma questão carregada.</p>'; const progressContainer = document.querySelector('.progress-container'); if(progressContainer) progressContainer.style.display = 'none'; return false; } } catch (error) { console.error("fetchQuestions: Falha:", error); if(optionsList) optionsList.innerHTML = `<p class="warning">Erro ao carregar: ${error.message}.</p>`; const progressContainer = document.querySelector('.progress-container'); if(progressContainer) progressContainer.style.display = 'none'; return false; } finally { if(loadingIndicator) loadingIndicator.style.display = 'none'; } }
+async function fetchQuestions() { console.log("fetchQuestions: Buscando questões..."); if(loadingIndicator) loadingIndicator.style.display = 'block'; try { const inlineQuestions = readInlineQuestions(); if (inlineQuestions) { questions = inlineQuestions; } else { const response = await fetch(questionsUrl); if (!response.ok) throw new Error(`Erro HTTP ${response.status}`); questions = await response.json(); } totalQuestions = questions.length; console.log(`fetchQuestions: ${totalQuestions} questões carregadas.`); if (totalQuestions > 0) { if(progressText) progressText.textContent = `Questão 1 / ${totalQuestions}`; return true; } else { console.error("fetchQuestions: Nenhuma questão recebida."); if(optionsList) optionsList.innerHTML = '<p class="warning">Erro: Nenhuma questão carregada.</p>'; const progressContainer = document.querySelector('.progress-container'); if(progressContainer) progressContainer.style.display = 'none'; return false; } } catch (error) { console.error("fetchQuestions: Falha:", error); if(optionsList) optionsList.innerHTML = `<p class="warning">Erro ao carregar: ${error.message}.</p>`; const progressContainer = document.querySelector('.progress-container'); if(progressContainer) progressContainer.style.display = 'none'; return false; } finally { if(loadingIndicator) loadingIndicator.style.display = 'none'; } }
 function startAssessment() { console.log("startAssessment: Iniciando..."); if (!assessmentSection || !quizCompletionSection ) { console.error("Erro Crítico: Seções assessment/quizCompletion não encontradas."); return; } if(resultsSection) resultsSection.style.display = 'none'; quizCompletionSection.classList.remove('visible'); quizCompletionSection.style.display = 'none'; assessmentSection.style.display = 'block'; if(instructionsDiv) instructionsDiv.style.display = 'block'; if(instructionsFooterDiv) instructionsFooterDiv.style.display = 'block'; const progressContainer = document.querySelector('.progress-container'); if(progressContainer) progressContainer.style.display = 'block'; if(timerContainer) timerContainer.classList.remove('hidden'); if(questionContentWrapper) { questionContentWrapper.style.display = ''; questionContentWrapper.classList.remove('fading-out', 'hidden'); } currentQuestionIndex = 0; userResponses = {}; isTransitioning = false; if (questions.length > 0) { console.log("startAssessment: Iniciando com a primeira questão."); loadQuestion(currentQuestionIndex); } else { console.error("startAssessment: NENHUMA questão carregada."); if(optionsList) optionsList.innerHTML = '<p class="warning">Erro: Questões não carregadas.</p>'; if(progressContainer) progressContainer.style.display = 'none'; } }
 function loadQuestion(index) { console.log(`--- loadQuestion: Índice ${index} ---`); if (isTransitioning) { isTransitioning = false; } if (!optionsList || !questionContentWrapper || !countdownSpan || !progressBar || !progressText) { console.error("!!! loadQuestion: Elemento(s) DOM essenciais não encontrado(s) !!!"); return; } if (index < 0 || index >= totalQuestions) { console.error(`loadQuestion: Índice inválido: ${index}.`); return; } const question = questions[index]; if (!question || typeof question !== 'object' || !question.id || !question.D || !question.I || !question.S || !question.C) { console.error(`!!! loadQuestion: Dados inválidos q ${index} !!!`, question); optionsList.innerHTML = `<p class="warning">Erro dados questão ${index + 1}.</p>`; clearInterval(countdownTimer); return; } currentQuestionIndex = index; const progressPercentage = totalQuestions > 0 ? ((index + 1) / totalQuestions) * 100 : 0; progressBar.style.width = `${progressPercentage}%`; progressBar.setAttribute('aria-valuenow', progressPercentage); progressText.textContent = `Questão ${index + 1} / ${totalQuestions}`; optionsList.innerHTML = ''; const profiles = ['D', 'I', 'S', 'C']; profiles.forEach(profileKey => { const word = question[profileKey]; const optionItem = document.createElement('div'); optionItem.classList.add('option-item'); optionItem.innerHTML = ` <div class="option-text">${word}</div> <div class="radio-container mais"> <input type="radio" id="most_${question.id}_${profileKey}" name="most_${question.id}" value="${word}" class="most-option" data-question-id="${question.id}"> </div> <div class="radio-container menos"> <input type="radio" id="least_${question.id}_${profileKey}" name="least_${question.id}" value="${word}" class="least-option" data-question-id="${question.id}"> </div>`; optionsList.appendChild(optionItem); }); const savedResponse = userResponses[question.id]; if (savedResponse) { const mostRadio = optionsList.querySelector(`.most-option[value="${CSS.escape(savedResponse.mais)}"]`); const leastRadio = optionsList.querySelector(`.least-option[value="${CSS.escape(savedResponse.menos)}"]`); if (mostRadio) mostRadio.checked = true; if (leastRadio) leastRadio.checked = true; } addOptionListeners(); questionContentWrapper.classList.remove('fading-out'); void questionContentWrapper.offsetWidth; startCountdown(); console.log(`--- loadQuestion: Concluído ${index} ---`); }
 function addOptionListeners() { optionsList.querySelectorAll('input[type="radio"]').forEach(radio => { radio.removeEventListener('change', handleSelectionChange); radio.addEventListener('change', handleSelectionChange); }); optionsList.querySelectorAll('.radio-container').forEach(container => { container.removeEventListener('click', handleContainerClick); container.addEventListener('click', handleContainerClick); }); }
@@ -149,12 +179,27 @@ function finishAssessment(userName, userEmail) {
 async function sendAnswersAndRedirect(answers, userInfo) {
     const overlay = document.getElementById('loading-overlay');
     console.log("sendAnswersAndRedirect: Tentando POST com userInfo:", userInfo);
+    if (!submissionKey) submissionKey = newSubmissionKey();
     try {
-        const response = await fetch('/api/calculate', {
-            method: 'POST', headers: {'Content-Type': 'application/json'},
-            // Envia a estrutura completa { answers: [], userInfo: {} }
-            body: JSON.stringify({ answers: answers, userInfo: userInfo })
-        });
+        let response = null;
+        for (let attempt = 1; attempt <= MAX_SUBMIT_ATTEMPTS; attempt++) {
+            try {
+                response = await fetch('/api/calculate', {
+                    method: 'POST', headers: {'Content-Type': 'application/json', 'Idempotency-Key': submissionKey},
+                    // Envia a estrutura completa { answers: [], userInfo: {} }
+                    body: JSON.stringify({ answers: answers, userInfo: userInfo })
+                });
+            } catch (networkError) {
+                // Falha de rede: o servidor pode ter gravado; a mesma chave evita duplicar
+                if (attempt === MAX_SUBMIT_ATTEMPTS) throw networkError;
+                response = null;
+            }
+            if (response && response.status !== 503) break;
+            if (attempt < MAX_SUBMIT_ATTEMPTS) {
+                const retryAfter = response ? parseInt(response.headers.get('Retry-After'), 10) : NaN;
+                await new Promise(resolve => setTimeout(resolve, (Number.isFinite(retryAfter) ? retryAfter : attempt) * 1000));
+            }
+        }
         if (!response.ok) {
             let errorBody = "Erro"; try { errorBody = await response.text(); } catch (e) {}
             throw new Error(`Erro Servidor: ${response.status}. ${errorBody.substring(0, 150)}`);
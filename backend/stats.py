@@ -0,0 +1,196 @@
+# backend/stats.py
+
+"""
+Manutenção incremental e consulta dos agregados diários (disc_daily_stats).
+
+refresh_daily_stats lê de disc_results apenas as linhas com ID acima da marca
+d'água, em lotes por ID, soma cada lote em memória por (dia, primário,
+secundário) e grava os incrementos e a nova marca na mesma transação. A marca
+é avançada por compare-and-set (UPDATE ... WHERE last_result_id = <lido>): se
+outro processo atualizou antes, o lote é descartado sem contar nada em dobro.
+
+Linhas mais novas que STATS_REFRESH_LAG_SECONDS ficam para a próxima execução,
+para que um ID alocado por uma transação ainda não confirmada não seja pulado.
+"""
+import logging
+import math
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+try:
+    from .db import db
+    from .models.disc_result import DISCResult, SCORE_COLUMNS
+    from .models.disc_daily_stats import DISCDailyStats, StatsWatermark, FACTORS
+except ImportError:
+    from backend.db import db
+    from backend.models.disc_result import DISCResult, SCORE_COLUMNS
+    from backend.models.disc_daily_stats import DISCDailyStats, StatsWatermark, FACTORS
+
+logger = logging.getLogger(__name__)
+
+DAILY_STATS_WATERMARK = 'disc_daily_stats'
+
+
+class StatsRefreshConflict(Exception):
+    """Outro processo avançou a marca d'água durante a atualização (lote descartado)."""
+
+
+StatsKey = Tuple[date, str, str]
+
+
+def _aggregate(rows) -> Dict[StatsKey, List[int]]:
+    """Soma as linhas por chave: [resultados, com scores, somas D..C, somas dos quadrados D..C]."""
+    totals: Dict[StatsKey, List[int]] = defaultdict(lambda: [0] * (2 + 2 * len(FACTORS)))
+    for row in rows:
+        entry = totals[(row.timestamp.date(), row.primary_type, row.secondary_type)]
+        entry[0] += 1
+        scores = [getattr(row, name) for name in SCORE_COLUMNS]
+        if None in scores:
+            continue  # Linha legada sem scores: só entra na contagem
+        entry[1] += 1
+        for index, score in enumerate(scores):
+            entry[2 + index] += score
+            entry[2 + len(FACTORS) + index] += score * score
+    return totals
+
+
+def _refresh_chunk(chunk_size: int, cutoff: datetime) -> int:
+    """Agrega um lote após a marca d'água. Retorna o número de linhas incluídas."""
+    watermark = db.session.get(StatsWatermark, DAILY_STATS_WATERMARK)
+    last_id = watermark.last_result_id if watermark is not None else 0
+    rows = db.session.execute(
+        select(DISCResult.id, DISCResult.timestamp, DISCResult.primary_type, DISCResult.secondary_type,
+               *(getattr(DISCResult, name) for name in SCORE_COLUMNS))
+        .where(DISCResult.id > last_id)
+        .order_by(DISCResult.id)
+        .limit(chunk_size)
+    ).all()
+    # Para na primeira linha recente demais (IDs menores ainda podem estar em transações abertas)
+    for position, row in enumerate(rows):
+        if row.timestamp >= cutoff:
+            rows = rows[:position]
+            break
+    if not rows:
+        db.session.rollback()
+        return 0
+
+    # 1. Reivindica o lote avançando a marca (compare-and-set) antes de tocar nos agregados
+    new_last_id = rows[-1].id
+    try:
+        if watermark is None:
+            db.session.add(StatsWatermark(DAILY_STATS_WATERMARK, new_last_id))
+            db.session.flush()
+        else:
+            claimed = db.session.execute(
+                update(StatsWatermark)
+                .where(StatsWatermark.name == DAILY_STATS_WATERMARK, StatsWatermark.last_result_id == last_id)
+                .values(last_result_id=new_last_id)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed != 1:
+                raise StatsRefreshConflict(f"marca d'água mudou (esperado {last_id})")
+    except (IntegrityError, StatsRefreshConflict) as e:
+        db.session.rollback()
+        raise StatsRefreshConflict(str(e)) from e
+
+    # 2. Aplica os incrementos do lote
+    for key, entry in _aggregate(rows).items():
+        stats = db.session.get(DISCDailyStats, key)
+        if stats is None:
+            stats = DISCDailyStats(*key)
+            db.session.add(stats)
+        stats.result_count += entry[0]
+        stats.scored_count += entry[1]
+        for index, factor in enumerate(FACTORS):
+            setattr(stats, f'{factor}_sum', getattr(stats, f'{factor}_sum') + entry[2 + index])
+            setattr(stats, f'{factor}_sumsq', getattr(stats, f'{factor}_sumsq') + entry[2 + len(FACTORS) + index])
+    db.session.commit()
+    return len(rows)
+
+
+def refresh_daily_stats(chunk_size: int = 5000, lag_seconds: float = 30, now: Optional[datetime] = None,
+                        max_chunks: Optional[int] = None) -> int:
+    """
+    Inclui nos agregados os resultados novos (lote a lote, cada um confirmado em
+    separado): todos ou, com max_chunks, no máximo esse número de lotes. Retorna
+    quantas linhas foram agregadas. Levanta StatsRefreshConflict se outro processo
+    estiver atualizando ao mesmo tempo.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=lag_seconds)
+    total = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        count = _refresh_chunk(chunk_size, cutoff)
+        if count == 0:
+            break
+        total += count
+        chunks += 1
+        logger.debug(f"Agregados diários: {total} resultado(s) incluídos até agora.")
+    if total:
+        logger.info(f"Agregados diários atualizados com {total} resultado(s).")
+    return total
+
+
+def _factor_stats(count: int, total: int, total_sq: int) -> Dict[str, Optional[float]]:
+    if not count:
+        return {'mean': None, 'stddev': None}
+    mean = total / count
+    variance = max(0.0, total_sq / count - mean * mean)  # Populacional
+    return {'mean': round(mean, 2), 'stddev': round(math.sqrt(variance), 2)}
+
+
+def daily_stats_summary(start: Optional[date] = None, end: Optional[date] = None,
+                        primary_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Números do painel a partir dos agregados, no intervalo de dias [start, end):
+    totais, média/desvio por fator, contagem por perfil primário e série diária.
+    Lê O(dias x perfis) linhas, independente do número de resultados.
+    """
+    sums = [func.sum(getattr(DISCDailyStats, f'{factor}_sum')) for factor in FACTORS]
+    sumsqs = [func.sum(getattr(DISCDailyStats, f'{factor}_sumsq')) for factor in FACTORS]
+    stmt = select(DISCDailyStats.day, DISCDailyStats.primary_type,
+                  func.sum(DISCDailyStats.result_count), func.sum(DISCDailyStats.scored_count),
+                  *sums, *sumsqs)
+    if start is not None:
+        stmt = stmt.where(DISCDailyStats.day >= start)
+    if end is not None:
+        stmt = stmt.where(DISCDailyStats.day < end)
+    if primary_type:
+        stmt = stmt.where(DISCDailyStats.primary_type == primary_type)
+    stmt = stmt.group_by(DISCDailyStats.day, DISCDailyStats.primary_type).order_by(DISCDailyStats.day)
+
+    result_count, scored_count = 0, 0
+    factor_sums = [0] * len(FACTORS)
+    factor_sumsqs = [0] * len(FACTORS)
+    by_primary = {profile: 0 for profile in ('D', 'I', 'S', 'C')}
+    by_day: Dict[date, int] = {}
+    for row in db.session.execute(stmt):
+        day, profile, count, scored = row[0], row[1], int(row[2] or 0), int(row[3] or 0)
+        result_count += count
+        scored_count += scored
+        for index in range(len(FACTORS)):
+            factor_sums[index] += int(row[4 + index] or 0)
+            factor_sumsqs[index] += int(row[4 + len(FACTORS) + index] or 0)
+        by_primary[profile] = by_primary.get(profile, 0) + count
+        by_day[day] = by_day.get(day, 0) + count
+
+    return {
+        'result_count': result_count,
+        'scored_count': scored_count,
+        'factors': {
+            factor.upper(): _factor_stats(scored_count, factor_sums[index], factor_sumsqs[index])
+            for index, factor in enumerate(FACTORS)
+        },
+        'primary_profile_counts': by_primary,
+        'daily_counts': [{'day': day.isoformat(), 'count': count} for day, count in by_day.items()],
+    }
+
+
+def stats_watermark() -> int:
+    """Último ID de resultado incluído nos agregados (0 se nunca atualizados)."""
+    watermark = db.session.get(StatsWatermark, DAILY_STATS_WATERMARK)
+    return watermark.last_result_id if watermark is not None else 0
@@ -0,0 +1,179 @@
+# backend/write_behind.py
+
+"""
+Gravação em grupo (group commit) dos resultados de /api/calculate.
+
+Com WRITE_BEHIND_ENABLED, cada requisição coloca a linha já montada
+(DISCResult.row_values) numa fila limitada e espera num Future pelo ID gerado.
+Uma thread por processo junta as linhas que chegarem em até
+WRITE_BEHIND_MAX_DELAY_MS (ou WRITE_BEHIND_MAX_BATCH linhas) e grava todas com
+um único INSERT em lote e um único commit. O contrato da API não muda (a resposta
+só sai depois do commit, com o result_id), mas os picos de submissões simultâneas
+passam a custar um fsync por lote em vez de um por resultado.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import insert
+
+try:
+    from .db import db
+    from .models.disc_result import DISCResult
+except ImportError:
+    from backend.db import db
+    from backend.models.disc_result import DISCResult
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteQueueFull(Exception):
+    """A fila de gravação atingiu WRITE_BEHIND_QUEUE_SIZE."""
+
+
+class WriteBehindWriter:
+    """Fila limitada de linhas de disc_results gravadas em lote por uma thread dedicada."""
+
+    def __init__(self, app, max_batch: int, max_delay_ms: float, queue_size: int):
+        self.app = app
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay_ms) / 1000.0
+        self._queue: 'queue.Queue[Any]' = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows_written = 0
+
+    def _ensure_started(self) -> None:
+        # Thread criada sob demanda para existir em cada worker do gunicorn (após o fork)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='disc-write-behind', daemon=True)
+                self._thread.start()
+                logger.info(f"Gravação em grupo iniciada (lote até {self.max_batch} linhas / {self.max_delay * 1000:.0f} ms).")
+
+    def submit(self, row: Dict[str, Any]) -> Future:
+        """Enfileira a linha; o Future resolve com o ID inserido (ou a exceção da gravação)."""
+        self._ensure_started()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((row, future))
+        except queue.Full:
+            raise WriteQueueFull(f"{self._queue.maxsize} resultados já aguardando gravação.")
+        return future
+
+    def _collect(self, first: Tuple[Dict[str, Any], Future]) -> Tuple[List[Tuple[Dict[str, Any], Future]], bool]:
+        """Junta itens à primeira linha até max_batch ou max_delay. Retorna (lote, parar)."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stop = self._collect(item)
+            with self.app.app_context():
+                self._write(batch)
+        # Ao parar, grava o que ainda estiver na fila
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.max_batch):
+            with self.app.app_context():
+                self._write(remaining[start:start + self.max_batch])
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> List[int]:
+        try:
+            ids = db.session.scalars(
+                insert(DISCResult).returning(DISCResult.id, sort_by_parameter_order=True),
+                rows
+            ).all()
+            db.session.commit()
+            return ids
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.remove()
+
+    def _write(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        """Grava o lote numa transação; se falhar, regrava linha a linha para isolar a(s) inválida(s)."""
+        live = [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        try:
+            ids = self._insert([row for row, _ in live])
+        except Exception as e:
+            if len(live) == 1:
+                logger.error(f"Falha ao gravar resultado em grupo: {e}")
+                live[0][1].set_exception(e)
+                return
+            logger.warning(f"Falha ao gravar lote de {len(live)} resultados ({e}); gravando individualmente.")
+            for row, future in live:
+                try:
+                    future.set_result(self._insert([row])[0])
+                except Exception as row_error:
+                    future.set_exception(row_error)
+            return
+        self.batches += 1
+        self.rows_written += len(ids)
+        for (_, future), result_id in zip(live, ids):
+            future.set_result(result_id)
+        logger.debug(f"Lote de {len(ids)} resultados gravado com um commit.")
+
+    def pending_count(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Para a thread depois de gravar as linhas já enfileiradas."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+
+def init_write_behind(app) -> Optional[WriteBehindWriter]:
+    """Cria o gravador em grupo se WRITE_BEHIND_ENABLED; senão /api/calculate grava direto."""
+    if not app.config.get('WRITE_BEHIND_ENABLED'):
+        return None
+    writer = WriteBehindWriter(
+        app,
+        max_batch=int(app.config.get('WRITE_BEHIND_MAX_BATCH', 200)),
+        max_delay_ms=float(app.config.get('WRITE_BEHIND_MAX_DELAY_MS', 5)),
+        queue_size=int(app.config.get('WRITE_BEHIND_QUEUE_SIZE', 2000))
+    )
+    app.extensions['write_behind'] = writer
+    atexit.register(writer.shutdown)
+    return writer
+
+
+def get_write_behind() -> Optional[WriteBehindWriter]:
+    """Retorna o gravador em grupo da aplicação atual (None se desabilitado)."""
+    return current_app.extensions.get('write_behind')
@@ -0,0 +1,128 @@
+"""Adicionar colunas de score/nível e índice (primary_type, timestamp) em disc_results
+
+Revision ID: 3b7e1c9a4f20
+Revises: d2bf2695aa10
+Create Date: 2025-04-20 10:12:41.118203
+
+"""
+import json
+import logging
+
+from alembic import op, context
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e1c9a4f20'
+down_revision = 'd2bf2695aa10'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+SCORE_COLUMNS = ('d_score', 'i_score', 's_score', 'c_score')
+LEVEL_COLUMNS = ('d_level', 'i_level', 's_level', 'c_level')
+INDEX_NAME = 'ix_disc_results_primary_type_timestamp'
+# Linhas lidas/atualizadas por lote no backfill (cada lote é confirmado em separado)
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def _intensity_level(score):
+    # Cópia congelada de interpretation_logic.intensity_level (0-8, 9-15, 16+)
+    if score >= 16:
+        return 'high'
+    if score >= 9:
+        return 'significant'
+    return 'moderate'
+
+
+def _score_values(calculated_result_json):
+    """Scores e níveis a partir do JSON armazenado; None se o JSON não puder ser lido."""
+    try:
+        result = json.loads(calculated_result_json or '{}')
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(result, dict):
+        return None
+    values = {}
+    for score_column, level_column in zip(SCORE_COLUMNS, LEVEL_COLUMNS):
+        score = result.get(score_column)
+        if isinstance(score, bool) or not isinstance(score, int):
+            return None
+        values[score_column] = score
+        values[level_column] = _intensity_level(score)
+    return values
+
+
+def _backfill(bind):
+    """
+    Preenche as colunas a partir de calculated_result_json em lotes por ID. Roda
+    fora da transação da migração (autocommit), então uma interrupção preserva os
+    lotes já gravados e uma nova execução continua das linhas ainda nulas.
+    """
+    table = sa.table('disc_results', sa.column('id', sa.Integer), sa.column('calculated_result_json', sa.Text),
+                     *(sa.column(name, sa.Integer) for name in SCORE_COLUMNS),
+                     *(sa.column(name, sa.String) for name in LEVEL_COLUMNS))
+    select_chunk = (
+        sa.select(table.c.id, table.c.calculated_result_json)
+        .where(table.c.d_score.is_(None), table.c.id > sa.bindparam('last_id'))
+        .order_by(table.c.id)
+        .limit(BACKFILL_CHUNK_SIZE)
+    )
+    update_row = (
+        table.update()
+        .where(table.c.id == sa.bindparam('row_id'))
+        .values({name: sa.bindparam(name) for name in SCORE_COLUMNS + LEVEL_COLUMNS})
+    )
+
+    last_id, updated, skipped = 0, 0, 0
+    while True:
+        rows = bind.execute(select_chunk, {'last_id': last_id}).fetchall()
+        if not rows:
+            break
+        params = []
+        for row_id, calculated_result_json in rows:
+            values = _score_values(calculated_result_json)
+            if values is None:
+                skipped += 1
+                continue
+            values['row_id'] = row_id
+            params.append(values)
+        if params:
+            bind.execute(update_row, params)
+        updated += len(params)
+        last_id = rows[-1][0]
+        logger.info(f"Backfill de scores: {updated} linha(s) atualizadas até o ID {last_id}.")
+    if skipped:
+        logger.warning(f"Backfill de scores: {skipped} linha(s) com JSON ilegível mantidas com scores nulos.")
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_columns = {column['name'] for column in inspector.get_columns('disc_results')}
+    existing_indexes = {index['name'] for index in inspector.get_indexes('disc_results')}
+
+    # Condicional para permitir reexecutar após uma interrupção no backfill
+    with op.batch_alter_table('disc_results', schema=None) as batch_op:
+        for name in SCORE_COLUMNS:
+            if name not in existing_columns:
+                batch_op.add_column(sa.Column(name, sa.SmallInteger(), nullable=True))
+        for name in LEVEL_COLUMNS:
+            if name not in existing_columns:
+                batch_op.add_column(sa.Column(name, sa.String(length=12), nullable=True))
+        if INDEX_NAME not in existing_indexes:
+            batch_op.create_index(INDEX_NAME, ['primary_type', 'timestamp'], unique=False)
+
+    if context.is_offline_mode():
+        logger.warning("Modo offline: backfill das colunas de score não gerado; rode 'flask db upgrade' online.")
+        return
+    with context.get_context().autocommit_block():
+        _backfill(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('disc_results', schema=None) as batch_op:
+        batch_op.drop_index(INDEX_NAME)
+        for name in LEVEL_COLUMNS + SCORE_COLUMNS:
+            batch_op.drop_column(name)
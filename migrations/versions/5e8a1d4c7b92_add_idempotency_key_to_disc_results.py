@@ -0,0 +1,29 @@
+"""Adicionar idempotency_key (único) em disc_results
+
+Revision ID: 5e8a1d4c7b92
+Revises: 9c4d2e7f1a35
+Create Date: 2025-04-27 09:41:15.302874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a1d4c7b92'
+down_revision = '9c4d2e7f1a35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Linhas existentes ficam com NULL (índice único aceita vários NULLs)
+    with op.batch_alter_table('disc_results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_disc_results_idempotency_key', ['idempotency_key'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('disc_results', schema=None) as batch_op:
+        batch_op.drop_index('ix_disc_results_idempotency_key')
+        batch_op.drop_column('idempotency_key')
@@ -0,0 +1,51 @@
+"""Adicionar raw_responses_packed/question_set_version e tornar raw_responses_json opcional
+
+Revision ID: 9c4d2e7f1a35
+Revises: 3b7e1c9a4f20
+Create Date: 2025-04-24 16:03:27.440915
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4d2e7f1a35'
+down_revision = '3b7e1c9a4f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # As linhas existentes continuam em JSON; converta com 'flask disc pack-responses'
+    with op.batch_alter_table('disc_results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('raw_responses_packed', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('question_set_version', sa.String(length=16), nullable=True))
+        batch_op.alter_column('raw_responses_json',
+               existing_type=sa.Text(),
+               nullable=True)
+
+
+def downgrade():
+    # Restaura o JSON das linhas que só têm a versão compacta antes de remover a coluna
+    from backend.response_codec import decode_for_version
+
+    bind = op.get_bind()
+    table = sa.table('disc_results', sa.column('id', sa.Integer), sa.column('raw_responses_json', sa.Text),
+                     sa.column('raw_responses_packed', sa.LargeBinary), sa.column('question_set_version', sa.String))
+    rows = bind.execute(
+        sa.select(table.c.id, table.c.raw_responses_packed, table.c.question_set_version)
+        .where(table.c.raw_responses_json.is_(None))
+    )
+    for row_id, packed, question_set_version in rows.fetchall():
+        raw_responses = decode_for_version(packed, question_set_version) if packed is not None else []
+        bind.execute(table.update().where(table.c.id == row_id).values(raw_responses_json=json.dumps(raw_responses)))
+
+    with op.batch_alter_table('disc_results', schema=None) as batch_op:
+        batch_op.alter_column('raw_responses_json',
+               existing_type=sa.Text(),
+               nullable=False)
+        batch_op.drop_column('question_set_version')
+        batch_op.drop_column('raw_responses_packed')
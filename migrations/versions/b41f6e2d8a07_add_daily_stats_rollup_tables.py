@@ -0,0 +1,42 @@
+"""Adicionar agregados diários (disc_daily_stats) e marcas d'água (disc_stats_watermarks)
+
+Revision ID: b41f6e2d8a07
+Revises: 5e8a1d4c7b92
+Create Date: 2025-04-29 14:22:08.516390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41f6e2d8a07'
+down_revision = '5e8a1d4c7b92'
+branch_labels = None
+depends_on = None
+
+FACTORS = ('d', 'i', 's', 'c')
+
+
+def upgrade():
+    # Tabelas vazias: 'flask disc refresh-stats' agrega o histórico em lotes
+    op.create_table('disc_daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('primary_type', sa.String(length=1), nullable=False),
+        sa.Column('secondary_type', sa.String(length=1), nullable=False),
+        sa.Column('result_count', sa.Integer(), nullable=False),
+        sa.Column('scored_count', sa.Integer(), nullable=False),
+        *(sa.Column(f'{factor}_sum', sa.BigInteger(), nullable=False) for factor in FACTORS),
+        *(sa.Column(f'{factor}_sumsq', sa.BigInteger(), nullable=False) for factor in FACTORS),
+        sa.PrimaryKeyConstraint('day', 'primary_type', 'secondary_type')
+    )
+    op.create_table('disc_stats_watermarks',
+        sa.Column('name', sa.String(length=40), nullable=False),
+        sa.Column('last_result_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('disc_stats_watermarks')
+    op.drop_table('disc_daily_stats')
@@ -36,6 +36,20 @@ except ImportError:
     pytest.exit("Dependência Waitress não encontrada.", returncode=1)
 
 
+@pytest.fixture(scope='session', autouse=True)
+def isolated_cache_dirs(tmp_path_factory):
+    """
+    Caches em disco da configuração de testes (PDFs e L2 compartilhado) num diretório
+    temporário da sessão, para que os testes não escrevam em instance/.
+    """
+    from backend.config import TestingConfig
+    base_dir = tmp_path_factory.mktemp('caches')
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(TestingConfig, 'PDF_CACHE_DIR', str(base_dir / 'pdf_cache'))
+        monkeypatch.setattr(TestingConfig, 'CACHE_L2_DIR', str(base_dir / 'shared_cache'))
+        yield base_dir
+
+
 @pytest.fixture(scope='session')
 def app():
     """
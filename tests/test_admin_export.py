@@ -0,0 +1,196 @@
+import unittest
+import os
+import sys
+import csv
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.models.disc_result import DISCResult
+from backend.pdf_cache import PDFCache
+from backend.pdf_jobs import PDFRenderQueue
+from backend.results_export import export_statement
+from backend.score_calculator import calculate_disc_scores
+
+
+class TestAdminPDFExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app('testing')
+        cache = PDFCache(self.directory, 10 * 1024 * 1024)
+        self.app.extensions['pdf_cache'] = cache
+        self.app.extensions['pdf_jobs'] = PDFRenderQueue(cache, workers=0, max_pending=4)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        self.auth = {'Authorization': f"Bearer {self.app.config['ADMIN_API_TOKEN']}"}
+
+        answers = [{'questionId': q['id'], 'mais': q['D'], 'menos': q['S']} for q in disc_questions]
+        result = calculate_disc_scores(answers)
+        rows = [
+            ('Ana', 'ana@empresa.com', datetime(2024, 1, 10, 9, 0)),
+            ('Bruno', 'bruno@EMPRESA.com', datetime(2024, 2, 5, 18, 30)),
+            ('Carla', 'carla@outra.com', datetime(2024, 1, 20, 12, 0)),
+        ]
+        for name, email, timestamp in rows:
+            record = DISCResult(name, email, answers, result)
+            record.timestamp = timestamp
+            db.session.add(record)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def export(self, query=''):
+        return self.client.get(f'/api/admin/export/pdfs.zip{query}', headers=self.auth)
+
+    def test_requires_token(self):
+        self.assertEqual(self.client.get('/api/admin/export/pdfs.zip').status_code, 401)
+        wrong = {'Authorization': 'Bearer errado'}
+        self.assertEqual(self.client.get('/api/admin/export/pdfs.zip', headers=wrong).status_code, 401)
+        self.app.config['ADMIN_API_TOKEN'] = None
+        self.assertEqual(self.export().status_code, 403)
+
+    def test_exports_filtered_zip(self):
+        response = self.export('?email_domain=empresa.com')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/zip')
+        with zipfile.ZipFile(BytesIO(response.data)) as archive:
+            self.assertEqual(archive.namelist(), ['1_Ana.pdf', '2_Bruno.pdf'])
+            self.assertTrue(archive.read('2_Bruno.pdf').startswith(b'%PDF'))
+        response.close()  # Libera a vaga de exportação (o servidor WSGI faz isso ao fim do envio)
+
+        response = self.export('?start=2024-01-01&end=2024-01-31')
+        with zipfile.ZipFile(BytesIO(response.data)) as archive:
+            self.assertEqual(archive.namelist(), ['1_Ana.pdf', '3_Carla.pdf'])
+
+    def test_concurrent_exports_are_limited(self):
+        jobs = self.app.extensions['pdf_jobs']
+        self.assertTrue(jobs.acquire_export_slot())  # Outra exportação em andamento
+        response = self.export()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+        jobs.release_export_slot()
+
+        for _ in range(2):  # A vaga volta quando a resposta é fechada
+            response = self.export()
+            self.assertEqual(response.status_code, 200)
+            with zipfile.ZipFile(BytesIO(response.data)) as archive:
+                self.assertEqual(len(archive.namelist()), 3)
+            response.close()
+        self.assertTrue(jobs.acquire_export_slot())
+        jobs.release_export_slot()
+
+    def test_email_domain_is_not_a_like_pattern(self):
+        for domain in ('%', 'empresa_com', '%.com'):
+            with self.subTest(domain=domain):
+                self.assertEqual(self.export(f'?email_domain={domain}').status_code, 400)
+                response = self.client.get(f'/api/admin/export/results?email_domain={domain}', headers=self.auth)
+                self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/admin/export/results?email_domain=@OUTRA.com', headers=self.auth)
+        self.assertEqual([json.loads(line)['user_name'] for line in response.get_data(as_text=True).splitlines()], ['Carla'])
+
+    def test_invalid_date_returns_400(self):
+        self.assertEqual(self.export('?start=ontem').status_code, 400)
+
+    def list_results(self, query=''):
+        return self.client.get(f'/api/admin/results{query}', headers=self.auth)
+
+    def test_results_listing_keyset_pages(self):
+        # Mesmo timestamp da Carla: o desempate é pelo ID
+        twin = DISCResult('Davi', 'davi@outra.com', None, None)
+        twin.timestamp = datetime(2024, 1, 20, 12, 0)
+        db.session.add(twin)
+        db.session.commit()
+
+        names, query = [], '?limit=2'
+        while True:
+            page = self.list_results(query).get_json()
+            names.append([item['user_name'] for item in page['results']])
+            if not page['has_more']:
+                break
+            query = f"?limit=2&cursor={page['next_cursor']}"
+        self.assertEqual(names, [['Bruno', 'Davi'], ['Carla', 'Ana']])
+        self.assertEqual(set(page['results'][0]), {'id', 'user_name', 'user_email', 'timestamp', 'primary_type', 'secondary_type'})
+
+    def test_results_listing_filters(self):
+        page = self.list_results('?user_email=carla@outra.com').get_json()
+        self.assertEqual([item['user_name'] for item in page['results']], ['Carla'])
+        page = self.list_results('?primary_type=d&start=2024-01-15').get_json()
+        self.assertEqual([item['user_name'] for item in page['results']], ['Bruno', 'Carla'])
+        self.assertEqual(self.list_results('?cursor=xyz').status_code, 400)
+        self.assertEqual(self.list_results('?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/results').status_code, 401)
+
+    def test_streams_ndjson_with_watermark(self):
+        response = self.client.get('/api/admin/export/results?since_id=1&include_raw=1', headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([record['id'] for record in records], [2, 3])
+        self.assertEqual(records[0]['timestamp'], '2024-02-05T18:30:00')
+        self.assertEqual(len(records[0]['raw_responses']), len(disc_questions))
+        self.assertIsInstance(records[0]['d_score'], int)
+
+    def test_streams_csv_with_filters(self):
+        response = self.client.get('/api/admin/export/results?format=csv&email_domain=empresa.com&since=2024-02-01',
+                                   headers=self.auth)
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.DictReader(StringIO(response.get_data(as_text=True))))
+        self.assertEqual([row['user_name'] for row in rows], ['Bruno'])
+        self.assertNotIn('raw_responses', rows[0])
+        self.assertEqual(self.client.get('/api/admin/export/results?format=xml', headers=self.auth).status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/export/results?since_id=x', headers=self.auth).status_code, 400)
+
+    def test_export_stops_before_recent_results(self):
+        answers = [{'questionId': q['id'], 'mais': q['I'], 'menos': q['C']} for q in disc_questions]
+        result = calculate_disc_scores(answers)
+        recent = DISCResult('Davi', 'davi@empresa.com', answers, result)  # Timestamp atual
+        late = DISCResult('Eva', 'eva@empresa.com', answers, result)
+        db.session.add_all([recent, late])
+        db.session.flush()
+        late.timestamp = datetime(2024, 3, 1, 8, 0)  # ID maior, timestamp antigo
+        db.session.commit()
+
+        self.app.config['EXPORT_LAG_SECONDS'] = 60
+        response = self.client.get('/api/admin/export/results?since_id=1', headers=self.auth)
+        self.assertEqual([json.loads(line)['id'] for line in response.get_data(as_text=True).splitlines()], [2, 3])
+
+        ids = lambda stmt: [row.id for row in db.session.execute(stmt)]
+        later = datetime.utcnow() + timedelta(seconds=120)
+        self.assertEqual(ids(export_statement(since_id=3, lag_seconds=60)), [])
+        self.assertEqual(ids(export_statement(since_id=3, lag_seconds=60, now=later)), [4, 5])
+        self.assertEqual(ids(export_statement(since_id=3)), [4, 5])
+
+        output = os.path.join(self.directory, 'export.ndjson')
+        result = self.app.test_cli_runner().invoke(args=['disc', 'export-results', '--lag-seconds', '0', '--since-id', '3', '-o', output])
+        self.assertEqual(result.exit_code, 0, result.output)
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['user_name'] for line in f], ['Davi', 'Eva'])
+
+    def test_export_results_cli(self):
+        output = os.path.join(self.directory, 'export.ndjson')
+        result = self.app.test_cli_runner().invoke(args=['disc', 'export-results', '--since-id', '2', '-o', output])
+        self.assertEqual(result.exit_code, 0, result.output)
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['user_name'] for line in f], ['Carla'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.models.disc_result import DISCResult
+
+
+def build_answers(mais_profile, menos_profile):
+    return [
+        {'questionId': q['id'], 'mais': q[mais_profile], 'menos': q[menos_profile]}
+        for q in disc_questions
+    ]
+
+
+class TestBatchCalculateAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_batch_inserts_all_valid_items(self):
+        payload = {'items': [
+            {'answers': build_answers('D', 'C'), 'userInfo': {'name': ' Ana ', 'email': 'ana@empresa.com'}},
+            {'answers': 'invalido'},
+            {'answers': build_answers('S', 'I')},
+        ]}
+        response = self.client.post('/api/calculate/batch', json=payload)
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['saved'], 2)
+        self.assertEqual(body['failed'], 1)
+        self.assertIn('error', body['results'][1])
+
+        first = db.session.get(DISCResult, body['results'][0]['result_id'])
+        self.assertEqual(first.user_name, 'Ana')
+        self.assertEqual(first.primary_type, 'D')
+        self.assertEqual(first.get_scores()['D'], 28)
+        third = db.session.get(DISCResult, body['results'][2]['result_id'])
+        self.assertEqual(third.primary_type, 'S')
+
+    def test_batch_matches_single_endpoint(self):
+        first = disc_questions[0]
+        duplicated = build_answers('I', 'S')
+        submissions = [
+            {'answers': build_answers('D', 'C'), 'userInfo': {'name': 'Ana'}},
+            {'answers': duplicated + duplicated[:3]},
+            {'answers': [{'questionId': str(first['id']), 'mais': f" {first['C'].upper()} ", 'menos': first['D']},
+                         {'questionId': 99999, 'mais': 'x', 'menos': 'y'}]},
+            {'answers': [{'questionId': first['id'], 'mais': first['D'], 'menos': ''}]},
+            {'answers': [{'questionId': first['id'], 'mais': first['D']}]},
+            {'answers': [{'questionId': first['id'], 'mais': first['D'], 'menos': first['S']}], 'userInfo': {'name': 7}},
+            {'answers': []},
+            {'answers': [{'questionId': 99999, 'mais': 'x', 'menos': 'y'}]},
+        ]
+        body = self.client.post('/api/calculate/batch', json={'items': submissions}).get_json()
+        for submission, batch_item in zip(submissions, body['results']):
+            with self.subTest(submission=submission):
+                single = self.client.post('/api/calculate', json=submission)
+                self.assertEqual('result_id' in batch_item, single.status_code == 200, (batch_item, single.get_json()))
+                if single.status_code != 200:
+                    continue
+                single_row = db.session.get(DISCResult, single.get_json()['result_id'])
+                batch_row = db.session.get(DISCResult, batch_item['result_id'])
+                self.assertEqual(batch_row.get_scores(), single_row.get_scores())
+                self.assertEqual((batch_row.primary_type, batch_row.secondary_type),
+                                 (single_row.primary_type, single_row.secondary_type))
+                self.assertEqual(batch_row.get_raw_responses(), single_row.get_raw_responses())
+                self.assertEqual(batch_row.user_name, single_row.user_name)
+        self.assertEqual(body['saved'], 4)
+        self.assertIn('menos', body['results'][3]['error'])
+
+    def test_batch_rejects_empty_and_oversized_payloads(self):
+        self.assertEqual(self.client.post('/api/calculate/batch', json={'items': []}).status_code, 400)
+        self.app.config['BATCH_MAX_ITEMS'] = 1
+        items = [{'answers': build_answers('D', 'C')}] * 2
+        self.assertEqual(self.client.post('/api/calculate/batch', json=items).status_code, 413)
+
+
+if __name__ == '__main__':
+    unittest.main()
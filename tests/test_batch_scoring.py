@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+import random
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.disc_data import disc_questions
+from backend.score_calculator import (
+    calculate_disc_scores, calculate_disc_scores_batch, batch_result_dicts, REPORT_SCHEMA_VERSION
+)
+
+
+def random_submission(rng):
+    """Gera uma submissão aleatória, com questões puladas ou repetidas, palavras inválidas e respostas incompletas."""
+    answers = []
+    for question in disc_questions:
+        if rng.random() < 0.1:
+            continue
+        mais, menos = rng.sample(['D', 'I', 'S', 'C'], 2)
+        menos_word = question[menos] if rng.random() > 0.05 else rng.choice(['Palavra Inexistente', '', None])
+        answer = {'questionId': question['id'], 'mais': question[mais].upper(), 'menos': menos_word}
+        if menos_word is None and rng.random() < 0.5:
+            del answer['menos']
+        answers.append(answer)
+        if rng.random() < 0.05:
+            answers.append(dict(answer))  # Questão repetida
+    return answers
+
+
+class TestBatchScoring(unittest.TestCase):
+
+    def test_batch_matches_scalar(self):
+        """O lote deve produzir exatamente os mesmos scores e perfis do cálculo escalar."""
+        rng = random.Random(42)
+        submissions = [random_submission(rng) for _ in range(300)]
+        batch = calculate_disc_scores_batch(submissions)
+        self.assertEqual(batch.scores.shape, (300, 4))
+        for row, answers in enumerate(submissions):
+            expected = calculate_disc_scores(answers)
+            d, i, s, c = batch.scores[row].tolist()
+            self.assertEqual((d, i, s, c), (expected['d_score'], expected['i_score'], expected['s_score'], expected['c_score']))
+            self.assertEqual(batch.primary_profiles[row], expected['primary_profile'])
+            self.assertEqual(batch.secondary_profiles[row], expected['secondary_profile'])
+
+    def test_incomplete_answers_are_skipped(self):
+        """Sem 'menos' (ausente ou vazio) a resposta inteira é ignorada, inclusive o 'mais'."""
+        first = disc_questions[0]
+        submissions = [
+            [{'questionId': first['id'], 'mais': first['D'], 'menos': ''},
+             {'questionId': disc_questions[1]['id'], 'mais': disc_questions[1]['I'], 'menos': disc_questions[1]['S']}],
+            [{'questionId': first['id'], 'mais': first['D']}],
+            [{'questionId': first['id'], 'mais': first['D'], 'menos': None}],
+        ]
+        batch = calculate_disc_scores_batch(submissions)
+        for row, answers in enumerate(submissions):
+            expected = calculate_disc_scores(answers)
+            self.assertEqual(batch.scores[row].tolist(), [expected[key] for key in ('d_score', 'i_score', 's_score', 'c_score')])
+            self.assertEqual(batch.primary_profiles[row], expected['primary_profile'])
+        self.assertEqual(batch.primary_profiles[0], 'I')
+        self.assertEqual(batch.valid_counts.tolist(), [1, 0, 0])
+
+    def test_repeated_questions_count_every_answer(self):
+        question = disc_questions[0]
+        answer = {'questionId': question['id'], 'mais': question['D'], 'menos': question['C']}
+        submissions = [[answer, dict(answer)], [answer, dict(answer), dict(answer)], [answer]]
+        batch = calculate_disc_scores_batch(submissions)
+        self.assertEqual(batch.scores[:, [0, 3]].tolist(), [[2, -2], [3, -3], [1, -1]])
+        self.assertEqual(batch.valid_counts.tolist(), [2, 3, 1])
+        expected = calculate_disc_scores(submissions[0])
+        self.assertEqual((expected['d_score'], expected['c_score']), (2, -2))
+
+    def test_tie_breaks_are_alphabetical(self):
+        """Todos zerados: primário 'C' e secundário 'D', como sorted(key=(-score, letra))."""
+        batch = calculate_disc_scores_batch([[{'questionId': 1, 'mais': 'x', 'menos': 'y'}]])
+        self.assertEqual(batch.primary_profiles, ['C'])
+        self.assertEqual(batch.secondary_profiles, ['D'])
+        self.assertEqual(batch.valid_counts.tolist(), [0])
+
+    def test_batch_result_dicts(self):
+        answers = [{'questionId': q['id'], 'mais': q['S'], 'menos': q['I']} for q in disc_questions]
+        results = batch_result_dicts(calculate_disc_scores_batch([answers, [], None]))
+        self.assertEqual(results[0]['s_score'], 28)
+        self.assertEqual(results[0]['i_score'], -28)
+        self.assertEqual(results[0]['primary_profile'], 'S')
+        self.assertNotIn('detailed_report', results[0])
+        self.assertEqual(results[0]['report_schema_version'], REPORT_SCHEMA_VERSION)
+        self.assertIsNone(results[1])
+        self.assertIsNone(results[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
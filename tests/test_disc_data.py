@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.disc_data import (
+    disc_questions, word_profile_index, get_profile_for_word,
+    normalize_word, validate_disc_data
+)
+from backend.score_calculator import calculate_disc_scores
+
+
+def build_answers(mais_profile, menos_profile):
+    """Monta uma submissão completa (formato do frontend) escolhendo sempre os mesmos perfis."""
+    return [
+        {'questionId': q['id'], 'mais': q[mais_profile], 'menos': q[menos_profile]}
+        for q in disc_questions
+    ]
+
+
+class TestWordProfileIndex(unittest.TestCase):
+
+    def test_index_covers_every_option(self):
+        """O índice deve ter exatamente 4 entradas por questão, mapeando para o perfil correto."""
+        self.assertEqual(len(word_profile_index), 4 * len(disc_questions))
+        for question in disc_questions:
+            for profile in ('D', 'I', 'S', 'C'):
+                key = (question['id'], normalize_word(question[profile]))
+                self.assertEqual(word_profile_index[key], profile)
+
+    def test_index_is_read_only(self):
+        with self.assertRaises(TypeError):
+            word_profile_index[(1, 'novo')] = 'D'
+
+    def test_get_profile_for_word_normalizes_input(self):
+        self.assertEqual(get_profile_for_word(1, '  DETERMINADO '), 'D')
+        self.assertEqual(get_profile_for_word('18', 'bom ouvinte'), 'S')
+        self.assertIsNone(get_profile_for_word(1, 'Inexistente'))
+        self.assertIsNone(get_profile_for_word(999, 'Determinado'))
+        self.assertIsNone(get_profile_for_word('abc', 'Determinado'))
+
+    def test_validate_disc_data(self):
+        self.assertTrue(validate_disc_data())
+
+    def test_calculate_disc_scores_uses_words(self):
+        result = calculate_disc_scores(build_answers('D', 'C'))
+        self.assertEqual(result['d_score'], 28)
+        self.assertEqual(result['c_score'], -28)
+        self.assertEqual(result['primary_profile'], 'D')
+        # Empate I == S (0): desempate alfabético escolhe 'I'
+        self.assertEqual(result['secondary_profile'], 'I')
+
+
+if __name__ == '__main__':
+    unittest.main()
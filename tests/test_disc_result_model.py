@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from sqlalchemy import func, inspect, select
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.models.disc_result import DISCResult
+from backend.disc_data import disc_descriptions
+from backend.score_calculator import calculate_disc_scores, generate_detailed_report
+
+
+def build_answers(mais_profile, menos_profile):
+    return [
+        {'questionId': q['id'], 'mais': q[mais_profile], 'menos': q[menos_profile]}
+        for q in disc_questions
+    ]
+
+
+class TestDISCResultScoreColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_row_values_fill_score_columns(self):
+        answers = build_answers('C', 'I')
+        values = DISCResult.row_values('Ana', None, answers, calculate_disc_scores(answers))
+        self.assertEqual((values['c_score'], values['c_level']), (28, 'high'))
+        self.assertEqual((values['i_score'], values['i_level']), (-28, 'moderate'))
+        self.assertEqual((values['d_score'], values['d_level']), (0, 'moderate'))
+
+        invalid = DISCResult.row_values('Ana', None, answers, None)
+        self.assertIsNone(invalid['d_score'])
+        self.assertIsNone(invalid['d_level'])
+
+    def test_scores_aggregate_in_database(self):
+        for mais, menos in (('C', 'D'), ('C', 'I'), ('D', 'C')):
+            answers = build_answers(mais, menos)
+            db.session.add(DISCResult(None, None, answers, calculate_disc_scores(answers)))
+        db.session.commit()
+
+        average_d = db.session.scalar(
+            select(func.avg(DISCResult.d_score)).where(DISCResult.primary_type == 'C')
+        )
+        self.assertEqual(average_d, -14)
+
+    def test_get_scores_prefers_columns(self):
+        answers = build_answers('S', 'D')
+        record = DISCResult(None, None, answers, calculate_disc_scores(answers))
+        record.calculated_result_json = '{corrompido'
+        self.assertEqual(record.get_scores(), {'D': -28, 'I': 0, 'S': 28, 'C': 0})
+
+        record.d_score = None  # Linha legada: volta a ler o JSON
+        self.assertIsNone(record.get_scores())
+
+    def test_detailed_report_is_derived_on_demand(self):
+        answers = build_answers('D', 'S')
+        result = calculate_disc_scores(answers)
+        self.assertNotIn('detailed_report', result)
+        record = DISCResult('Ana', None, answers, result)
+        expected = generate_detailed_report(result, disc_descriptions)
+        self.assertEqual(record.get_detailed_report(), expected)
+        self.assertEqual(record.get_profile_summary(), expected['profile_summary'])
+        self.assertEqual(record.to_dict()['calculated_result']['detailed_report'], expected)
+
+        legacy = DISCResult('Ana', None, answers, {**result, 'detailed_report': {'profile_summary': 'antigo'}})
+        self.assertEqual(legacy.get_profile_summary(), 'antigo')
+
+    def test_loader_profiles_defer_heavy_columns(self):
+        answers = build_answers('I', 'C')
+        db.session.add(DISCResult('Ana', None, answers, calculate_disc_scores(answers)))
+        db.session.commit()
+        db.session.expunge_all()
+
+        heavy = {'raw_responses_json', 'raw_responses_packed', 'calculated_result_json'}
+        record = db.session.scalars(select(DISCResult)).one()
+        self.assertFalse(heavy & set(inspect(record).dict))  # Adiadas por padrão
+        self.assertEqual(record.get_raw_responses(), answers)  # Carga sob demanda
+        db.session.expunge_all()
+
+        summary = db.session.scalars(select(DISCResult).options(*DISCResult.loader_options('summary'))).one()
+        self.assertNotIn('d_score', inspect(summary).dict)
+        db.session.expunge_all()
+        scores = db.session.get(DISCResult, summary.id, options=DISCResult.loader_options('scores'))
+        self.assertEqual(scores.get_scores()['I'], 28)
+        self.assertFalse(heavy & set(inspect(scores).dict))
+        db.session.expunge_all()
+        full = db.session.scalars(select(DISCResult).options(*DISCResult.loader_options('full'))).one()
+        self.assertTrue(heavy <= set(inspect(full).dict))
+        with self.assertRaises(ValueError):
+            DISCResult.loader_options('tudo')
+
+
+if __name__ == '__main__':
+    unittest.main()
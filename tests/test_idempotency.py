@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from sqlalchemy import func, select
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.idempotency import get_idempotency_cache
+from backend.models.disc_result import DISCResult
+from backend.score_calculator import calculate_disc_scores
+from backend.write_behind import WriteBehindWriter
+
+ANSWERS = [{'questionId': q['id'], 'mais': q['S'], 'menos': q['D']} for q in disc_questions]
+KEY = '6f1c2a7e-90b4-4c1e-9d55-0a8d3e2f4b71'
+
+
+class TestIdempotentSubmissions(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def count_rows(self):
+        return db.session.scalar(select(func.count(DISCResult.id)))
+
+    def test_repeated_submission_returns_existing_result(self):
+        first = self.client.post('/api/calculate', json={'answers': ANSWERS}, headers={'Idempotency-Key': KEY})
+        second = self.client.post('/api/calculate', json={'answers': ANSWERS, 'idempotencyKey': KEY})
+        self.assertEqual(first.get_json()['result_id'], second.get_json()['result_id'])
+        self.assertEqual(second.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(self.count_rows(), 1)
+
+        # Sem o cache (ex: outro worker, TTL expirado) a chave é encontrada pelo índice
+        get_idempotency_cache().clear()
+        third = self.client.post('/api/calculate', json={'answers': ANSWERS}, headers={'Idempotency-Key': KEY})
+        self.assertEqual(third.get_json()['result_id'], first.get_json()['result_id'])
+        self.assertEqual(self.count_rows(), 1)
+
+        self.assertEqual(self.client.post('/api/calculate', json={'answers': ANSWERS}).status_code, 200)
+        self.assertEqual(self.count_rows(), 2)
+
+    def test_invalid_key_is_rejected(self):
+        response = self.client.post('/api/calculate', json={'answers': ANSWERS}, headers={'Idempotency-Key': 'a b'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.count_rows(), 0)
+
+    def test_concurrent_duplicates_in_same_batch(self):
+        writer = WriteBehindWriter(self.app, max_batch=10, max_delay_ms=200, queue_size=10)
+        try:
+            row = DISCResult.row_values(None, None, ANSWERS, calculate_disc_scores(ANSWERS), KEY)
+            first, second = writer.submit(dict(row)), writer.submit(dict(row))
+            self.assertIsInstance(first.result(timeout=5), int)
+            self.assertIsNotNone(second.exception(timeout=5))  # Barrada pelo índice único
+        finally:
+            writer.shutdown()
+        self.assertEqual(self.count_rows(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
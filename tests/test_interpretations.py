@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.interpretation_loader import find_missing_combinations
+from backend.interpretation_logic import get_all_interpretations, interpretation_table
+
+
+class TestInterpretationTable(unittest.TestCase):
+
+    def test_table_covers_every_combination(self):
+        # 4 primários x 3 níveis x (3 secundários x 4 níveis secundários + sem secundário)
+        self.assertEqual(len(interpretation_table), 4 * 3 * (3 * 4 + 1))
+        self.assertTrue(all(not missing for missing in find_missing_combinations().values()))
+
+    def test_scores_are_overlaid_per_request(self):
+        scores = {'D': 18, 'I': 10, 'S': -4, 'C': -24}
+        result = get_all_interpretations('D', 'I', scores)
+        self.assertEqual(result['general']['primary']['level'], 'high')
+        self.assertEqual(result['general']['primary']['score'], 18)
+        self.assertEqual(result['general']['secondary']['level'], 'significant')
+        self.assertEqual(result['general']['secondary']['score'], 10)
+        self.assertEqual(result['professional']['secondary']['type'], 'I')
+        self.assertNotIn('score', result['professional']['primary'])
+
+    def test_results_do_not_share_state_with_table(self):
+        first = get_all_interpretations('S', 'C', {'S': 5, 'C': 2})
+        first['general']['primary']['title'] = 'alterado'
+        second = get_all_interpretations('S', 'C', {'S': 5, 'C': 2})
+        self.assertEqual(second['general']['primary']['title'], 'Estabilidade')
+
+    def test_invalid_primary_returns_empty_sections(self):
+        result = get_all_interpretations('?', 'D', {'D': 1})
+        self.assertEqual(result['general'], {'primary': {}, 'secondary': {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
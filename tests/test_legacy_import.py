@@ -0,0 +1,226 @@
+import unittest
+import os
+import sys
+import io
+import json
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from sqlalchemy import insert, select
+
+from backend.app import create_app
+from backend.db import db
+from backend import legacy_import
+from backend.disc_data import disc_questions
+from backend.legacy_import import iter_json_records, import_legacy_assessments, import_legacy_results_db
+from backend.score_calculator import calculate_disc_scores
+from backend.models.disc import DISCAssessment
+from backend.models.disc_result import DISCResult
+
+ASSESSMENTS_PATH = os.path.join(project_root, 'backend', 'data', 'assessments.json')
+
+
+class TestJSONRecordStream(unittest.TestCase):
+
+    def test_array_split_across_chunks(self):
+        records = [{'n': index, 'texto': 'ação ' * index} for index in range(30)]
+        stream = io.StringIO(json.dumps(records, indent=2))
+        self.assertEqual([value for _, value in iter_json_records(stream, chunk_chars=7)], records)
+
+    def test_ndjson_and_malformed(self):
+        stream = io.StringIO('{"a": 1}\n{"a": 2}\n')
+        self.assertEqual(list(iter_json_records(stream)), [(0, {'a': 1}), (1, {'a': 2})])
+        self.assertEqual(list(iter_json_records(io.StringIO('[[], {"a": [1]}]'), chunk_chars=3)), [(0, []), (1, {'a': [1]})])
+        for text in ('[{"a": 1}, {"a": ', '[{"a": 1} {"a": 2}]', '[{"a": 1}] x', '[{"a": 1}'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                list(iter_json_records(io.StringIO(text)))
+
+
+class TestLegacyImport(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_imports_assessments_file_with_legacy_scores(self):
+        with open(ASSESSMENTS_PATH, encoding='utf-8') as stream:
+            summary = import_legacy_assessments(stream, 'assessments', chunk_size=5)
+        with open(ASSESSMENTS_PATH, encoding='utf-8') as stream:
+            records = json.load(stream)
+        self.assertEqual((summary['imported'], summary['rejected']), (len(records), 0))
+
+        rows = db.session.scalars(select(DISCResult).order_by(DISCResult.id)).all()
+        for row, record in zip(rows, records):
+            assessment = DISCAssessment()
+            for number, answer in record['responses'].items():
+                assessment.add_response(number, answer['most'], answer['least'])
+            self.assertEqual(row.get_scores(), assessment.calculate_scores())
+            self.assertEqual(row.timestamp.isoformat(), record['timestamp'])
+        self.assertEqual(rows[0].get_raw_responses()[0]['questionId'], 1)
+
+    def test_rejections_and_resume(self):
+        good = {'responses': {'1': {'most': 'A', 'least': 'D'}, '2': {'most': 'B', 'least': 'C'}}, 'name': 'Ana'}
+        data = json.dumps([good, {'responses': {'1': {'most': 'E', 'least': 'A'}}}, good, [],
+                           {'responses': {'999': {'most': 'A', 'least': 'B'}}}, good, good])
+
+        original_flush = legacy_import._flush_chunk
+        calls = []
+
+        def interrupted_flush(pending, summary):
+            calls.append(len(pending))
+            if len(calls) == 2:
+                raise KeyboardInterrupt  # Simula interrupção no segundo lote
+            original_flush(pending, summary)
+
+        with mock.patch.object(legacy_import, '_flush_chunk', interrupted_flush):
+            with self.assertRaises(KeyboardInterrupt):
+                import_legacy_assessments(io.StringIO(data), 'teste', chunk_size=2)
+        db.session.rollback()
+        self.assertEqual(len(db.session.scalars(select(DISCResult)).all()), 2)
+
+        summary = import_legacy_assessments(io.StringIO(data), 'teste', chunk_size=2)
+        self.assertEqual(summary['resumed_from'], 3)
+        self.assertEqual((summary['imported'], summary['rejected']), (2, 2))
+        self.assertEqual(summary['rejections_by_reason'], {'registro não é um objeto': 1, 'questão desconhecida': 1})
+        rows = db.session.scalars(select(DISCResult).order_by(DISCResult.id)).all()
+        self.assertEqual([row.idempotency_key for row in rows],
+                         [f'legacy/teste/{position:09d}' for position in (0, 2, 5, 6)])
+        self.assertEqual(rows[0].user_name, 'Ana')
+
+        again = import_legacy_assessments(io.StringIO(data), 'teste')
+        self.assertEqual((again['read'], again['imported']), (0, 0))
+
+    def test_client_keys_do_not_reach_imported_rows(self):
+        good = {'responses': {'1': {'most': 'A', 'least': 'D'}}, 'name': 'Ana'}
+        import_legacy_assessments(io.StringIO(json.dumps([good])), 'teste')
+        imported_id = db.session.scalar(select(DISCResult.id))
+        client = self.app.test_client()
+        answers = [{'questionId': q['id'], 'mais': q['D'], 'menos': q['C']} for q in disc_questions]
+
+        reserved = client.post('/api/calculate', json={'answers': answers}, headers={'Idempotency-Key': 'legacy/teste/000000000'})
+        self.assertEqual(reserved.status_code, 400)
+        lookalike = client.post('/api/calculate', json={'answers': answers}, headers={'Idempotency-Key': 'legacy:teste:000000000'})
+        self.assertEqual(lookalike.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', lookalike.headers)
+        self.assertNotEqual(lookalike.get_json()['result_id'], imported_id)
+
+    def test_resume_ignores_unparseable_keys(self):
+        answers = [{'questionId': q['id'], 'mais': q['D'], 'menos': q['C']} for q in disc_questions]
+        result_dict = calculate_disc_scores(answers)
+        db.session.execute(insert(DISCResult), [
+            DISCResult.row_values(None, None, answers, result_dict, key)
+            for key in ('legacy:teste:zzzzzzzz', 'legacy/teste/zzzzzzzzz', 'legacy/teste/12', 'legacy/teste/000000001x')
+        ])
+        db.session.commit()
+
+        good = {'responses': {'1': {'most': 'A', 'least': 'D'}}}
+        summary = import_legacy_assessments(io.StringIO(json.dumps([good, good])), 'teste')
+        self.assertEqual((summary['resumed_from'], summary['imported']), (0, 2))
+        again = import_legacy_assessments(io.StringIO(json.dumps([good, good, good])), 'teste')
+        self.assertEqual((again['resumed_from'], again['imported']), (2, 1))
+
+
+
+class TestLegacyResultsDB(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'disc.db')
+        # Mesmo esquema do antigo models/results.py (init_db)
+        connection = sqlite3.connect(self.path)
+        connection.execute("""CREATE TABLE disc_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_name TEXT, email TEXT, answers TEXT, scores TEXT,
+            predominant TEXT, secondary TEXT, profile TEXT, created_at TIMESTAMP)""")
+        words = [{'questionId': q['id'], 'mais': q['S'], 'menos': q['D']} for q in disc_questions]
+        letters = {'1': {'most': 'D', 'least': 'A'}, '2': {'most': 'D', 'least': 'B'}}
+        rows = [
+            ('Ana', 'ana@empresa.com', json.dumps(words), '2024-05-02 10:30:00'),
+            ('Anônimo', '', json.dumps(letters), '2024-05-03 08:00:00'),
+            ('Bruno', '', 'não é json', '2024-05-04 08:00:00'),
+            ('Carla', '', json.dumps([{'questionId': 1, 'resposta': 'A'}]), None),
+            ('Davi', '', json.dumps(words[:3]), '2024-05-05 09:15:00'),
+        ]
+        connection.executemany(
+            "INSERT INTO disc_results (user_name, email, answers, scores, created_at) VALUES (?, ?, ?, '{}', ?)", rows)
+        connection.commit()
+        connection.close()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_migrates_and_resumes(self):
+        summary = import_legacy_results_db(self.path, 'disc', chunk_size=2, source_tz='America/Sao_Paulo')
+        self.assertEqual((summary['read'], summary['imported'], summary['rejected']), (5, 3, 2))
+        self.assertEqual(summary['rejections_by_reason'], {"'answers' não é JSON válido": 1, 'respostas em formato desconhecido': 1})
+
+        rows = db.session.scalars(select(DISCResult).order_by(DISCResult.id)).all()
+        self.assertEqual([row.idempotency_key for row in rows], ['legacy/disc/000000001', 'legacy/disc/000000002', 'legacy/disc/000000005'])
+        self.assertEqual((rows[0].user_name, rows[0].user_email, rows[0].primary_type), ('Ana', 'ana@empresa.com', 'S'))
+        self.assertEqual(rows[0].timestamp.isoformat(), '2024-05-02T13:30:00')  # 10:30 em São Paulo (UTC-3)
+        self.assertEqual((rows[1].user_name, rows[1].user_email, rows[1].primary_type), (None, None, 'C'))
+        self.assertEqual(rows[1].get_scores(), {'D': -1, 'I': -1, 'S': 0, 'C': 2})
+
+        connection = sqlite3.connect(self.path)
+        connection.execute("INSERT INTO disc_results (user_name, answers, created_at) VALUES ('Eva', ?, NULL)",
+                           (json.dumps({'3': {'most': 'B', 'least': 'C'}}),))
+        connection.commit()
+        connection.close()
+        junk = rows[0]
+        db.session.execute(insert(DISCResult), [DISCResult.row_values(None, None, junk.get_raw_responses(), calculate_disc_scores(junk.get_raw_responses()), 'legacy/disc/zzzzzzzzz')])
+        db.session.commit()
+        again = import_legacy_results_db(self.path, 'disc')
+        self.assertEqual((again['resumed_from'], again['read'], again['imported']), (6, 1, 1))
+
+    def test_created_at_defaults_to_system_timezone(self):
+        with mock.patch.dict(os.environ, {'TZ': 'Asia/Tokyo'}):
+            time.tzset()
+            try:
+                import_legacy_results_db(self.path, 'disc')
+            finally:
+                os.environ.pop('TZ')
+                time.tzset()
+        first = db.session.scalars(select(DISCResult).order_by(DISCResult.id)).first()
+        self.assertEqual(first.timestamp.isoformat(), '2024-05-02T01:30:00')
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['disc', 'import-legacy-db', self.path, '--source', 'outra', '--source-tz', 'Marte/Olympus'])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn('Fuso horário desconhecido', result.output)
+        result = runner.invoke(args=['disc', 'import-legacy-db', self.path, '--source', 'outra', '--source-tz', 'UTC'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIsNotNone(db.session.scalar(select(DISCResult.id).where(
+            DISCResult.idempotency_key == 'legacy/outra/000000001', DISCResult.timestamp == datetime(2024, 5, 2, 10, 30))))
+
+    def test_cli_rejects_non_legacy_file(self):
+        other = os.path.join(self.directory, 'outro.db')
+        sqlite3.connect(other).close()
+        result = self.app.test_cli_runner().invoke(args=['disc', 'import-legacy-db', other])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn('Falha ao migrar', result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
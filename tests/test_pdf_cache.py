@@ -0,0 +1,96 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.models.disc_result import DISCResult
+from backend.pdf_cache import PDFCache, pdf_cache_key
+from backend.pdf_jobs import PDFRenderQueue
+from backend.score_calculator import calculate_disc_scores
+
+
+class TestPDFCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_key_changes_with_inputs(self):
+        base = pdf_cache_key(1, 'interp', 'layout')
+        self.assertEqual(base, pdf_cache_key(1, 'interp', 'layout'))
+        self.assertNotEqual(base, pdf_cache_key(2, 'interp', 'layout'))
+        self.assertNotEqual(base, pdf_cache_key(1, 'interp2', 'layout'))
+        self.assertNotEqual(base, pdf_cache_key(1, 'interp', 'layout2'))
+
+    def test_evicts_least_recently_used(self):
+        cache = PDFCache(self.directory, max_bytes=25)
+        cache.put('a', b'x' * 10)
+        cache.put('b', b'x' * 10)
+        # 'a' passa a ser o mais recente; a próxima escrita deve remover 'b'
+        past = time.time() - 60
+        os.utime(cache.path_for('b'), (past, past))
+        cache.get('a')
+        cache.put('c', b'x' * 10)
+        self.assertEqual(cache.read('a'), b'x' * 10)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+
+class TestDownloadPDFCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app('testing')
+        cache = PDFCache(self.directory, 10 * 1024 * 1024)
+        self.app.extensions['pdf_cache'] = cache
+        self.app.extensions['pdf_jobs'] = PDFRenderQueue(cache, workers=0, max_pending=4)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        answers = [{'questionId': q['id'], 'mais': q['I'], 'menos': q['S']} for q in disc_questions]
+        result = DISCResult('Ana', 'ana@empresa.com', answers, calculate_disc_scores(answers))
+        db.session.add(result)
+        db.session.commit()
+        self.result_id = result.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_pdf_is_cached_and_revalidated(self):
+        url = f'/results/{self.result_id}/download_pdf'
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.data.startswith(b'%PDF'))
+        etag = first.headers['ETag']
+        self.assertTrue(os.path.exists(os.path.join(self.directory, etag.strip('"') + '.pdf')))
+
+        second = self.client.get(url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+
+        not_modified = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_missing_result_returns_404(self):
+        self.assertEqual(self.client.get('/results/9999/download_pdf').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from unittest import mock
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.interpretation_logic import get_all_interpretations
+from backend.models.disc_result import DISCResult
+from backend.pdf_cache import PDFCache
+from backend.pdf_jobs import (
+    PDFRenderQueue, PDFQueueFull, PENDING_MARKER, STATUS_FAILED, STATUS_PENDING, STATUS_READY, STATUS_NOT_STARTED
+)
+from backend.score_calculator import calculate_disc_scores
+
+
+def sample_report():
+    scores = {'D': 12, 'I': 4, 'S': -6, 'C': -10}
+    return {
+        'result_id': 1, 'user_name': 'Ana', 'user_email': None, 'timestamp': datetime(2024, 1, 1),
+        'primary_type': 'D', 'secondary_type': 'I', 'scores': scores,
+        'interpretations': get_all_interpretations('D', 'I', scores),
+    }
+
+
+class TestPDFRenderQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = PDFCache(self.directory, 10 * 1024 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_process_pool_renders_into_cache(self):
+        queue = PDFRenderQueue(self.cache, workers=1, max_pending=2)
+        try:
+            self.assertEqual(queue.status('job'), STATUS_NOT_STARTED)
+            path = queue.submit('job', sample_report()).result(timeout=60)
+            self.assertEqual(path, self.cache.path_for('job'))
+            self.assertTrue(self.cache.read('job').startswith(b'%PDF'))
+            self.assertEqual(queue.status('job'), STATUS_READY)
+            # O callback de conclusão roda na thread do pool, logo após result() liberar
+            deadline = time.monotonic() + 5
+            while (queue.pending_count() or self.cache.read_marker('job', PENDING_MARKER)) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(queue.pending_count(), 0)
+            self.assertIsNone(self.cache.read_marker('job', PENDING_MARKER))
+            # Exportação em lote: mesmo pool, bytes devolvidos sem passar pela fila
+            self.assertTrue(queue.render_bytes(sample_report()).result(timeout=60).startswith(b'%PDF'))
+        finally:
+            queue.shutdown()
+
+    def test_broken_pool_is_shut_down_and_replaced(self):
+        queue = PDFRenderQueue(self.cache, workers=1, max_pending=2)
+        broken = mock.Mock(spec=ProcessPoolExecutor)
+        broken.submit.side_effect = BrokenProcessPool('processo filho morreu')
+        queue._executor = broken
+        try:
+            path = queue.submit('job', sample_report()).result(timeout=60)
+            self.assertEqual(path, self.cache.path_for('job'))
+            broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+            self.assertIsNot(queue._executor, broken)
+        finally:
+            queue.shutdown()
+
+    def test_job_state_is_shared_through_the_cache_directory(self):
+        # Duas filas no mesmo diretório simulam dois workers do gunicorn
+        first = PDFRenderQueue(self.cache, workers=0, max_pending=2)
+        second = PDFRenderQueue(PDFCache(self.directory, 10 * 1024 * 1024), workers=0, max_pending=2)
+
+        self.cache.create_marker('job', PENDING_MARKER, 'outro processo')
+        self.assertEqual(second.status('job'), STATUS_PENDING)
+        self.assertIsNone(second.submit('job', sample_report()))
+        self.assertIsNone(self.cache.get('job'))
+
+        # Marcador abandonado (mais velho que pending_ttl): o job é assumido e renderizado
+        old = time.time() - 600
+        os.utime(self.cache.marker_path('job', PENDING_MARKER), (old, old))
+        self.assertEqual(second.status('job'), STATUS_NOT_STARTED)
+        second.submit('job', sample_report()).result(timeout=60)
+        self.assertEqual(first.status('job'), STATUS_READY)
+        self.assertIsNone(self.cache.read_marker('job', PENDING_MARKER))
+
+        with mock.patch('backend.pdf_jobs.render_report', side_effect=RuntimeError('falha no ReportLab')):
+            with self.assertRaises(RuntimeError):
+                first.submit('broken', sample_report()).result(timeout=60)
+        self.assertEqual(second.status('broken'), STATUS_FAILED)
+        self.assertIsNone(self.cache.read_marker('broken', PENDING_MARKER))
+        second.failure_ttl = 0
+        self.assertEqual(second.status('broken'), STATUS_NOT_STARTED)
+
+    def test_rejects_jobs_when_queue_is_full(self):
+        queue = PDFRenderQueue(self.cache, workers=0, max_pending=0)
+        with self.assertRaises(PDFQueueFull):
+            queue.submit('job', sample_report())
+
+
+class TestPDFJobRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app('testing')
+        cache = PDFCache(self.directory, 10 * 1024 * 1024)
+        self.app.extensions['pdf_cache'] = cache
+        self.app.extensions['pdf_jobs'] = PDFRenderQueue(cache, workers=0, max_pending=4)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        answers = [{'questionId': q['id'], 'mais': q['C'], 'menos': q['D']} for q in disc_questions]
+        result = DISCResult('Ana', None, answers, calculate_disc_scores(answers))
+        db.session.add(result)
+        db.session.commit()
+        self.result_id = result.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_request_status_and_download(self):
+        status = self.client.get(f'/results/{self.result_id}/pdf/status').get_json()
+        self.assertEqual(status['status'], STATUS_NOT_STARTED)
+
+        response = self.client.post(f'/results/{self.result_id}/pdf')
+        self.assertEqual(response.status_code, 200)
+        job = response.get_json()
+        self.assertEqual(job['status'], STATUS_READY)
+
+        status = self.client.get(job['status_url']).get_json()
+        self.assertEqual(status['status'], STATUS_READY)
+        self.assertEqual(status['job_id'], job['job_id'])
+
+        download = self.client.get(job['download_url'])
+        self.assertEqual(download.status_code, 200)
+        self.assertTrue(download.data.startswith(b'%PDF'))
+
+    def test_download_does_not_wait_for_job_in_another_worker(self):
+        cache_key = self.client.get(f'/results/{self.result_id}/pdf/status').get_json()['job_id']
+        self.app.extensions['pdf_cache'].create_marker(cache_key, PENDING_MARKER, 'outro processo')
+        self.assertEqual(self.client.get(f'/results/{self.result_id}/pdf/status').get_json()['status'], STATUS_PENDING)
+        response = self.client.get(f'/results/{self.result_id}/download_pdf')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.get_json()['status'], STATUS_PENDING)
+        self.assertEqual(self.client.post(f'/results/{self.result_id}/pdf').status_code, 202)
+
+    def test_full_queue_returns_503(self):
+        self.app.extensions['pdf_jobs'].max_pending = 0
+        response = self.client.post(f'/results/{self.result_id}/pdf')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+        self.assertEqual(self.client.get(f'/results/{self.result_id}/download_pdf').status_code, 503)
+
+    def test_unknown_result(self):
+        self.assertEqual(self.client.post('/results/9999/pdf').status_code, 404)
+        self.assertEqual(self.client.get('/results/9999/pdf/status').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
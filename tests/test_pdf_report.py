@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from datetime import datetime
+from io import BytesIO
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.interpretation_logic import get_all_interpretations
+from backend.pdf_cache import PDFCache
+from backend.pdf_report import (
+    build_pdf_report, build_pdf_report_with_fragments,
+    fragments_supported, interpretation_fragment_id
+)
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+
+def sample_report(user_name, scores, primary='S', secondary='C'):
+    return {
+        'result_id': 7, 'user_name': user_name, 'user_email': None, 'timestamp': datetime(2024, 5, 1, 12, 0),
+        'primary_type': primary, 'secondary_type': secondary, 'scores': scores,
+        'interpretations': get_all_interpretations(primary, secondary, scores),
+    }
+
+
+@unittest.skipIf(PdfReader is None or not fragments_supported(), "pypdf não instalado")
+class TestPDFFragments(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = PDFCache(self.directory, 10 * 1024 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def page_texts(self, data):
+        return [page.extract_text() for page in PdfReader(BytesIO(data)).pages]
+
+    def test_fragments_match_full_render(self):
+        report = sample_report('Ana', {'D': -10, 'I': 2, 'S': 16, 'C': 6})
+        full = self.page_texts(build_pdf_report(report))
+        merged = self.page_texts(build_pdf_report_with_fragments(report, self.cache, 'v1'))
+        self.assertEqual(merged, full)
+        # Numeração contínua no rodapé, inclusive nas páginas vindas do fragmento
+        for number, text in enumerate(merged, start=1):
+            self.assertIn(f"Página {number}", text)
+
+    def test_fragment_is_shared_by_same_combination(self):
+        first = sample_report('Ana', {'D': -10, 'I': 2, 'S': 16, 'C': 6})
+        second = sample_report('Bruno', {'D': -12, 'I': 0, 'S': 17, 'C': 7})
+        self.assertEqual(interpretation_fragment_id(first), interpretation_fragment_id(second))
+
+        build_pdf_report_with_fragments(first, self.cache, 'v1')
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        pdf = build_pdf_report_with_fragments(second, self.cache, 'v1')
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.assertIn('Bruno', self.page_texts(pdf)[0])
+
+        # Outro namespace (textos alterados) gera outro fragmento
+        build_pdf_report_with_fragments(second, self.cache, 'v2')
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
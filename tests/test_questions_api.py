@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import gzip
+import json
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.app import create_app
+from backend.disc_data import disc_questions
+from backend.questions_payload import build_questions_payload, questions_payload
+
+
+class TestQuestionsAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+
+    def test_plain_and_gzip_bodies(self):
+        plain = self.client.get('/api/questions')
+        self.assertEqual(plain.status_code, 200)
+        self.assertEqual(plain.get_json(), disc_questions)
+        self.assertEqual(plain.headers['Cache-Control'], 'no-cache')
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+
+        compressed = self.client.get('/api/questions', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(compressed.data)), disc_questions)
+        self.assertEqual(compressed.headers['ETag'], f'"{questions_payload.gzip_etag}"')
+        self.assertNotEqual(compressed.headers['ETag'], plain.headers['ETag'])
+
+    def test_etag_revalidation(self):
+        etag = self.client.get('/api/questions').headers['ETag']
+        self.assertEqual(etag, f'"{questions_payload.etag}"')
+        response = self.client.get('/api/questions', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+        gzip_etag = self.client.get('/api/questions', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+        response = self.client.get('/api/questions', headers={'If-None-Match': gzip_etag, 'Accept-Encoding': 'gzip'})
+        self.assertEqual((response.status_code, response.headers['ETag']), (304, gzip_etag))
+        # Qualquer uma das duas tags é aceita; o 304 confirma a que o cliente enviou
+        response = self.client.get('/api/questions', headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+        self.assertEqual((response.status_code, response.headers['ETag']), (304, etag))
+        response = self.client.get('/api/questions', headers={'If-None-Match': '"outra"', 'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_versioned_url_is_immutable(self):
+        response = self.client.get(f'/api/questions?v={questions_payload.version}')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        stale = self.client.get('/api/questions?v=antiga')
+        self.assertEqual(stale.headers['Cache-Control'], 'no-cache')
+
+    def test_quiz_page_links_versioned_url(self):
+        page = self.client.get('/quiz').get_data(as_text=True)
+        self.assertIn(f'/api/questions?v={questions_payload.version}', page)
+
+
+class TestInlineQuestions(unittest.TestCase):
+
+    def test_quiz_embeds_question_json(self):
+        app = create_app('testing')
+        page = app.test_client().get('/quiz').get_data(as_text=True)
+        start = page.index('<script type="application/json" id="disc-questions-data">')
+        start = page.index('>', start) + 1
+        end = page.index('</script>', start)
+        self.assertEqual(json.loads(page[start:end]), disc_questions)
+
+    def test_inline_can_be_disabled(self):
+        app = create_app('testing')
+        app.config['QUIZ_INLINE_QUESTIONS'] = False
+        page = app.test_client().get('/quiz').get_data(as_text=True)
+        self.assertNotIn('disc-questions-data', page)
+
+    def test_html_safe_json(self):
+        payload = build_questions_payload([{'id': 1, 'D': '</script><b>&'}])
+        self.assertNotIn('</script>', payload.inline_json)
+        self.assertEqual(json.loads(payload.inline_json), [{'id': 1, 'D': '</script><b>&'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
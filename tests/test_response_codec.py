@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import random
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.disc_data import disc_questions, QUESTION_SET_VERSION
+from backend.models.disc_result import DISCResult
+from backend.response_codec import (
+    encode_responses, decode_responses, decode_for_version, packed_size, ResponseCodecError
+)
+
+
+def random_answers(rng):
+    answers = []
+    for question in disc_questions:
+        if rng.random() < 0.2:
+            continue  # Questão pulada (tempo esgotado)
+        mais, menos = rng.sample(['D', 'I', 'S', 'C'], 2)
+        answers.append({'questionId': question['id'], 'mais': question[mais], 'menos': question[menos]})
+    return answers
+
+
+class TestResponseCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            answers = random_answers(rng)
+            encoded = encode_responses(answers)
+            self.assertEqual(len(encoded), packed_size())
+            self.assertEqual(decode_responses(encoded), answers)
+        self.assertEqual(packed_size(), 15)
+        self.assertEqual(decode_responses(encode_responses([])), [])
+
+    def test_unrepresentable_inputs_are_not_encoded(self):
+        q1, q2 = disc_questions[0], disc_questions[1]
+        valid = {'questionId': q1['id'], 'mais': q1['D'], 'menos': q1['C']}
+        cases = [
+            None,
+            [{'questionId': q1['id'], 'mais': q1['D'].lower(), 'menos': q1['C']}],  # Palavra não exata
+            [{'questionId': q1['id'], 'mais': q1['D'], 'menos': q1['D']}],          # MAIS == MENOS
+            [{'questionId': str(q1['id']), 'mais': q1['D'], 'menos': q1['C']}],     # ID como string
+            [dict(valid, extra=1)],                                                  # Chave extra
+            [{'questionId': q2['id'], 'mais': q2['D'], 'menos': q2['C']}, valid],   # Fora de ordem
+            [valid, valid],                                                          # Duplicada
+        ]
+        for case in cases:
+            self.assertIsNone(encode_responses(case), case)
+
+    def test_decode_rejects_bad_data(self):
+        with self.assertRaises(ResponseCodecError):
+            decode_responses(b'\x02' + bytes(14))
+        with self.assertRaises(ResponseCodecError):
+            decode_responses(b'\x01' + bytes(3))
+        with self.assertRaises(ResponseCodecError):
+            decode_for_version(encode_responses([]), 'desconhecida')
+
+    def test_model_stores_packed_and_decodes_transparently(self):
+        answers = random_answers(random.Random(3))
+        record = DISCResult('Ana', None, answers, {'d_score': 1})
+        self.assertIsNone(record.raw_responses_json)
+        self.assertEqual(record.question_set_version, QUESTION_SET_VERSION)
+        self.assertEqual(record.get_raw_responses(), answers)
+
+        legacy = DISCResult('Ana', None, [{'questionId': 1, 'mais': 'x', 'menos': 'y'}], {'d_score': 1})
+        self.assertIsNone(legacy.raw_responses_packed)
+        self.assertEqual(legacy.get_raw_responses(), [{'questionId': 1, 'mais': 'x', 'menos': 'y'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
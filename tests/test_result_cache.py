@@ -0,0 +1,145 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from cachelib import FileSystemCache
+from sqlalchemy import event
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.pdf_cache import PDFCache
+from backend.pdf_jobs import PDFRenderQueue
+from backend.cache import TieredCache, build_shared_cache
+from backend.result_cache import ResultCache, ResultView
+
+
+def make_view(result_id):
+    return ResultView(result_id, None, None, None, 'D', 'I', {'D': 20, 'I': 10, 'S': 0, 'C': 0}, {})
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_ttl_and_lru(self):
+        now = [0.0]
+        cache = ResultCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+        cache.put(make_view(1))
+        cache.put(make_view(2))
+        self.assertEqual(cache.get(1).id, 1)  # 1 passa a ser o mais recente
+        cache.put(make_view(3))                # Remove 2 (menos usado)
+        self.assertIsNone(cache.get(2))
+        now[0] = 11.0                          # Expira as demais
+        self.assertIsNone(cache.get(1))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 2, 1))
+        self.assertEqual(stats['entries'], 1)
+
+    def test_get_or_load(self):
+        class FakeResult:
+            id, user_name, user_email, timestamp = 9, 'Ana', None, None
+            primary_type, secondary_type = 'D', 'I'
+
+            def get_scores(self):
+                return {'D': 20, 'I': 10, 'S': -5, 'C': -25}
+
+        calls = []
+        loader = lambda result_id: calls.append(result_id) or (FakeResult() if result_id == 9 else None)
+        cache = ResultCache(max_entries=4, ttl_seconds=60)
+        self.assertIsNone(cache.get_or_load(8, loader))
+        view = cache.get_or_load(9, loader)
+        self.assertIs(cache.get_or_load(9, loader), view)
+        self.assertEqual(calls, [8, 9])
+        self.assertEqual(view.interpretations['general']['primary']['type'], 'D')
+        with self.assertRaises(TypeError):
+            view.interpretations['general']['primary']['type'] = 'C'  # Somente leitura
+
+
+class TestSharedTier(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_other_worker_reads_from_shared_tier(self):
+        shared = build_shared_cache({'CACHE_L2_BACKEND': 'filesystem', 'CACHE_L2_DIR': self.directory})
+        self.assertIsInstance(shared, FileSystemCache)
+        worker_a = ResultCache(max_entries=4, ttl_seconds=60, shared=shared)
+        worker_b = ResultCache(max_entries=4, ttl_seconds=60,
+                               shared=FileSystemCache(self.directory))  # Outro processo, mesmo diretório
+        view = ResultView.from_fields({'id': 5, 'user_name': 'Ana', 'user_email': None, 'timestamp': None,
+                                       'primary_type': 'D', 'secondary_type': 'I',
+                                       'scores': {'D': 20, 'I': 10, 'S': -5, 'C': -25}})
+        worker_a.put(view)
+
+        self.assertEqual(worker_b.get(5), view)  # Interpretações refeitas a partir da tabela
+        self.assertIs(worker_b.get(5), worker_b.get(5))  # Promovida para o L1
+        stats = worker_b.stats()
+        self.assertEqual((stats['shared_hits'], stats['hits'], stats['misses']), (1, 2, 0))
+
+    def test_shared_failure_is_a_miss(self):
+        class BrokenCache(FileSystemCache):
+            def get(self, key):
+                raise ConnectionError('indisponível')
+
+        cache = TieredCache('x', max_entries=4, ttl_seconds=60, shared=BrokenCache(self.directory))
+        self.assertIsNone(cache.get('chave'))
+        self.assertEqual(cache.stats()['misses'], 1)
+        with self.assertRaises(ValueError):
+            build_shared_cache({'CACHE_L2_BACKEND': 'memcached'})
+
+
+class TestResultCacheRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app('testing')
+        cache = PDFCache(self.directory, 10 * 1024 * 1024)
+        self.app.extensions['pdf_cache'] = cache
+        self.app.extensions['pdf_jobs'] = PDFRenderQueue(cache, workers=0, max_pending=4)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_results_and_pdf_served_without_database(self):
+        answers = [{'questionId': q['id'], 'mais': q['I'], 'menos': q['C']} for q in disc_questions]
+        response = self.client.post('/api/calculate', json={'answers': answers, 'userInfo': {'name': 'Ana'}})
+        result_id = response.get_json()['result_id']
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            page = self.client.get('/results')
+            pdf = self.client.get(f'/results/{result_id}/download_pdf')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        self.assertEqual(page.status_code, 200)
+        self.assertIn('Ana'.encode(), page.data)
+        self.assertEqual(pdf.status_code, 200)
+        self.assertEqual(statements, [])
+
+        stats = self.client.get('/api/admin/cache/results',
+                                headers={'Authorization': 'Bearer testing-admin-token'}).get_json()
+        self.assertEqual(stats['result_cache']['hits'], 2)
+        self.assertEqual(stats['result_cache']['misses'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
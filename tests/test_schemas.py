@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from flask import jsonify
+from markupsafe import Markup
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.json_provider import MsgspecJSONProvider
+from backend.models.disc_result import DISCResult
+from backend.schemas import decode_calculate_payload
+
+ANSWERS = [{'questionId': q['id'], 'mais': q['I'], 'menos': q['C']} for q in disc_questions]
+
+
+class TestCalculatePayload(unittest.TestCase):
+
+    def test_decodes_and_cleans(self):
+        payload = decode_calculate_payload(
+            b'{"answers": [{"questionId": 1, "mais": "Ousado", "menos": "Calmo", "extra": 0}],'
+            b' "userInfo": {"name": "  Ana ", "email": ""}, "idempotencyKey": "abcdefgh"}'
+        )
+        self.assertEqual(payload.answer_dicts(), [{'questionId': 1, 'mais': 'Ousado', 'menos': 'Calmo'}])
+        self.assertEqual(payload.userInfo.cleaned(), ('Ana', None))
+        self.assertEqual(payload.idempotencyKey, 'abcdefgh')
+
+    def test_rejects_invalid_payloads(self):
+        for body in (b'{"answers": []}',
+                     b'{"userInfo": {}}',
+                     b'{"answers": [{"questionId": 1, "mais": "Ousado"}]}',
+                     b'{"answers": [{"questionId": 1.5, "mais": "a", "menos": "b"}]}',
+                     b'{"answers": [{"questionId": 1, "mais": "a", "menos": "b"}], "userInfo": {"name": 3}}',
+                     b'{"answers": ['):
+            with self.subTest(body=body), self.assertRaises(ValueError):
+                decode_calculate_payload(body)
+
+
+class TestMsgspecIntegration(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_json_provider(self):
+        self.assertIsInstance(self.app.json, MsgspecJSONProvider)
+        response = jsonify({'texto': Markup('<b>ação</b>'), 'itens': (1, 2)})
+        self.assertEqual(response.get_json(), {'texto': '<b>ação</b>', 'itens': [1, 2]})
+        self.assertEqual(self.app.json.dumps({'b': 1, 'a': 2}, sort_keys=True), '{"a": 2, "b": 1}')
+
+    def test_calculate_validation(self):
+        response = self.client.post('/api/calculate', json={'answers': ANSWERS, 'userInfo': {'name': ' Ana '}})
+        self.assertEqual(response.status_code, 200)
+        record = db.session.get(DISCResult, response.get_json()['result_id'])
+        self.assertEqual(record.user_name, 'Ana')
+        self.assertEqual(record.get_calculated_result()['primary_profile'], 'I')
+
+        bad = self.client.post('/api/calculate', json={'answers': [{'questionId': 1, 'mais': 7, 'menos': 'x'}]})
+        self.assertEqual(bad.status_code, 400)
+        self.assertIn('answers[0].mais', bad.get_json()['error'])
+        malformed = self.client.post('/api/calculate', data='{"answers": [', content_type='application/json')
+        self.assertEqual(malformed.status_code, 400)
+
+    def test_stored_json_round_trip(self):
+        record = DISCResult('Ana', None, [{'questionId': 1, 'mais': 'Ação', 'menos': 'Calmo'}],
+                            {'primary_profile': 'D', 'secondary_profile': 'I', 'D': 1, 'I': 0, 'S': 0, 'C': 0})
+        self.assertEqual(record.get_calculated_result()['primary_profile'], 'D')
+        record.raw_responses_packed = None
+        record.raw_responses_json = '[{"questionId": 1, "mais": "A\\u00e7\\u00e3o"}]'  # Gravado pelo json da stdlib
+        self.assertEqual(record.get_raw_responses(), [{'questionId': 1, 'mais': 'Ação'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+import json
+import subprocess
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from backend.disc_data import disc_questions, get_profile_for_word
+from backend.score_calculator import calculate_disc_scores, score_ndjson_chunk
+
+ANSWERS = [{'questionId': q['id'], 'mais': q['C'], 'menos': q['I']} for q in disc_questions]
+
+
+def run_cli(*args, stdin=b''):
+    return subprocess.run([sys.executable, '-m', 'backend.score_calculator', *args],
+                          input=stdin, capture_output=True, cwd=project_root, timeout=60)
+
+
+class TestScoreCLI(unittest.TestCase):
+
+    def test_chunk_scores_and_reports_errors(self):
+        lines = [
+            json.dumps({'id': 7, 'answers': ANSWERS}).encode(),
+            b'\n',
+            b'{"answers": [',
+            json.dumps(ANSWERS).encode(),
+            b'{"id": 9}',
+        ]
+        block, scored, errors = score_ndjson_chunk(10, lines)
+        records = [json.loads(line) for line in block.splitlines()]
+        self.assertEqual((scored, errors), (2, 2))
+        expected = calculate_disc_scores(ANSWERS)
+        self.assertEqual(records[0]['id'], 7)
+        self.assertEqual(records[0]['c_score'], expected['c_score'])
+        self.assertEqual(records[0]['primary_profile'], 'C')
+        self.assertEqual(records[1]['line'], 12)
+        self.assertEqual(records[2]['primary_profile'], 'C')
+        self.assertEqual((records[3]['line'], records[3]['id']), (14, 9))
+
+    def test_exact_and_normalized_words(self):
+        question = disc_questions[0]
+        self.assertEqual(get_profile_for_word(question['id'], question['D']), 'D')
+        self.assertEqual(get_profile_for_word(str(question['id']), f"  {question['D'].upper()} "), 'D')
+
+    def test_cli_preserves_order_with_workers(self):
+        stdin = b''.join(json.dumps({'id': index, 'answers': ANSWERS}).encode() + b'\n' for index in range(25))
+        result = run_cli('--workers', '2', '--chunk-size', '4', stdin=stdin)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual([json.loads(line)['id'] for line in result.stdout.splitlines()], list(range(25)))
+
+    def test_import_does_not_load_web_stack(self):
+        code = "import sys, backend.score_calculator; print(sorted(m for m in ('flask', 'sqlalchemy', 'reportlab') if m in sys.modules))"
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, cwd=project_root, timeout=60)
+        self.assertEqual(result.stdout.strip(), b'[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
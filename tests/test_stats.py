@@ -0,0 +1,126 @@
+import unittest
+import os
+import sys
+import statistics
+from datetime import datetime, timedelta
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from sqlalchemy import update
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.models.disc_daily_stats import DISCDailyStats, StatsWatermark
+from backend.models.disc_result import DISCResult
+from backend.score_calculator import calculate_disc_scores
+from backend.stats import (
+    refresh_daily_stats, daily_stats_summary, stats_watermark, DAILY_STATS_WATERMARK,
+    StatsRefreshConflict, _refresh_chunk
+)
+
+PAIRS = [('D', 'S'), ('I', 'C'), ('C', 'D'), ('D', 'I'), ('S', 'C')]
+
+
+def add_result(mais, menos, timestamp):
+    answers = [{'questionId': q['id'], 'mais': q[mais], 'menos': q[menos]} for q in disc_questions[:20]]
+    record = DISCResult(None, None, answers, calculate_disc_scores(answers))
+    record.timestamp = timestamp
+    db.session.add(record)
+    return record
+
+
+class TestDailyStats(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.day = datetime(2024, 3, 1, 10, 0)
+        for index, (mais, menos) in enumerate(PAIRS * 3):
+            add_result(mais, menos, self.day + timedelta(days=index % 3, minutes=index))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_matches_full_scan_and_is_incremental(self):
+        self.assertEqual(refresh_daily_stats(chunk_size=4, lag_seconds=0), 15)
+        self.assertEqual(refresh_daily_stats(chunk_size=4, lag_seconds=0), 0)  # Nada novo
+
+        add_result('D', 'C', self.day)
+        db.session.commit()
+        self.assertEqual(refresh_daily_stats(chunk_size=4, lag_seconds=0), 1)
+        self.assertEqual(stats_watermark(), 16)
+
+        results = db.session.query(DISCResult).all()
+        summary = daily_stats_summary()
+        self.assertEqual(summary['result_count'], 16)
+        self.assertAlmostEqual(summary['factors']['D']['mean'], round(statistics.mean(r.d_score for r in results), 2))
+        self.assertAlmostEqual(summary['factors']['I']['stddev'], round(statistics.pstdev(r.i_score for r in results), 2))
+        self.assertEqual(summary['primary_profile_counts']['D'], sum(1 for r in results if r.primary_type == 'D'))
+        self.assertEqual([item['count'] for item in summary['daily_counts']], [6, 5, 5])
+
+        first_day = daily_stats_summary(self.day.date(), self.day.date() + timedelta(days=1), 'D')
+        self.assertEqual(first_day['result_count'], sum(
+            1 for r in results if r.primary_type == 'D' and r.timestamp.date() == self.day.date()))
+
+    def test_recent_rows_wait_for_lag(self):
+        add_result('D', 'S', datetime.utcnow())
+        db.session.commit()
+        self.assertEqual(refresh_daily_stats(lag_seconds=60), 15)
+        self.assertEqual(refresh_daily_stats(lag_seconds=60, now=datetime.utcnow() + timedelta(minutes=2)), 1)
+
+    def test_compare_and_set_rejects_stale_watermark(self):
+        refresh_daily_stats(chunk_size=10, lag_seconds=0)  # Marca em 15
+        add_result('D', 'S', self.day)
+        db.session.commit()
+        # Simula outro processo que avançou a marca depois da leitura deste
+        original_get = db.session.get
+
+        def stale_get(entity, ident, *args, **kwargs):
+            obj = original_get(entity, ident, *args, **kwargs)
+            if entity is StatsWatermark:
+                db.session.execute(update(StatsWatermark).values(last_result_id=StatsWatermark.last_result_id + 1)
+                                   .execution_options(synchronize_session=False))
+            return obj
+
+        db.session.get = stale_get
+        try:
+            with self.assertRaises(StatsRefreshConflict):
+                _refresh_chunk(100, datetime.utcnow())
+        finally:
+            db.session.get = original_get
+        self.assertEqual(sum(row.result_count for row in db.session.query(DISCDailyStats)), 15)  # Lote descartado
+
+    def test_stats_api(self):
+        client = self.app.test_client()
+        auth = {'Authorization': f"Bearer {self.app.config['ADMIN_API_TOKEN']}"}
+        body = client.get('/api/admin/stats?start=2024-03-02&end=2024-03-02', headers=auth).get_json()
+        self.assertEqual(body['stats']['result_count'], 0)  # Leitura não grava nos agregados
+        self.assertIsNone(db.session.get(StatsWatermark, DAILY_STATS_WATERMARK))
+
+        refresh_daily_stats(lag_seconds=0)
+        body = client.get('/api/admin/stats?start=2024-03-02&end=2024-03-02', headers=auth).get_json()
+        self.assertEqual(body['stats']['result_count'], 5)
+        self.assertEqual(body['stats']['last_result_id'], 15)
+
+    def test_refresh_on_read_is_limited_to_one_chunk(self):
+        self.app.config.update(STATS_REFRESH_ON_READ=True, STATS_REFRESH_CHUNK_SIZE=4)
+        client = self.app.test_client()
+        auth = {'Authorization': f"Bearer {self.app.config['ADMIN_API_TOKEN']}"}
+        self.assertEqual(client.get('/api/admin/stats', headers=auth).get_json()['stats']['last_result_id'], 4)
+        self.assertEqual(client.get('/api/admin/stats?refresh=0', headers=auth).get_json()['stats']['last_result_id'], 4)
+        self.assertEqual(refresh_daily_stats(chunk_size=4, lag_seconds=0, max_chunks=2), 8)
+        self.assertEqual(stats_watermark(), 12)
+        self.assertEqual(client.get('/api/admin/stats?primary_type=X', headers=auth).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+
+# --- Adicionar diretório raiz ao sys.path ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# ------------------------------------------
+
+from sqlalchemy import event, func, select
+
+from backend.app import create_app
+from backend.db import db
+from backend.disc_data import disc_questions
+from backend.models.disc_result import DISCResult
+from backend.score_calculator import calculate_disc_scores
+from backend.write_behind import WriteBehindWriter
+
+
+def build_row(name):
+    answers = [{'questionId': q['id'], 'mais': q['D'], 'menos': q['S']} for q in disc_questions]
+    return DISCResult.row_values(name, None, answers, calculate_disc_scores(answers))
+
+
+class TestWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.writer = WriteBehindWriter(self.app, max_batch=50, max_delay_ms=200, queue_size=100)
+        self.app.extensions['write_behind'] = self.writer
+        self.commits = 0
+        event.listen(db.engine, 'commit', self._count_commit)
+
+    def tearDown(self):
+        event.remove(db.engine, 'commit', self._count_commit)
+        self.writer.shutdown()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_commit(self, connection):
+        self.commits += 1
+
+    def test_rows_share_one_commit(self):
+        futures = [self.writer.submit(build_row(f'Pessoa {i}')) for i in range(20)]
+        ids = [future.result(timeout=5) for future in futures]
+        self.assertEqual(len(set(ids)), 20)
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(db.session.get(DISCResult, ids[7]).user_name, 'Pessoa 7')
+
+    def test_invalid_row_fails_alone(self):
+        bad = dict(build_row('Inválida'), calculated_result_json=None)  # NOT NULL
+        futures = [self.writer.submit(build_row('A')), self.writer.submit(bad), self.writer.submit(build_row('B'))]
+        self.assertIsInstance(futures[0].result(timeout=5), int)
+        self.assertIsNotNone(futures[1].exception(timeout=5))
+        self.assertIsInstance(futures[2].result(timeout=5), int)
+        self.assertEqual(db.session.scalar(select(func.count(DISCResult.id))), 2)
+
+    def test_calculate_api_uses_writer(self):
+        answers = [{'questionId': q['id'], 'mais': q['C'], 'menos': q['I']} for q in disc_questions]
+        client = self.app.test_client()
+        response = client.post('/api/calculate', json={'answers': answers, 'userInfo': {'name': 'Ana'}})
+        self.assertEqual(response.status_code, 200)
+        result_id = response.get_json()['result_id']
+        self.assertEqual(self.writer.rows_written, 1)
+        self.assertEqual(db.session.get(DISCResult, result_id).primary_type, 'C')
+        self.assertEqual(client.get('/results').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()